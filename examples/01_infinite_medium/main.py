@@ -72,7 +72,8 @@ def run_infinite_medium():
 
     # 5. Run OpenMC
     print("Running Infinite Medium simulation...")
-    openmc.run(cwd=xml_dir, output=False)
+    # Reuses the stored outputs when these inputs were already run
+    occ.cached_run(xml_dir, output=False)
 
     # Move output files to output directory
     for file in xml_dir.glob('*.h5'):
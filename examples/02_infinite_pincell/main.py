@@ -77,7 +77,8 @@ def run_infinite_pincell():
 
     # 5. Run OpenMC
     print("Running Infinite Pin Cell simulation...")
-    openmc.run(cwd=xml_dir, output=False)
+    # Reuses the stored outputs when these inputs were already run
+    occ.cached_run(xml_dir, output=False)
 
     # Move output files to output directory
     for file in xml_dir.glob('*.h5'):
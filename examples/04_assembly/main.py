@@ -82,7 +82,8 @@ def run_assembly():
 
     # 5. Run OpenMC
     print("Running Assembly simulation...")
-    openmc.run(cwd=xml_dir, output=False)
+    # Reuses the stored outputs when these inputs were already run
+    occ.cached_run(xml_dir, output=False)
 
     # Move output files to output directory
     for file in xml_dir.glob('*.h5'):
@@ -70,12 +70,15 @@ def run_core():
     settings.export_to_xml(xml_dir / 'settings.xml')
 
     # 4. Define Tallies
-    barrel_or = barrel_ir + barrel_thickness
-    world_half = barrel_or + 10.0
+    # Fit the mesh to the barrel instead of the whole world box
+    lower_left, upper_right = occ.core_bounds(
+        core_map, assy_pitch, 'barrel',
+        barrel_ir=barrel_ir, barrel_thickness=barrel_thickness
+    )
     mesh = openmc.RegularMesh()
     mesh.dimension = [100, 100]
-    mesh.lower_left = [-world_half, -world_half]
-    mesh.upper_right = [world_half, world_half]
+    mesh.lower_left = lower_left
+    mesh.upper_right = upper_right
 
     mesh_filter = openmc.MeshFilter(mesh)
     tally = openmc.Tally(name='core_flux')
@@ -87,7 +90,8 @@ def run_core():
 
     # 5. Run OpenMC
     print("Running Core simulation...")
-    openmc.run(cwd=xml_dir, output=False)
+    # Reuses the stored outputs when these inputs were already run
+    occ.cached_run(xml_dir, output=False)
 
     # Move output files to output directory
     for file in xml_dir.glob('*.h5'):
@@ -1,8 +1,81 @@
-from .materials import get_materials
-from .geometry import (
-    create_infinite_pincell_geometry,
-    create_finite_pincell_geometry,
-    create_assembly_universe,
-    generate_circular_core_map,
-    create_core_geometry
-)
+"""OpenMC Crash Course: builders and tools for the example pipelines.
+
+Submodules pull in openmc, NumPy and h5py, so the public names below are
+loaded lazily: ``import openmc_crash_course`` is cheap, and each module is
+imported the first time one of its names, or the module itself (e.g.
+``openmc_crash_course.hex_geometry``), is used.
+"""
+import importlib
+
+# Public names by the submodule that defines them
+_EXPORTS = {
+    'materials': ('get_materials', 'make_materials', 'make_fuel_materials',
+                  'collect_materials'),
+    'registry': (
+        'UniverseRegistry',
+        'get_universe_registry',
+        'clear_universe_registry',
+        'universe_registry',
+    ),
+    'geometry': (
+        'create_infinite_pincell_geometry',
+        'create_finite_pincell_geometry',
+        'create_assembly_universe',
+        'generate_circular_core_map',
+        'core_map_metrics',
+        'core_bounds',
+        'check_core_map_symmetry',
+        'unfold_symmetric_tally',
+        'create_core_geometry',
+        'create_fuel_distribcell_filters',
+    ),
+    'hex_geometry': (
+        'hex_ring_positions',
+        'create_hex_assembly_universe',
+        'generate_hex_core_map',
+        'create_hex_core_geometry',
+    ),
+    'footprint': ('estimate_memory',),
+    'models': ('PIPELINES',),
+    'sweep': ('run_sweep',),
+    'cache': ('ResultCache', 'cached_run'),
+    'postprocess': ('StatepointReader', 'read_tally', 'iter_tallies', 'aggregate_tally',
+                    'latest_statepoint'),
+    'locator': ('Locator',),
+    'meshes': ('create_lattice_mesh', 'extract_pin_values'),
+    'convergence': ('choose_inactive_batches', 'run_converged'),
+    'seeding': ('assembly_power_source', 'unfold_source', 'neighbour_source',
+                'inactive_batches_saved'),
+    'mgxs': ('generate_mgxs_library', 'build_mg_core_model', 'compare_results',
+             'synthetic_mgxs_library'),
+    'telemetry': ('PhaseTimer', 'parse_output', 'instrumented_run'),
+    'jobs': ('JobManager', 'run_jobs'),
+    'snapshot': ('save_snapshot', 'load_snapshot', 'cached_model'),
+    'variance_reduction': ('run_with_weight_windows', 'compare_fom'),
+    'search': ('criticality_search',),
+    'perturbation': ('PerturbationSession',),
+}
+
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+# Every submodule is reachable as an attribute too, e.g. hex_geometry
+_SUBMODULES = set(_EXPORTS) | {'bench', 'main'}
+
+__all__ = list(_MODULE_OF)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        # import_module also binds the submodule as an attribute here
+        return importlib.import_module(f'.{name}', __name__)
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    # Later lookups find it directly instead of calling __getattr__ again
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,232 @@
+"""Benchmarks for the geometry builders.
+
+Times and memory-profiles the builders in geometry.py and hex_geometry.py,
+and the XML export of the full core, over a sweep of core grid sizes and
+assembly sizes.
+Results are written as JSON records and can be checked against a stored
+baseline.  Nothing here runs OpenMC, so no cross section data is needed.
+
+Run from the command line with::
+
+    python -m openmc_crash_course.bench --output bench.json --baseline baseline.json
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import openmc
+
+from .materials import get_materials
+from . import geometry
+from . import hex_geometry
+from .registry import universe_registry
+
+DEFAULT_GRID_SIZES = (5, 9, 13, 17, 21)
+DEFAULT_ASSY_SIZES = (15, 17, 19, 22)
+
+
+def _measure(func, repeats):
+    """Returns (best wall time in s, peak traced memory in bytes) of func()."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    # Memory is profiled in a separate call, tracing slows everything down
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def _cases(grid_size, assy_size, pitch=1.26, wall_thickness=0.2, gap_thickness=0.1):
+    """Returns {benchmark name: function} for one (grid_size, assy_size)."""
+    mats = get_materials()
+    uo2, zirc, water = mats['uo2'], mats['zirc'], mats['water']
+    steel, air = mats['steel'], mats['air']
+    assy_pitch = pitch * assy_size + 2 * (wall_thickness + gap_thickness)
+    target = int(round(np.pi / 4 * grid_size ** 2))
+
+    def fresh(func):
+        # Time actual builds, not lookups in the universe registry
+        def wrapped():
+            with universe_registry():
+                return func()
+        return wrapped
+
+    def pin_cell():
+        return geometry.create_pin_cell_universe(uo2, zirc, water)
+
+    def assembly_lattice():
+        pin = geometry.create_pin_cell_universe(uo2, zirc, water)
+        water_univ = geometry.create_water_universe(water)
+        return geometry.create_assembly_lattice(pin, water_univ, pitch, assy_size)
+
+    def core_map():
+        geometry._circular_core_mask.cache_clear()
+        return geometry.generate_circular_core_map(grid_size, assy_pitch, target)
+
+    layout, barrel_ir = geometry.generate_circular_core_map(grid_size, assy_pitch, target)
+    with universe_registry():
+        assy_univ = geometry.create_assembly_universe(
+            uo2, zirc, water, pitch, assy_size, wall_thickness, gap_thickness
+        )
+        reflector_univ = geometry.create_water_universe(water)
+
+    def core_lattice():
+        return geometry.create_core_lattice(assy_univ, reflector_univ, layout, assy_pitch)
+
+    def core_geometry():
+        return geometry.create_core_geometry(
+            uo2, zirc, water, steel, air, layout, pitch, assy_size,
+            wall_thickness, gap_thickness, barrel_ir=barrel_ir
+        )
+
+    # Hex core with about as many assemblies and pins as the square one
+    n_rings = (grid_size + 1) // 2
+    n_pin_rings = int(round((3 + np.sqrt(12 * assy_size ** 2 - 3)) / 6))
+    hex_pitch = hex_geometry.hex_assembly_pitch(pitch, n_pin_rings, wall_thickness, gap_thickness)
+    hex_layout, _ = hex_geometry.generate_hex_core_map(n_rings, hex_pitch, target)
+
+    def hex_core_geometry():
+        return hex_geometry.create_hex_core_geometry(
+            uo2, zirc, water, steel, air, hex_layout, pitch, n_pin_rings,
+            wall_thickness, gap_thickness
+        )
+
+    with universe_registry():
+        built = core_geometry()
+    materials = openmc.Materials([uo2, zirc, water, steel, air])
+
+    def xml_export():
+        with tempfile.TemporaryDirectory() as tmp:
+            materials.export_to_xml(Path(tmp) / 'materials.xml')
+            built.export_to_xml(Path(tmp) / 'geometry.xml')
+
+    return {
+        'create_pin_cell_universe': fresh(pin_cell),
+        'create_assembly_lattice': fresh(assembly_lattice),
+        'generate_circular_core_map': core_map,
+        'create_core_lattice': core_lattice,
+        'create_core_geometry': fresh(core_geometry),
+        'create_hex_core_geometry': fresh(hex_core_geometry),
+        'export_to_xml': xml_export,
+    }
+
+
+def run_benchmarks(grid_sizes=DEFAULT_GRID_SIZES, assy_sizes=DEFAULT_ASSY_SIZES,
+                   repeats=3):
+    """Runs every benchmark for every (grid_size, assy_size) pair.
+
+    Returns
+    -------
+    list of dict
+        One record per benchmark and size with keys 'benchmark',
+        'grid_size', 'assy_size', 'time_s' and 'peak_bytes'.
+    """
+    records = []
+    for grid_size in grid_sizes:
+        for assy_size in assy_sizes:
+            for name, func in _cases(grid_size, assy_size).items():
+                time_s, peak_bytes = _measure(func, repeats)
+                records.append({
+                    'benchmark': name,
+                    'grid_size': grid_size,
+                    'assy_size': assy_size,
+                    'time_s': time_s,
+                    'peak_bytes': peak_bytes,
+                })
+    return records
+
+
+def scaling_exponents(records, size_key='grid_size'):
+    """Fits time ~ size**p per benchmark and returns {benchmark: p}.
+
+    The fit is over all records sharing the other size parameter's
+    largest value, on a log-log scale.
+    """
+    other_key = 'assy_size' if size_key == 'grid_size' else 'grid_size'
+    exponents = {}
+    for name in sorted({record['benchmark'] for record in records}):
+        subset = [record for record in records if record['benchmark'] == name]
+        other = max(record[other_key] for record in subset)
+        subset = [record for record in subset if record[other_key] == other]
+        if len({record[size_key] for record in subset}) < 2:
+            continue
+        sizes = np.log([record[size_key] for record in subset])
+        times = np.log([max(record['time_s'], 1e-9) for record in subset])
+        exponents[name] = float(np.polyfit(sizes, times, 1)[0])
+    return exponents
+
+
+def compare_to_baseline(records, baseline, time_tolerance=1.5, memory_tolerance=1.2):
+    """Returns the records that regressed against a baseline.
+
+    A record regresses when its time exceeds the matching baseline time by
+    more than time_tolerance, or its peak memory exceeds the baseline by
+    more than memory_tolerance.  Records without a baseline entry are
+    ignored.  Each returned dict is the record plus the baseline values.
+    """
+    def key(record):
+        return record['benchmark'], record['grid_size'], record['assy_size']
+
+    reference = {key(record): record for record in baseline}
+    regressions = []
+    for record in records:
+        base = reference.get(key(record))
+        if base is None:
+            continue
+        if (record['time_s'] > base['time_s'] * time_tolerance or
+                record['peak_bytes'] > base['peak_bytes'] * memory_tolerance):
+            regressions.append(dict(record, baseline_time_s=base['time_s'],
+                                    baseline_peak_bytes=base['peak_bytes']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--grid-sizes', type=int, nargs='+', default=DEFAULT_GRID_SIZES)
+    parser.add_argument('--assy-sizes', type=int, nargs='+', default=DEFAULT_ASSY_SIZES)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', type=Path, default=Path('bench.json'))
+    parser.add_argument('--baseline', type=Path,
+                        help='Fail if results regress against this file')
+    parser.add_argument('--time-tolerance', type=float, default=1.5)
+    parser.add_argument('--memory-tolerance', type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    records = run_benchmarks(args.grid_sizes, args.assy_sizes, args.repeats)
+    args.output.write_text(json.dumps({
+        'records': records,
+        'scaling': {
+            'grid_size': scaling_exponents(records, 'grid_size'),
+            'assy_size': scaling_exponents(records, 'assy_size'),
+        },
+    }, indent=2))
+    print(f"Wrote {len(records)} benchmark records to {args.output}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())['records']
+        regressions = compare_to_baseline(
+            records, baseline, args.time_tolerance, args.memory_tolerance
+        )
+        for record in regressions:
+            print(f"REGRESSION {record['benchmark']} grid={record['grid_size']} "
+                  f"assy={record['assy_size']}: {record['time_s']:.4g} s "
+                  f"(baseline {record['baseline_time_s']:.4g} s), "
+                  f"{record['peak_bytes']} B (baseline {record['baseline_peak_bytes']} B)")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
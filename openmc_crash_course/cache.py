@@ -0,0 +1,256 @@
+"""Content-addressed cache of OpenMC run outputs.
+
+Runs are keyed on a SHA-256 hash of the canonicalized materials, geometry,
+settings and tallies XML, the contents of every file those XML files
+refer to (source files, an MGXS library, weight window files), the
+identity of the cross section library named by OPENMC_CROSS_SECTIONS and
+the output of ``openmc --version``.  When the same inputs are run again
+the stored statepoint, summary and tallies.out are copied back instead of
+calling OpenMC.  The cache lives on disk and is bounded in size; the
+least recently used entries are evicted first.
+"""
+import functools
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import openmc
+
+XML_FILES = ('materials.xml', 'geometry.xml', 'settings.xml', 'tallies.xml')
+
+# Output files of a run that are stored in the cache
+OUTPUT_PATTERNS = ('statepoint.*.h5', 'summary.h5', 'tallies.out')
+_STATEPOINT_RE = re.compile(r'^statepoint\.(\d+)\.h5$')
+
+# XML elements whose text, and attributes whose value, name an input file
+_FILE_ELEMENTS = ('cross_sections', 'file', 'filename', 'weight_windows_file')
+_FILE_ATTRIBUTES = ('file', 'filename')
+
+DEFAULT_CACHE_DIR = Path(os.environ.get(
+    'OPENMC_CRASH_COURSE_CACHE', Path.home() / '.cache' / 'openmc_crash_course'
+))
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# Touched on every hit, its mtime orders entries for LRU eviction
+_LAST_USED = 'last_used'
+
+
+def _canonical_xml(path):
+    """Returns the XML at path in a whitespace- and layout-independent form."""
+    if hasattr(ET, 'canonicalize'):
+        return ET.canonicalize(from_file=str(path), strip_text=True).encode()
+    return ET.tostring(ET.parse(path).getroot())
+
+
+def cross_sections_identity():
+    """Returns a string identifying the configured cross section library.
+
+    It combines the resolved path of OPENMC_CROSS_SECTIONS with a hash of
+    the cross_sections.xml contents, so switching libraries or updating
+    one in place both change the identity.
+    """
+    xs_path = os.environ.get('OPENMC_CROSS_SECTIONS')
+    if not xs_path:
+        return ''
+    xs_path = Path(xs_path).expanduser().resolve()
+    try:
+        digest = hashlib.sha256(xs_path.read_bytes()).hexdigest()
+    except OSError:
+        digest = 'missing'
+    return f'{xs_path}:{digest}'
+
+
+@functools.lru_cache(maxsize=None)
+def openmc_version(openmc_exec='openmc'):
+    """Returns the output of ``openmc --version``, or '' if it cannot run."""
+    try:
+        return subprocess.run([openmc_exec, '--version'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def referenced_files(xml_dir):
+    """Returns the sorted paths of the files named in the input XML.
+
+    These are FileSource files, the cross_sections entry of materials.xml
+    (an MGXS library, or a cross_sections.xml overriding the environment),
+    weight window files and the like; relative paths are resolved against
+    xml_dir, as OpenMC does when run there.
+    """
+    xml_dir = Path(xml_dir)
+    paths = set()
+    for name in XML_FILES:
+        if not (xml_dir / name).exists():
+            continue
+        for element in ET.parse(xml_dir / name).iter():
+            values = [element.get(attribute) for attribute in _FILE_ATTRIBUTES]
+            if element.tag in _FILE_ELEMENTS:
+                values.append(element.text)
+            for value in values:
+                if value and value.strip():
+                    paths.add(xml_dir / Path(value.strip()).expanduser())
+    return sorted(paths)
+
+
+def _file_digest(path):
+    """Returns the SHA-256 of a file's contents, read in chunks."""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(functools.partial(fh.read, 1 << 20), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def input_key(xml_dir, openmc_exec='openmc'):
+    """Returns the cache key of the OpenMC input files in xml_dir."""
+    xml_dir = Path(xml_dir)
+    hasher = hashlib.sha256()
+    for name in XML_FILES:
+        path = xml_dir / name
+        hasher.update(name.encode() + b'\0')
+        if path.exists():
+            hasher.update(_canonical_xml(path))
+        hasher.update(b'\0')
+    for path in referenced_files(xml_dir):
+        try:
+            digest = _file_digest(path)
+        except OSError:
+            digest = 'missing'
+        hasher.update(f'{path.resolve()}:{digest}\0'.encode())
+    hasher.update(cross_sections_identity().encode() + b'\0')
+    hasher.update(openmc_version(openmc_exec).encode())
+    return hasher.hexdigest()
+
+
+def _output_files(directory):
+    """Returns {name: (mtime_ns, size)} of the run outputs in directory."""
+    outputs = {}
+    for pattern in OUTPUT_PATTERNS:
+        for path in directory.glob(pattern):
+            stat = path.stat()
+            outputs[path.name] = (stat.st_mtime_ns, stat.st_size)
+    return outputs
+
+
+class ResultCache:
+    """Size-bounded, least-recently-used store of run outputs on disk.
+
+    Each entry is a directory named after its key holding the output files
+    produced by one run.
+
+    Parameters
+    ----------
+    root : path-like or None
+        Cache directory; defaults to DEFAULT_CACHE_DIR, which can be set
+        through the OPENMC_CRASH_COURSE_CACHE environment variable.
+    max_bytes : int
+        Total size the cache is trimmed back to after each store.
+    """
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(DEFAULT_CACHE_DIR if root is None else root)
+        self.max_bytes = max_bytes
+
+    def _entries(self):
+        if not self.root.is_dir():
+            return []
+        return [path for path in self.root.iterdir()
+                if path.is_dir() and (path / _LAST_USED).exists()]
+
+    @staticmethod
+    def _entry_size(entry):
+        return sum(path.stat().st_size for path in entry.iterdir() if path.is_file())
+
+    def size(self):
+        """Returns the total size of all entries in bytes."""
+        return sum(self._entry_size(entry) for entry in self._entries())
+
+    def lookup(self, key):
+        """Returns the entry directory for key, or None on a miss."""
+        entry = self.root / key
+        if not (entry / _LAST_USED).exists():
+            return None
+        (entry / _LAST_USED).touch()
+        return entry
+
+    def store(self, key, files):
+        """Copies files into the entry for key and evicts old entries."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        entry = self.root / key
+        tmp_entry = self.root / f'.{key}.{os.getpid()}.tmp'
+        tmp_entry.mkdir()
+        for path in files:
+            shutil.copy2(path, tmp_entry / Path(path).name)
+        (tmp_entry / _LAST_USED).touch()
+        try:
+            os.replace(tmp_entry, entry)
+        except OSError:
+            # Another process stored the same key first
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+        self.evict(keep=key)
+        return entry
+
+    def evict(self, keep=None):
+        """Removes least recently used entries until under max_bytes."""
+        entries = sorted(self._entries(),
+                         key=lambda entry: (entry / _LAST_USED).stat().st_mtime)
+        sizes = {entry: self._entry_size(entry) for entry in entries}
+        total = sum(sizes.values())
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry.name == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= sizes[entry]
+
+    def clear(self):
+        """Removes all entries."""
+        for entry in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+
+def cached_run(xml_dir, cache=None, **kwargs):
+    """Runs OpenMC in xml_dir unless the same inputs were run before.
+
+    On a hit the cached outputs are copied into xml_dir, exactly where
+    openmc.run would have written them; on a miss OpenMC is run with
+    kwargs (as for openmc.run) and the outputs it wrote, the files matching
+    OUTPUT_PATTERNS that are new or changed since before the run, are
+    stored.  Other files in xml_dir, e.g. statepoints of earlier runs or
+    source files, are left out of the cache.
+
+    Returns
+    -------
+    pathlib.Path
+        Path of the statepoint file of the highest batch in xml_dir.
+    """
+    xml_dir = Path(xml_dir)
+    cache = ResultCache() if cache is None else cache
+    key = input_key(xml_dir, kwargs.get('openmc_exec', 'openmc'))
+
+    entry = cache.lookup(key)
+    if entry is not None:
+        outputs = [shutil.copy2(path, xml_dir / path.name)
+                   for path in entry.iterdir() if path.name != _LAST_USED]
+    else:
+        before = _output_files(xml_dir)
+        openmc.run(cwd=xml_dir, **kwargs)
+        outputs = [xml_dir / name for name, stat in _output_files(xml_dir).items()
+                   if before.get(name) != stat]
+        cache.store(key, outputs)
+
+    # The statepoint of the last batch, statepoint.100.h5 after statepoint.50.h5
+    batches = {}
+    for path in outputs:
+        match = _STATEPOINT_RE.match(Path(path).name)
+        if match:
+            batches[int(match.group(1))] = Path(path).name
+    if not batches:
+        raise FileNotFoundError(f"No statepoint file produced in {xml_dir}")
+    return xml_dir / batches[max(batches)]
@@ -0,0 +1,206 @@
+"""Convergence-driven batch control for eigenvalue runs.
+
+Instead of a fixed number of inactive and active batches, run_converged
+first runs short pilots with every batch inactive and a Shannon entropy
+mesh.  Each pilot continues from the source of the one before, and the
+pilots stop as soon as the entropy and k-effective of all their batches
+stop drifting (choose_inactive_batches).  The production run then
+restarts from that converged fission source.  It uses OpenMC tally
+triggers, so active batches stop as soon as every tally reaches the
+requested relative error, up to a batch limit.
+"""
+import copy
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import openmc
+
+from .postprocess import StatepointReader, latest_statepoint
+
+ConvergenceResult = namedtuple('ConvergenceResult', [
+    'statepoint', 'pilot_batches', 'converged_batch', 'inactive_batches',
+    'active_batches', 'converged'
+])
+
+
+def _stationary_start(values, window, n_sigma):
+    """Returns the first batch from which values are stationary, or None.
+
+    The second half of the series is the reference.  If a linear fit over
+    it still shows a significant trend, the series has not converged.
+    Otherwise the start is the first batch whose window average falls
+    within n_sigma of the reference mean.  Batch-to-batch correlation is
+    accounted for through the observed spread of window averages.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    n = len(values)
+    if n < 2 * window:
+        return None
+    reference = values[n // 2:]
+    x = np.arange(len(reference)) - (len(reference) - 1) / 2
+    slope = np.dot(x, reference) / np.dot(x, x)
+    residual = reference - reference.mean() - slope * x
+    noise = residual.std(ddof=2)
+    window_noise = np.convolve(residual, np.ones(window) / window, mode='valid').std(ddof=1)
+    inflation = max(1.0, window_noise * np.sqrt(window) / noise) if noise > 0 else 1.0
+    if abs(slope) > n_sigma * inflation * noise / np.sqrt(np.dot(x, x)):
+        return None
+
+    center = reference.mean()
+    band = n_sigma * max(window_noise, noise / np.sqrt(window)) + 1e-12 * abs(center)
+    moving = np.convolve(values, np.ones(window) / window, mode='valid')
+    inside = np.flatnonzero(np.abs(moving - center) <= band)
+    # Entering the band only within the reference half is too late to trust
+    if len(inside) == 0 or inside[0] > n // 2:
+        return None
+    return int(inside[0])
+
+
+def choose_inactive_batches(entropy, k_generation=None, window=10, n_sigma=3.0):
+    """Picks the number of inactive batches from a pilot run.
+
+    Parameters
+    ----------
+    entropy : sequence of float
+        Shannon entropy of the fission source per batch.
+    k_generation : sequence of float or None
+        k-effective per batch; when given, k must have settled too.
+    window : int
+        Batches averaged together before testing for drift.
+    n_sigma : float
+        Significance of a remaining trend, and width of the accepted band
+        around the converged value, in standard deviations.
+
+    Returns
+    -------
+    int or None
+        Number of leading batches to discard, or None if the series has not
+        converged within the first half of the pilot.
+    """
+    starts = [_stationary_start(entropy, window, n_sigma)]
+    if k_generation is not None:
+        starts.append(_stationary_start(k_generation, window, n_sigma))
+    if any(start is None for start in starts):
+        return None
+    return max(starts)
+
+
+def entropy_mesh(lower_left, upper_right, dimension=(8, 8, 1)):
+    """Returns a RegularMesh for settings.entropy_mesh over a box."""
+    mesh = openmc.RegularMesh()
+    mesh.lower_left = lower_left
+    mesh.upper_right = upper_right
+    mesh.dimension = dimension
+    return mesh
+
+
+def add_rel_err_triggers(tallies, rel_err):
+    """Adds a relative-error trigger on every score of every tally."""
+    for tally in tallies:
+        trigger = openmc.Trigger('rel_err', rel_err)
+        trigger.scores = list(tally.scores)
+        tally.triggers = [trigger]
+
+
+def run_converged(model, directory, rel_err=0.01, pilot_batches=25,
+                  max_pilots=6, min_inactive=5, min_active=20, max_batches=1000,
+                  batch_interval=5, mesh=None, window=10, **run_kwargs):
+    """Runs an eigenvalue model with converged source and tally precision.
+
+    Parameters
+    ----------
+    model : openmc.Model
+        Model to run; a copy is modified, the model itself is left as is.
+    directory : path-like
+        Working directory; the pilot runs go to pilot_<n> subdirectories.
+    rel_err : float
+        Target relative error of every tally score.
+    pilot_batches : int
+        Batches per pilot run, all of them inactive.  Convergence is
+        checked after every pilot, so shorter pilots stop sooner but pay
+        the start-up cost of OpenMC more often.
+    max_pilots : int
+        Pilot runs attempted, each restarting from the previous source,
+        before giving up on convergence.
+    min_inactive : int
+        Inactive batches of the production run.  Its source is already
+        converged, these only let it settle after the restart; the pilot
+        batches discarded are not run again.
+    min_active : int
+        Active batches run before the triggers are first checked.
+    max_batches : int
+        Upper limit on production batches if the triggers are not met.
+    batch_interval : int
+        Batches between trigger checks.
+    mesh : openmc.RegularMesh or None
+        Entropy mesh; defaults to settings.entropy_mesh, or an 8x8x1 mesh
+        over the geometry's bounding box.
+    window : int
+        Averaging window of choose_inactive_batches.
+    **run_kwargs
+        Passed on to openmc.Model.run (threads, mpi_args, openmc_exec, ...).
+
+    Returns
+    -------
+    ConvergenceResult
+        Production statepoint; pilot batches run; the pilot batch from
+        which the source was stationary (None if it never was); inactive
+        and active batches of the production run; and whether the pilots
+        converged at all.
+    """
+    directory = Path(directory)
+    # Work on a copy, the caller's model keeps its settings and tallies
+    model = copy.deepcopy(model)
+    settings = model.settings
+    if mesh is None:
+        mesh = settings.entropy_mesh
+    if mesh is None:
+        lower_left, upper_right = model.geometry.bounding_box
+        if not (np.all(np.isfinite(lower_left)) and np.all(np.isfinite(upper_right))):
+            raise ValueError("Geometry is unbounded, pass an entropy mesh")
+        mesh = entropy_mesh(lower_left, upper_right)
+    settings.entropy_mesh = mesh
+    settings.trigger_active = False
+    run_kwargs.setdefault('output', False)
+
+    tallies = model.tallies
+    model.tallies = openmc.Tallies()
+    settings.batches = pilot_batches
+    settings.inactive = pilot_batches - 1
+    entropy, k_generation = [], []
+    start = None
+    for pilot in range(max_pilots):
+        pilot_dir = directory / f'pilot_{pilot}'
+        pilot_dir.mkdir(parents=True, exist_ok=True)
+        model.run(cwd=pilot_dir, **run_kwargs)
+        statepoint = latest_statepoint(pilot_dir)
+        with StatepointReader(statepoint) as reader:
+            entropy.extend(reader.entropy)
+            k_generation.extend(reader.k_generation)
+        # Restart from the last source either way, it is closer to converged
+        settings.source = openmc.FileSource(str(statepoint.resolve()))
+        # Each pilot continues the source of the last, so together they
+        # are one series
+        start = choose_inactive_batches(entropy, k_generation, window)
+        if start is not None:
+            break
+
+    model.tallies = tallies
+    add_rel_err_triggers(tallies, rel_err)
+    settings.inactive = min_inactive
+    settings.batches = min_inactive + min_active
+    if len(tallies):
+        settings.trigger_active = True
+        settings.trigger_max_batches = max_batches
+        settings.trigger_batch_interval = batch_interval
+    model.run(cwd=directory, **run_kwargs)
+
+    statepoint = latest_statepoint(directory)
+    with StatepointReader(statepoint) as reader:
+        n_batches = len(reader.k_generation)
+    return ConvergenceResult(
+        statepoint, len(entropy), start, min_inactive,
+        n_batches - min_inactive, start is not None
+    )
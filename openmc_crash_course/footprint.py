@@ -0,0 +1,124 @@
+"""Memory footprint estimates for built models.
+
+Differentiated models (one material per fuel pin) grow quickly: a
+177-assembly core has ~46k fuel materials.  estimate_memory counts the
+objects of a geometry and converts the counts into approximate sizes for
+the Python objects, the exported XML and the OpenMC process, so an
+oversized model can be caught before export.  The per-object sizes are
+rough averages, good for order-of-magnitude planning only.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+MemoryEstimate = namedtuple(
+    'MemoryEstimate',
+    ['n_materials', 'n_nuclide_entries', 'n_cells', 'n_surfaces',
+     'n_universes', 'n_lattice_elements', 'n_distribcell_instances',
+     'python_bytes', 'xml_bytes', 'openmc_bytes']
+)
+
+# Approximate bytes per object: (Python, XML, OpenMC)
+_MATERIAL_BYTES = (2000, 150, 400)
+_NUCLIDE_BYTES = (250, 60, 24)
+_CELL_BYTES = (1500, 120, 500)
+_SURFACE_BYTES = (800, 100, 200)
+_UNIVERSE_BYTES = (800, 0, 150)
+_LATTICE_ELEMENT_BYTES = (8, 6, 8)
+# Every OpenMC material keeps an index into the global nuclide table
+_NUCLIDE_INDEX_BYTES = 4
+# Distribcell offset tables, per cell and per instance of its universe
+_OFFSET_BYTES = 4
+
+
+def _instance_counts(geometry):
+    """Returns {universe id: number of instances} over the whole geometry."""
+    counts = {geometry.root_universe.id: 1}
+    # Universes are visited after every universe that contains them
+    order = []
+    seen = set()
+
+    def visit(universe):
+        if universe.id in seen:
+            return
+        seen.add(universe.id)
+        for child, _ in _children(universe):
+            visit(child)
+        order.append(universe)
+
+    visit(geometry.root_universe)
+    for universe in reversed(order):
+        for child, multiplicity in _children(universe):
+            counts[child.id] = counts.get(child.id, 0) + \
+                counts.get(universe.id, 0) * multiplicity
+    return counts
+
+
+def _children(universe):
+    """Yields (child universe, multiplicity) pairs of a universe or lattice."""
+    cells = getattr(universe, 'cells', None)
+    if cells is not None:
+        for cell in cells.values():
+            if cell.fill_type in ('universe', 'lattice'):
+                yield cell.fill, 1
+        return
+
+    # Lattice: count each distinct universe once per occurrence
+    elements = np.ravel(np.asarray(universe.universes, dtype=object))
+    ids, counts = np.unique([u.id for u in elements], return_counts=True)
+    by_id = {u.id: u for u in elements}
+    for universe_id, count in zip(ids.tolist(), counts.tolist()):
+        yield by_id[universe_id], count
+    if universe.outer is not None:
+        yield universe.outer, 1
+
+
+def estimate_memory(geometry):
+    """Estimates the memory footprint of a geometry and its materials.
+
+    Returns
+    -------
+    MemoryEstimate
+        Object counts, and estimated sizes in bytes of the Python model
+        (python_bytes), the exported XML (xml_bytes) and the geometry and
+        material data held by an OpenMC process (openmc_bytes, excluding
+        cross sections and tallies).
+    """
+    materials = geometry.get_all_materials()
+    cells = geometry.get_all_cells()
+    surfaces = geometry.get_all_surfaces()
+    universes = geometry.get_all_universes()
+    lattices = geometry.get_all_lattices()
+
+    n_materials = len(materials)
+    n_nuclide_entries = sum(len(material.nuclides) for material in materials.values())
+    n_unique_nuclides = len({nuc.name for material in materials.values()
+                             for nuc in material.nuclides})
+    n_lattice_elements = sum(np.size(lattice.universes) for lattice in lattices.values())
+
+    # Distribcell offsets, upper bound: one per instance of every cell
+    instances = _instance_counts(geometry)
+    n_distribcell_instances = sum(
+        instances.get(universe.id, 0) * len(universe.cells)
+        for universe in universes.values()
+    )
+
+    counts = (
+        (n_materials, _MATERIAL_BYTES),
+        (n_nuclide_entries, _NUCLIDE_BYTES),
+        (len(cells), _CELL_BYTES),
+        (len(surfaces), _SURFACE_BYTES),
+        (len(universes) + len(lattices), _UNIVERSE_BYTES),
+        (n_lattice_elements, _LATTICE_ELEMENT_BYTES),
+    )
+    python_bytes, xml_bytes, openmc_bytes = (
+        sum(n * sizes[k] for n, sizes in counts) for k in range(3)
+    )
+    openmc_bytes += n_materials * n_unique_nuclides * _NUCLIDE_INDEX_BYTES
+    openmc_bytes += n_distribcell_instances * _OFFSET_BYTES
+
+    return MemoryEstimate(
+        n_materials, n_nuclide_entries, len(cells), len(surfaces),
+        len(universes) + len(lattices), n_lattice_elements,
+        n_distribcell_instances, python_bytes, xml_bytes, openmc_bytes
+    )
@@ -1,6 +1,19 @@
+import functools
+import math
+from collections import namedtuple
+
 import openmc
 import numpy as np
-import math
+
+from .registry import intern, scoped
+
+def _zcylinder(r):
+    """Returns the ZCylinder of radius r centered on the z-axis."""
+    return intern(('zcylinder', float(r)), lambda: openmc.ZCylinder(r=r))
+
+def _zplane(z0):
+    """Returns the transmissive ZPlane at height z0."""
+    return intern(('zplane', float(z0)), lambda: openmc.ZPlane(z0=z0))
 
 def create_pin_cell_universe(
         uo2, zirc, water,
@@ -13,9 +26,13 @@ def create_pin_cell_universe(
     - Cladding (Zircaloy) surrounding the fuel
     - Moderator (water) outside the cladding
     """
-    fuel_cylinder = openmc.ZCylinder(r=fuel_radius)
-    cladding_cylinder = openmc.ZCylinder(r=cladding_radius)
+    key = ('pin', uo2.id, zirc.id, water.id,
+           float(fuel_radius), float(cladding_radius))
+    return intern(key, lambda: _build_pin_cell_universe(
+        uo2, zirc, water, _zcylinder(fuel_radius), _zcylinder(cladding_radius)
+    ))
 
+def _build_pin_cell_universe(uo2, zirc, water, fuel_cylinder, cladding_cylinder):
     fuel_pin_univ = openmc.Universe(name='Fuel Pin')
     fuel_cell = openmc.Cell(name='fuel', fill=uo2, region=-fuel_cylinder)
     clad_cell = openmc.Cell(name='cladding', fill=zirc, region=+fuel_cylinder & -cladding_cylinder)
@@ -67,6 +84,9 @@ def create_finite_pincell_geometry(
 
 def create_water_universe(water):
     """Creates a water-only universe for guide tubes and reflector regions."""
+    return intern(('water', water.id), lambda: _build_water_universe(water))
+
+def _build_water_universe(water):
     water_univ = openmc.Universe(name='Water Guide Tube')
     water_gt_cell = openmc.Cell(fill=water)
     water_univ.add_cells([water_gt_cell])
@@ -81,45 +101,105 @@ def create_assembly_lattice(
     Creates a size x size lattice of fuel pins with water guide tubes
     at the center and four corners.
     """
+    key = ('assembly_lattice', fuel_pin_univ.id, water_univ.id,
+           float(pitch), int(size))
+    return intern(key, lambda: _build_assembly_lattice(
+        fuel_pin_univ, water_univ, pitch, size
+    ))
+
+def guide_tube_mask(size):
+    """Returns a (size, size) boolean array that is True at guide tubes.
+
+    Guide tubes sit at the center and at the four positions three pins in
+    from each corner, as laid out by create_assembly_lattice.
+    """
+    mask = np.zeros((size, size), dtype=bool)
+    center = size // 2
+    mask[center, center] = True
+    mask[3, 3] = True
+    mask[3, size-4] = True
+    mask[size-4, 3] = True
+    mask[size-4, size-4] = True
+    return mask
+
+def _build_assembly_lattice(fuel_pin_univ, water_univ, pitch, size):
+    universes = np.full((size, size), fuel_pin_univ)
+    # Simple water tubes in the middle and corners
+    universes[guide_tube_mask(size)] = water_univ
+    return _pin_lattice(universes, pitch)
+
+def _pin_lattice(universes, pitch):
+    size = len(universes)
     lattice = openmc.RectLattice()
     lattice.lower_left = (-pitch * size / 2, -pitch * size / 2)
     lattice.pitch = (pitch, pitch)
-    
-    universes = np.full((size, size), fuel_pin_univ)
-    # Simple water tubes in the middle and corners
-    center = size // 2
-    universes[center, center] = water_univ
-    universes[3, 3] = water_univ
-    universes[3, size-4] = water_univ
-    universes[size-4, 3] = water_univ
-    universes[size-4, size-4] = water_univ
-    
     lattice.universes = universes
     return lattice
 
+def _build_differentiated_assembly_lattice(
+        uo2, zirc, water, pitch, size, fuel_radius, cladding_radius
+):
+    """Builds an assembly lattice where every fuel pin has its own material.
+
+    Each fuel position gets a clone of uo2 named after its lattice (row,
+    column) index.  The cylinders and the zirc and water materials are
+    shared, but every pin has its own cells: an OpenMC cell belongs to
+    exactly one universe, so cladding and moderator cells cannot be.
+    """
+    fuel_cylinder = _zcylinder(fuel_radius)
+    cladding_cylinder = _zcylinder(cladding_radius)
+    guide_tubes = guide_tube_mask(size)
+
+    universes = np.empty((size, size), dtype=object)
+    universes[guide_tubes] = create_water_universe(water)
+    for i, j in np.argwhere(~guide_tubes):
+        fuel = uo2.clone()
+        fuel.name = f'{uo2.name} ({i}, {j})'
+        universes[i, j] = _build_pin_cell_universe(
+            fuel, zirc, water, fuel_cylinder, cladding_cylinder
+        )
+    return _pin_lattice(universes, pitch)
+
 def create_core_lattice(fuel_univ, reflector_univ, core_map, assy_pitch):
     """Creates a core lattice from a map of assemblies.
 
-    The core_map is a 2D list where 1 = fuel assembly, 0 = reflector.
+    The core_map is a 2D list or integer array where 0 = reflector and
+    k >= 1 selects an assembly type.  fuel_univ is either a single
+    universe used wherever core_map == 1, or a sequence of universes where
+    fuel_univ[k - 1] fills the positions with core_map == k.
     """
-    size = len(core_map)
+    loading_map = np.asarray(core_map, dtype=int)
+    if isinstance(fuel_univ, (list, tuple)):
+        fuel_univs = fuel_univ
+    else:
+        fuel_univs = [fuel_univ]
+    if loading_map.size and (loading_map.min() < 0 or loading_map.max() > len(fuel_univs)):
+        raise ValueError(
+            f"core_map entries must lie in [0, {len(fuel_univs)}] for "
+            f"{len(fuel_univs)} assembly type(s)"
+        )
+
+    size = len(loading_map)
     lattice = openmc.RectLattice()
     lattice.lower_left = (-assy_pitch * size / 2, -assy_pitch * size / 2)
     lattice.pitch = (assy_pitch, assy_pitch)
-    
-    universes = np.empty((size, size), dtype=openmc.Universe)
-    for i in range(size):
-        for j in range(size):
-            universes[i, j] = fuel_univ if core_map[i][j] == 1 else reflector_univ
-    
-    lattice.universes = universes
+
+    # Index an object array of universes with the whole map at once
+    universe_table = np.empty(len(fuel_univs) + 1, dtype=object)
+    universe_table[0] = reflector_univ
+    for k, univ in enumerate(fuel_univs, start=1):
+        universe_table[k] = univ
+
+    lattice.universes = universe_table[loading_map]
     lattice.outer = reflector_univ
     return lattice
 
 def create_assembly_universe(
         uo2, zirc, water,
         pitch=1.26, size=17,
-        wall_thickness=0.2, gap_thickness=0.1
+        wall_thickness=0.2, gap_thickness=0.1,
+        fuel_radius=0.39, cladding_radius=0.45,
+        differentiate=False
 ):
     """Creates a fuel assembly universe.
 
@@ -127,10 +207,40 @@ def create_assembly_universe(
     1. Lattice of fuel pins with guide tubes (size x size)
     2. Zircaloy assembly wall
     3. Water gap between assemblies
+
+    With differentiate=True every fuel pin gets its own clone of uo2, for
+    per-pin depletion or material-filtered reaction rates; such assemblies
+    are never shared through the registry.  For per-pin tallies alone a
+    DistribcellFilter on the shared fuel cell is much cheaper, see
+    create_fuel_distribcell_filters.
     """
-    fuel_pin_univ = create_pin_cell_universe(uo2, zirc, water)
-    water_univ = create_water_universe(water)
-    lattice = create_assembly_lattice(fuel_pin_univ, water_univ, pitch, size)
+    if differentiate:
+        return _build_assembly_universe(
+            uo2, zirc, water, pitch, size, wall_thickness, gap_thickness,
+            fuel_radius, cladding_radius, differentiate=True
+        )
+    key = ('assembly', uo2.id, zirc.id, water.id, float(pitch), int(size),
+           float(wall_thickness), float(gap_thickness),
+           float(fuel_radius), float(cladding_radius))
+    return intern(key, lambda: _build_assembly_universe(
+        uo2, zirc, water, pitch, size, wall_thickness, gap_thickness,
+        fuel_radius, cladding_radius
+    ))
+
+def _build_assembly_universe(
+        uo2, zirc, water, pitch, size, wall_thickness, gap_thickness,
+        fuel_radius, cladding_radius, differentiate=False
+):
+    if differentiate:
+        lattice = _build_differentiated_assembly_lattice(
+            uo2, zirc, water, pitch, size, fuel_radius, cladding_radius
+        )
+    else:
+        fuel_pin_univ = create_pin_cell_universe(
+            uo2, zirc, water, fuel_radius, cladding_radius
+        )
+        water_univ = create_water_universe(water)
+        lattice = create_assembly_lattice(fuel_pin_univ, water_univ, pitch, size)
     
     # Define assembly regions
     lattice_width = pitch * size
@@ -148,63 +258,244 @@ def create_assembly_universe(
     assy_univ.add_cells([lattice_cell, wall_cell, gap_cell])
     return assy_univ
 
+# Number of copies of the modelled sector that make up the full core
+SYMMETRY_FOLDS = {'full': 1, 'quarter': 4, 'octant': 8}
+
+def _check_symmetry(symmetry):
+    if symmetry not in SYMMETRY_FOLDS:
+        raise ValueError(
+            f"symmetry must be one of {sorted(SYMMETRY_FOLDS)}, got {symmetry!r}"
+        )
+
+def check_core_map_symmetry(core_map, symmetry):
+    """Raises ValueError if core_map lacks the requested symmetry.
+
+    Quarter symmetry requires the map to be mirror-symmetric about both
+    axes; octant symmetry additionally requires it to equal its transpose.
+    """
+    _check_symmetry(symmetry)
+    core_map = np.asarray(core_map)
+    symmetric = True
+    if symmetry in ('quarter', 'octant'):
+        symmetric = (np.array_equal(core_map, core_map[::-1, :]) and
+                     np.array_equal(core_map, core_map[:, ::-1]))
+    if symmetry == 'octant':
+        symmetric = symmetric and np.array_equal(core_map, core_map.T)
+    if not symmetric:
+        raise ValueError(f"core_map does not have {symmetry} symmetry")
+
+def unfold_symmetric_tally(values, symmetry, normalize=True):
+    """Maps a mesh tally from a reduced-symmetry core back to the full core.
+
+    values holds mesh results of shape (..., ny, nx) for a mesh covering the
+    sector x >= 0, y >= 0 of a quarter or octant model, with y increasing
+    along the row axis (the layout of a MeshFilter mean reshaped to the
+    reversed mesh dimension).  For an octant the bins above the diagonal
+    are filled from their mirror image; diagonal bins, which the cut plane
+    splits in half, are doubled.  The result has shape (..., 2*ny, 2*nx).
+
+    Every source particle of a reduced model lands in the modelled sector,
+    so its tallies are SYMMETRY_FOLDS[symmetry] times the full-core values;
+    normalize divides that factor out.  The mapping is linear and mirrored
+    bins are fully correlated, so it applies to std. dev. as well.
+    """
+    _check_symmetry(symmetry)
+    values = np.asarray(values, dtype=float)
+    if symmetry == 'full':
+        return values.copy()
+
+    if symmetry == 'octant':
+        values = values + np.swapaxes(values, -1, -2)
+    half = np.concatenate([values[..., :, ::-1], values], axis=-1)
+    full = np.concatenate([half[..., ::-1, :], half], axis=-2)
+    if normalize:
+        full /= SYMMETRY_FOLDS[symmetry]
+    return full
+
+# Clearance between the outermost assembly corner and the barrel (cm)
+BARREL_MARGIN = 1.0
+# Distance from the barrel outer surface to the square world boundary (cm)
+WORLD_MARGIN = 10.0
+
+CoreMetrics = namedtuple('CoreMetrics', [
+    'barrel_radius', 'fuel_radius', 'effective_radius', 'fuel_half_width',
+    'center_distances', 'corner_distances'
+])
+
+def _center_offsets(grid_size, assy_pitch):
+    """Returns |x| (= |y|) of assembly centers along one grid axis."""
+    half = (grid_size - 1) / 2.0
+    return np.abs(np.arange(grid_size) - half) * assy_pitch
+
+def _corner_distances(grid_size, assy_pitch):
+    """Returns the outer-corner distance of every grid position.
+
+    The result is a (grid_size, grid_size) array indexed like a core map
+    (row 0 at the top), holding the distance from the core center to the
+    farthest corner of each assembly.
+    """
+    offsets = _center_offsets(grid_size, assy_pitch) + assy_pitch / 2.0
+    return np.sqrt(offsets[:, np.newaxis] ** 2 + offsets[np.newaxis, :] ** 2)
+
+@functools.lru_cache(maxsize=1024)
+def _core_map_metrics(shape, map_bytes, assy_pitch):
+    fuel = np.frombuffer(map_bytes, dtype=bool).reshape(shape)
+    grid_size = shape[0]
+
+    offsets = _center_offsets(grid_size, assy_pitch)
+    center_distances = np.hypot(offsets[:, np.newaxis], offsets[np.newaxis, :])
+    corner_distances = _corner_distances(grid_size, assy_pitch)
+    center_distances.flags.writeable = False
+    corner_distances.flags.writeable = False
+
+    n_fuel = np.count_nonzero(fuel)
+    if n_fuel:
+        fuel_radius = float(corner_distances[fuel].max())
+        fuel_half_width = float(np.maximum(
+            offsets[:, np.newaxis], offsets[np.newaxis, :]
+        )[fuel].max()) + assy_pitch / 2.0
+    else:
+        fuel_radius = fuel_half_width = 0.0
+
+    return CoreMetrics(
+        barrel_radius=fuel_radius + BARREL_MARGIN,
+        fuel_radius=fuel_radius,
+        effective_radius=math.sqrt(n_fuel / math.pi) * assy_pitch,
+        fuel_half_width=fuel_half_width,
+        center_distances=center_distances,
+        corner_distances=corner_distances,
+    )
+
+def core_map_metrics(core_map, assy_pitch):
+    """Returns the radial metrics of a core map in one vectorized pass.
+
+    Nonzero map entries count as fuel.  The result is a CoreMetrics with:
+    - barrel_radius: smallest barrel inner radius that clips no assembly
+      (fuel_radius plus BARREL_MARGIN)
+    - fuel_radius: distance to the farthest fuel assembly corner
+    - effective_radius: radius of a circle with the total fuel area
+    - fuel_half_width: half-width of the smallest centered square holding
+      all fuel assemblies
+    - center_distances, corner_distances: read-only arrays indexed like
+      core_map with the center and farthest-corner distance of every
+      position
+
+    Metrics are cached on the map contents and assy_pitch, so the map
+    generator and the core builder share one computation per layout.
+    """
+    fuel = np.asarray(core_map) != 0
+    return _core_map_metrics(fuel.shape, fuel.tobytes(), float(assy_pitch))
+
+def core_bounds(core_map, assy_pitch, extent='fuel',
+                barrel_ir=None, barrel_thickness=5.0):
+    """Returns the tightest centered (lower_left, upper_right) xy bounds.
+
+    extent selects what the box must enclose: 'fuel' the fuel assemblies,
+    'barrel' the outer barrel surface, or 'world' the full geometry built
+    by create_core_geometry.  Use it to fit tally meshes to the region of
+    interest instead of the whole world.  barrel_ir defaults to the
+    automatic barrel radius.
+    """
+    metrics = core_map_metrics(core_map, assy_pitch)
+    if barrel_ir is None:
+        barrel_ir = metrics.barrel_radius
+    if extent == 'fuel':
+        half_width = metrics.fuel_half_width
+    elif extent == 'barrel':
+        half_width = barrel_ir + barrel_thickness
+    elif extent == 'world':
+        half_width = barrel_ir + barrel_thickness + WORLD_MARGIN
+    else:
+        raise ValueError(f"extent must be 'fuel', 'barrel' or 'world', got {extent!r}")
+    return (-half_width, -half_width), (half_width, half_width)
+
+@functools.lru_cache(maxsize=1024)
+def _circular_core_mask(grid_size, assy_pitch, target_assemblies, symmetric=False):
+    """Selects the target_assemblies positions closest to the core center.
+
+    Ties are broken by position in row-major order, matching a stable sort
+    on (corner_dist, i, j).  With symmetric=True a group of positions at the
+    same distance is either taken whole or left out, whichever count lands
+    closer to the target, so the layout keeps its eight-fold symmetry.
+    Returns a read-only int8 map.  Results are memoized, so callers must
+    copy the map before modifying it.
+    """
+    dist = _corner_distances(grid_size, assy_pitch).ravel()
+    n_total = dist.size
+
+    if target_assemblies >= n_total:
+        selected = np.ones(n_total, dtype=bool)
+    else:
+        # Partial selection: only the value of the N-th nearest position is
+        # needed, everything strictly closer is in, ties are filled in order
+        kth = dist[np.argpartition(dist, target_assemblies - 1)[target_assemblies - 1]]
+        selected = dist < kth
+        n_ties = target_assemblies - np.count_nonzero(selected)
+        tied = np.flatnonzero(dist == kth)
+        if symmetric:
+            n_below = np.count_nonzero(selected)
+            n_ties = tied.size if (
+                n_below == 0 or n_below + tied.size - target_assemblies < n_ties
+            ) else 0
+        selected[tied[:n_ties]] = True
+
+    core_map = selected.astype(np.int8).reshape(grid_size, grid_size)
+    core_map.flags.writeable = False
+    return core_map
+
 def generate_circular_core_map(
-        grid_size, assy_pitch, target_assemblies=None
+        grid_size, assy_pitch, target_assemblies=None,
+        as_array=False, symmetry='full'
 ):
     """Generates a circular core map on a square grid.
 
     Selects the closest assemblies to the center to create a roughly
     circular core layout. Returns (core_map, barrel_radius) where:
-    - core_map: 2D list where 1 = fuel assembly, 0 = reflector
+    - core_map: 2D list where 1 = fuel assembly, 0 = reflector, or an
+      int8 NumPy array of the same layout when as_array is True
     - barrel_radius: minimum radius to enclose all fuel assemblies
+
+    Results are cached on (grid_size, assy_pitch, target_assemblies), so
+    parametric sweeps over the same grids only pay for each layout once.
+
+    With symmetry='quarter' or 'octant' the number of assemblies is rounded
+    to the nearest symmetric loading, so the map can be passed to
+    create_core_geometry with the same symmetry.
     """
-    half = (grid_size - 1) / 2.0
-    max_corner_dist = 0.0
-
-    # Calculate distance for each grid position
-    positions = []
-    for i in range(grid_size):
-        for j in range(grid_size):
-            cx = (j - half) * assy_pitch
-            cy = (half - i) * assy_pitch
-            corner_dist = math.sqrt(
-                (abs(cx) + assy_pitch / 2.0) ** 2 +
-                (abs(cy) + assy_pitch / 2.0) ** 2
-            )
-            positions.append((corner_dist, i, j))
-
-    # Select closest N assemblies
-    positions.sort()
-    target_assemblies = min(target_assemblies or len(positions), len(positions))
-
-    selected = set()
-    for k in range(target_assemblies):
-        corner_dist, i, j = positions[k]
-        selected.add((i, j))
-        max_corner_dist = max(max_corner_dist, corner_dist)
-
-    # Build core map
-    core_map = []
-    for i in range(grid_size):
-        row = [1 if (i, j) in selected else 0 for j in range(grid_size)]
-        core_map.append(row)
-
-    barrel_inner_radius = max_corner_dist + 1.0
+    _check_symmetry(symmetry)
+    n_total = grid_size * grid_size
+    target_assemblies = min(target_assemblies or n_total, n_total)
+
+    core_map = _circular_core_mask(
+        int(grid_size), float(assy_pitch), int(target_assemblies),
+        symmetry != 'full'
+    )
+    barrel_inner_radius = core_map_metrics(core_map, assy_pitch).barrel_radius
+
+    core_map = core_map.copy() if as_array else core_map.tolist()
     return core_map, barrel_inner_radius
 
 
+@scoped
 def create_core_geometry(
         uo2, zirc, water, steel, air,
         core_map,
         pitch=1.26, assy_size=17,
         wall_thickness=0.2, gap_thickness=0.1,
         barrel_ir=None, barrel_thickness=5.0,
-        height=400.0
+        height=400.0, symmetry='full',
+        assembly_types=None,
+        fuel_radius=0.39, cladding_radius=0.45,
+        differentiate=False, axial_layers=None
 ):
     """Creates a full core geometry with a cylindrical steel barrel and air.
 
     Parameters
     ----------
+    core_map : 2D list or numpy.ndarray of int
+        Loading map where 0 = reflector and k >= 1 places assembly type k.
+        With axial_layers it only sizes the barrel, and may be None to use
+        the positions loaded in any layer.
     steel : openmc.Material
         Reactor vessel / barrel material.
     air : openmc.Material
@@ -216,34 +507,106 @@ def create_core_geometry(
         Thickness of the steel barrel (cm).
     height : float
         Axial height of the core geometry (cm).
+    symmetry : {'full', 'quarter', 'octant'}
+        Portion of the core to model.  'quarter' keeps x >= 0, y >= 0 and
+        'octant' keeps 0 <= y <= x, with reflective cut planes on the
+        symmetry lines.  The lattice and barrel sizing are those of the
+        full core; core_map must have the requested symmetry.  Use
+        unfold_symmetric_tally to map mesh tallies back to the full core.
+    assembly_types : sequence or None
+        Assembly type table for heterogeneous loadings; entry k - 1 defines
+        type k.  Each entry is either a ready-made universe or a dict of
+        keyword arguments overriding those passed to
+        create_assembly_universe, e.g. ``{'uo2': fuel_31}`` for an
+        enrichment zone.  Each type is built once.  When None, every
+        nonzero entry of core_map gets the assembly built from uo2, zirc
+        and water.
+    differentiate : bool
+        Give every fuel pin in every core position its own fuel material
+        (see create_assembly_universe).  Check the size of the result with
+        estimate_memory before exporting: a 177-assembly core has ~46k
+        fuel materials.
+    axial_layers : sequence or None
+        Axial zones as ``[((z_lo, z_hi), loading_map), ...]`` from bottom
+        to top, each zone with its own loading map over the assembly type
+        table (e.g. a plenum type above the fuel).  Zones must be
+        contiguous and replace height.  Zones with equal loading maps
+        share one lattice, so only zones that differ add universes; with
+        differentiate every zone gets its own fuel materials.
     """
+    if axial_layers is not None:
+        if len(axial_layers) == 0:
+            raise ValueError("axial_layers must hold at least one layer")
+        layer_maps = [np.asarray(layer_map, dtype=int) for _, layer_map in axial_layers]
+        layer_bounds = [(float(z_lo), float(z_hi)) for (z_lo, z_hi), _ in axial_layers]
+        for (_, z_hi), (z_lo, _) in zip(layer_bounds[:-1], layer_bounds[1:]):
+            if z_hi != z_lo:
+                raise ValueError("Axial layers must be contiguous and sorted from the bottom")
+        if any(z_hi <= z_lo for z_lo, z_hi in layer_bounds):
+            raise ValueError("Every axial layer needs z_lo < z_hi")
+        if core_map is None:
+            core_map = np.max(layer_maps, axis=0)
+        if any(layer_map.shape != np.shape(core_map) for layer_map in layer_maps):
+            raise ValueError("Layer loading maps must have the shape of core_map")
+        for layer_map in layer_maps:
+            check_core_map_symmetry(layer_map, symmetry)
+    else:
+        layer_maps = [core_map]
+        layer_bounds = [(-height/2, height/2)]
+    check_core_map_symmetry(core_map, symmetry)
+
     assy_inner_pitch = pitch * assy_size
     assy_pitch = assy_inner_pitch + 2 * (wall_thickness + gap_thickness)
 
-    assy_univ = create_assembly_universe(
-        uo2, zirc, water, pitch, assy_size, wall_thickness, gap_thickness
+    assembly_kwargs = dict(
+        uo2=uo2, zirc=zirc, water=water, pitch=pitch, size=assy_size,
+        wall_thickness=wall_thickness, gap_thickness=gap_thickness,
+        fuel_radius=fuel_radius, cladding_radius=cladding_radius
     )
+    if assembly_types is None:
+        assembly_types = [{}]
+    type_kwargs = [
+        assy_type if isinstance(assy_type, openmc.Universe)
+        else dict(assembly_kwargs, **assy_type)
+        for assy_type in assembly_types
+    ]
     reflector_univ = create_water_universe(water)
 
-    lattice = create_core_lattice(assy_univ, reflector_univ, core_map, assy_pitch)
-
-    grid_size = len(core_map)
+    def build_lattice(loading_map):
+        if not differentiate:
+            assy_univs = [
+                kwargs if isinstance(kwargs, openmc.Universe)
+                else create_assembly_universe(**kwargs)
+                for kwargs in type_kwargs
+            ]
+            return create_core_lattice(assy_univs, reflector_univ, loading_map, assy_pitch)
+
+        # One assembly universe, and so one set of fuel materials, per position
+        loading_map = np.asarray(loading_map, dtype=int)
+        positions = np.argwhere(loading_map != 0)
+        assy_univs = []
+        for i, j in positions:
+            kwargs = type_kwargs[loading_map[i, j] - 1]
+            if isinstance(kwargs, openmc.Universe):
+                raise ValueError("Cannot differentiate a prebuilt assembly universe")
+            assy_univs.append(create_assembly_universe(**kwargs, differentiate=True))
+        position_map = np.zeros_like(loading_map)
+        position_map[tuple(positions.T)] = np.arange(1, len(positions) + 1)
+        return create_core_lattice(assy_univs, reflector_univ, position_map, assy_pitch)
+
+    # Layers with the same loading map share a lattice
+    lattices = {}
+    layer_lattices = []
+    for layer_map in layer_maps:
+        layer_map = np.asarray(layer_map, dtype=int)
+        key = (layer_map.shape, layer_map.tobytes())
+        if differentiate or key not in lattices:
+            lattices[key] = build_lattice(layer_map)
+        layer_lattices.append(lattices[key])
 
     # Auto-compute barrel inner radius if not provided
     if barrel_ir is None:
-        half = (grid_size - 1) / 2.0
-        max_corner = 0.0
-        for i in range(grid_size):
-            for j in range(grid_size):
-                if core_map[i][j] == 1:
-                    cx = (j - half) * assy_pitch
-                    cy = (half - i) * assy_pitch
-                    corner_dist = math.sqrt(
-                        (abs(cx) + assy_pitch / 2.0) ** 2 +
-                        (abs(cy) + assy_pitch / 2.0) ** 2
-                    )
-                    max_corner = max(max_corner, corner_dist)
-        barrel_ir = max_corner + 1.0
+        barrel_ir = core_map_metrics(core_map, assy_pitch).barrel_radius
 
     barrel_or = barrel_ir + barrel_thickness
 
@@ -252,23 +615,58 @@ def create_core_geometry(
     barrel_outer_cyl = openmc.ZCylinder(r=barrel_or, name='barrel_outer')
 
     # Z-planes for axial boundaries
-    z_min = openmc.ZPlane(z0=-height/2, boundary_type='vacuum', name='z_min')
-    z_max = openmc.ZPlane(z0=height/2, boundary_type='vacuum', name='z_max')
+    z_bottom, z_top = layer_bounds[0][0], layer_bounds[-1][1]
+    z_min = openmc.ZPlane(z0=z_bottom, boundary_type='vacuum', name='z_min')
+    z_max = openmc.ZPlane(z0=z_top, boundary_type='vacuum', name='z_max')
 
     # Square world boundary (just outside barrel)
-    world_half = barrel_or + 10.0  # 10 cm margin
+    world_half = barrel_or + WORLD_MARGIN
     world_prism = openmc.model.RectangularPrism(
         width=2 * world_half, height=2 * world_half,
         boundary_type='vacuum'
     )
 
-    # Cells
-    core_cell = openmc.Cell(name='core', fill=lattice,
-                            region=-barrel_inner_cyl & +z_min & -z_max)
+    # Reflective cut planes for reduced-symmetry models
+    cuts = None
+    if symmetry == 'quarter':
+        x_cut = openmc.XPlane(x0=0.0, boundary_type='reflective', name='x_cut')
+        y_cut = openmc.YPlane(y0=0.0, boundary_type='reflective', name='y_cut')
+        cuts = +x_cut & +y_cut
+    elif symmetry == 'octant':
+        y_cut = openmc.YPlane(y0=0.0, boundary_type='reflective', name='y_cut')
+        diagonal_cut = openmc.Plane(a=-1.0, b=1.0, c=0.0, d=0.0,
+                                    boundary_type='reflective', name='diagonal_cut')
+        cuts = +y_cut & -diagonal_cut
+
+    def slab(lower, upper):
+        region = +lower & -upper
+        return region if cuts is None else region & cuts
+
+    axial = slab(z_min, z_max)
+
+    # Cells: one core cell per axial layer, all named 'core'
+    planes = [z_min] + [_zplane(z_hi) for _, z_hi in layer_bounds[:-1]] + [z_max]
+    core_cells = [
+        openmc.Cell(name='core', fill=layer_lattice,
+                    region=-barrel_inner_cyl & slab(lower, upper))
+        for layer_lattice, lower, upper in zip(layer_lattices, planes[:-1], planes[1:])
+    ]
     barrel_cell = openmc.Cell(name='barrel', fill=steel,
-                              region=+barrel_inner_cyl & -barrel_outer_cyl & +z_min & -z_max)
+                              region=+barrel_inner_cyl & -barrel_outer_cyl & axial)
     air_cell = openmc.Cell(name='air', fill=air,
-                           region=+barrel_outer_cyl & -world_prism & +z_min & -z_max)
+                           region=+barrel_outer_cyl & -world_prism & axial)
 
-    root_universe = openmc.Universe(cells=[core_cell, barrel_cell, air_cell])
+    root_universe = openmc.Universe(cells=core_cells + [barrel_cell, air_cell])
     return openmc.Geometry(root_universe)
+
+def create_fuel_distribcell_filters(geometry):
+    """Returns a DistribcellFilter for each fuel cell of geometry.
+
+    A distribcell filter scores every instance of a repeated cell in its
+    own bin, which gives per-pin tallies without cloning any material.
+    Use it instead of differentiate=True when no per-pin depletion is
+    needed.
+    """
+    return [openmc.DistribcellFilter(cell)
+            for cell in geometry.get_all_cells().values()
+            if cell.name == 'fuel']
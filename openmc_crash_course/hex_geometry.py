@@ -0,0 +1,310 @@
+"""Hexagonal lattice versions of the assembly and core builders.
+
+The builders mirror those in geometry.py for VVER-style cores built on
+openmc.HexLattice:
+
+- Pin lattices use orientation 'y' (lattice rows along y, pins stacked
+  vertically), so the assembly outline is a hexagon with two flat sides
+  parallel to the y-axis.
+- Such assemblies tile a core lattice with orientation 'x'.
+
+Hex maps are flat integer arrays in HexLattice order: rings from the
+outermost to the center, each ring starting at its first position and
+running clockwise (directly above the center for orientation 'y', directly
+to its right for 'x').  hex_ring_positions gives the coordinates of every
+map entry, computed for all rings at once.  Universes and surfaces are
+interned in the same registry as the square builders.
+"""
+import functools
+import math
+
+import numpy as np
+import openmc
+
+from .geometry import (
+    BARREL_MARGIN,
+    WORLD_MARGIN,
+    create_pin_cell_universe,
+    create_water_universe
+)
+from .registry import intern, scoped
+
+# Angles (deg) of the six ring corners, clockwise from the first position
+_CORNER_ANGLES = {
+    'y': (90.0, 30.0, -30.0, -90.0, -150.0, 150.0),
+    'x': (0.0, -60.0, -120.0, 180.0, 120.0, 60.0),
+}
+
+def hex_ring_size(n_rings):
+    """Returns the number of positions in a hex lattice with n_rings rings."""
+    return 3 * n_rings * (n_rings - 1) + 1
+
+@functools.lru_cache(maxsize=64)
+def _ring_layout(n_rings, orientation):
+    if orientation not in _CORNER_ANGLES:
+        raise ValueError(f"orientation must be 'x' or 'y', got {orientation!r}")
+    # Ring and in-ring index of every position, outermost ring first
+    rings = np.arange(n_rings - 1, -1, -1)
+    sizes = np.maximum(6 * rings, 1)
+    ring = np.repeat(rings, sizes)
+    starts = np.cumsum(sizes) - sizes
+    index = np.arange(len(ring)) - np.repeat(starts, sizes)
+
+    corners = np.radians(_CORNER_ANGLES[orientation])
+    corners = np.column_stack([np.cos(corners), np.sin(corners)])
+    safe_ring = np.maximum(ring, 1)
+    side, step = np.divmod(index, safe_ring)
+    start = corners[side % 6]
+    end = corners[(side + 1) % 6]
+    xy = ring[:, np.newaxis] * (start + (step / safe_ring)[:, np.newaxis] * (end - start))
+    for array in (ring, index, xy):
+        array.flags.writeable = False
+    return ring, index, xy
+
+def hex_ring_positions(n_rings, pitch=1.0, orientation='y'):
+    """Returns (ring, index, xy) for every position of a hex lattice.
+
+    All arrays follow HexLattice order (outermost ring first).  ring is
+    the ring number (0 at the center), index the position within its
+    ring and xy the (N, 2) center coordinates for the given pitch.
+    """
+    ring, index, xy = _ring_layout(int(n_rings), orientation)
+    return ring, index, xy * pitch
+
+def _split_rings(flat, n_rings):
+    """Splits a flat HexLattice-ordered sequence into nested rings."""
+    sizes = np.maximum(6 * np.arange(n_rings - 1, -1, -1), 1)
+    bounds = np.cumsum(sizes) - sizes
+    return [list(flat[lo:lo + size]) for lo, size in zip(bounds, sizes)]
+
+def _n_rings(n_positions):
+    """Returns the number of rings of a flat hex map, checking its size."""
+    n_rings = int(round((3 + math.sqrt(12 * n_positions - 3)) / 6))
+    if hex_ring_size(n_rings) != n_positions:
+        raise ValueError(f"{n_positions} is not the size of a full hex lattice")
+    return n_rings
+
+def hex_guide_tube_mask(n_rings):
+    """Returns a flat boolean mask that is True at guide tube positions.
+
+    The VVER-like pattern has a central tube, tubes at the six corners of
+    ring 3, and at the corners and side midpoints of ring 6, e.g. 19 tubes
+    and 312 fuel pins for 11 rings.
+    """
+    ring, index, _ = _ring_layout(int(n_rings), 'y')
+    mask = ring == 0
+    mask |= (ring == 3) & (index % 3 == 0)
+    mask |= (ring == 6) & (index % 3 == 0)
+    return mask
+
+def _hex_apothem(n_rings, pitch):
+    """Distance from the center to the flat sides of a pin lattice."""
+    return (n_rings - 1) * pitch * math.sqrt(3) / 2 + pitch / 2
+
+def hex_assembly_pitch(pitch=1.275, n_rings=11, wall_thickness=0.2, gap_thickness=0.1):
+    """Returns the flat-to-flat pitch of hex assemblies in a core lattice."""
+    return 2 * (_hex_apothem(n_rings, pitch) + wall_thickness + gap_thickness)
+
+def create_hex_assembly_lattice(fuel_pin_univ, water_univ, pitch=1.275, n_rings=11):
+    """Creates a hex fuel assembly lattice with guide tubes.
+
+    The lattice has orientation 'y' and n_rings rings of pins, with water
+    guide tubes laid out by hex_guide_tube_mask.
+    """
+    key = ('hex_assembly_lattice', fuel_pin_univ.id, water_univ.id,
+           float(pitch), int(n_rings))
+    return intern(key, lambda: _build_hex_assembly_lattice(
+        fuel_pin_univ, water_univ, pitch, n_rings
+    ))
+
+def _build_hex_assembly_lattice(fuel_pin_univ, water_univ, pitch, n_rings):
+    universes = np.full(hex_ring_size(n_rings), fuel_pin_univ, dtype=object)
+    universes[hex_guide_tube_mask(n_rings)] = water_univ
+
+    lattice = openmc.HexLattice()
+    lattice.center = (0.0, 0.0)
+    lattice.pitch = (pitch,)
+    lattice.orientation = 'y'
+    lattice.universes = _split_rings(universes, n_rings)
+    lattice.outer = water_univ
+    return lattice
+
+def create_hex_assembly_universe(
+        uo2, zirc, water,
+        pitch=1.275, n_rings=11,
+        wall_thickness=0.2, gap_thickness=0.1,
+        fuel_radius=0.3785, cladding_radius=0.455
+):
+    """Creates a hexagonal fuel assembly universe.
+
+    Structure (from inside to outside):
+    1. Hex lattice of fuel pins with guide tubes (n_rings rings)
+    2. Zircaloy hexagonal wall
+    3. Water gap between assemblies
+    """
+    key = ('hex_assembly', uo2.id, zirc.id, water.id, float(pitch), int(n_rings),
+           float(wall_thickness), float(gap_thickness),
+           float(fuel_radius), float(cladding_radius))
+    return intern(key, lambda: _build_hex_assembly_universe(
+        uo2, zirc, water, pitch, n_rings, wall_thickness, gap_thickness,
+        fuel_radius, cladding_radius
+    ))
+
+def _build_hex_assembly_universe(
+        uo2, zirc, water, pitch, n_rings, wall_thickness, gap_thickness,
+        fuel_radius, cladding_radius
+):
+    fuel_pin_univ = create_pin_cell_universe(uo2, zirc, water, fuel_radius, cladding_radius)
+    water_univ = create_water_universe(water)
+    lattice = create_hex_assembly_lattice(fuel_pin_univ, water_univ, pitch, n_rings)
+
+    # Hexagons with flat sides parallel to y, matching the pin lattice
+    apothem = _hex_apothem(n_rings, pitch)
+    inner_prism = openmc.model.HexagonalPrism(
+        edge_length=2 * apothem / math.sqrt(3), orientation='y'
+    )
+    wall_prism = openmc.model.HexagonalPrism(
+        edge_length=2 * (apothem + wall_thickness) / math.sqrt(3), orientation='y'
+    )
+
+    lattice_cell = openmc.Cell(name='lattice_cell', fill=lattice, region=-inner_prism)
+    wall_cell = openmc.Cell(name='wall_cell', fill=zirc, region=+inner_prism & -wall_prism)
+    gap_cell = openmc.Cell(name='gap_cell', fill=water, region=+wall_prism)
+
+    assy_univ = openmc.Universe(name='Hex Fuel Assembly')
+    assy_univ.add_cells([lattice_cell, wall_cell, gap_cell])
+    return assy_univ
+
+def create_hex_core_lattice(fuel_univ, reflector_univ, core_map, assy_pitch):
+    """Creates a hex core lattice from a flat map of assemblies.
+
+    core_map is a flat integer sequence in HexLattice order (see
+    generate_hex_core_map) where 0 = reflector and k >= 1 selects an
+    assembly type, with fuel_univ a single universe or a sequence as for
+    create_core_lattice.  The lattice has orientation 'x' and
+    flat-to-flat pitch assy_pitch.
+    """
+    loading_map = np.asarray(core_map, dtype=int).ravel()
+    n_rings = _n_rings(loading_map.size)
+    if isinstance(fuel_univ, (list, tuple)):
+        fuel_univs = fuel_univ
+    else:
+        fuel_univs = [fuel_univ]
+    if loading_map.min() < 0 or loading_map.max() > len(fuel_univs):
+        raise ValueError(
+            f"core_map entries must lie in [0, {len(fuel_univs)}] for "
+            f"{len(fuel_univs)} assembly type(s)"
+        )
+
+    universe_table = np.empty(len(fuel_univs) + 1, dtype=object)
+    universe_table[0] = reflector_univ
+    for k, univ in enumerate(fuel_univs, start=1):
+        universe_table[k] = univ
+
+    lattice = openmc.HexLattice()
+    lattice.center = (0.0, 0.0)
+    lattice.pitch = (assy_pitch,)
+    lattice.orientation = 'x'
+    lattice.universes = _split_rings(universe_table[loading_map], n_rings)
+    lattice.outer = reflector_univ
+    return lattice
+
+def _hex_corner_distances(n_rings, assy_pitch):
+    """Returns the farthest-corner distance of every core lattice position."""
+    _, _, centers = hex_ring_positions(n_rings, assy_pitch, 'x')
+    # Assembly hexagons have flat sides parallel to y: corners at 90 + 60k deg
+    angles = np.radians(90.0 + 60.0 * np.arange(6))
+    corners = assy_pitch / math.sqrt(3) * np.column_stack([np.cos(angles), np.sin(angles)])
+    offsets = centers[:, np.newaxis, :] + corners[np.newaxis, :, :]
+    return np.sqrt((offsets ** 2).sum(axis=-1)).max(axis=1)
+
+@functools.lru_cache(maxsize=1024)
+def _circular_hex_core_mask(n_rings, assy_pitch, target_assemblies):
+    """Selects the target_assemblies positions closest to the core center.
+
+    Ties are filled in HexLattice order.  Returns a read-only int8 map.
+    """
+    dist = _hex_corner_distances(n_rings, assy_pitch)
+    if target_assemblies >= dist.size:
+        selected = np.ones(dist.size, dtype=bool)
+    else:
+        kth = dist[np.argpartition(dist, target_assemblies - 1)[target_assemblies - 1]]
+        selected = dist < kth
+        n_ties = target_assemblies - np.count_nonzero(selected)
+        selected[np.flatnonzero(dist == kth)[:n_ties]] = True
+    core_map = selected.astype(np.int8)
+    core_map.flags.writeable = False
+    return core_map
+
+def hex_barrel_radius(core_map, assy_pitch):
+    """Smallest barrel inner radius that clips no assembly of a hex map."""
+    fuel = np.asarray(core_map).ravel() != 0
+    if not fuel.any():
+        return BARREL_MARGIN
+    dist = _hex_corner_distances(_n_rings(fuel.size), assy_pitch)
+    return float(dist[fuel].max()) + BARREL_MARGIN
+
+def generate_hex_core_map(n_rings, assy_pitch, target_assemblies=None, as_array=False):
+    """Generates a circular core map on a hex lattice with n_rings rings.
+
+    Selects the closest assemblies to the center.  Returns (core_map,
+    barrel_radius) where core_map is a flat list (or int8 array when
+    as_array is True) in HexLattice order, 1 = fuel assembly and
+    0 = reflector, and barrel_radius the minimum radius enclosing all fuel
+    assemblies.  Results are cached like generate_circular_core_map.
+    """
+    n_total = hex_ring_size(n_rings)
+    target_assemblies = min(target_assemblies or n_total, n_total)
+    core_map = _circular_hex_core_mask(int(n_rings), float(assy_pitch), int(target_assemblies))
+    barrel_inner_radius = hex_barrel_radius(core_map, assy_pitch)
+    core_map = core_map.copy() if as_array else core_map.tolist()
+    return core_map, barrel_inner_radius
+
+@scoped
+def create_hex_core_geometry(
+        uo2, zirc, water, steel, air,
+        core_map,
+        pitch=1.275, n_pin_rings=11,
+        wall_thickness=0.2, gap_thickness=0.1,
+        barrel_ir=None, barrel_thickness=5.0,
+        height=400.0,
+        fuel_radius=0.3785, cladding_radius=0.455
+):
+    """Creates a hex core geometry with a cylindrical steel barrel and air.
+
+    The hex counterpart of create_core_geometry: core_map is a flat hex
+    map from generate_hex_core_map, and barrel_ir is computed so that no
+    assembly is clipped when None.
+    """
+    assy_pitch = hex_assembly_pitch(pitch, n_pin_rings, wall_thickness, gap_thickness)
+    assy_univ = create_hex_assembly_universe(
+        uo2, zirc, water, pitch, n_pin_rings, wall_thickness, gap_thickness,
+        fuel_radius, cladding_radius
+    )
+    reflector_univ = create_water_universe(water)
+    lattice = create_hex_core_lattice(assy_univ, reflector_univ, core_map, assy_pitch)
+
+    if barrel_ir is None:
+        barrel_ir = hex_barrel_radius(core_map, assy_pitch)
+    barrel_or = barrel_ir + barrel_thickness
+
+    barrel_inner_cyl = openmc.ZCylinder(r=barrel_ir, name='barrel_inner')
+    barrel_outer_cyl = openmc.ZCylinder(r=barrel_or, name='barrel_outer')
+    z_min = openmc.ZPlane(z0=-height/2, boundary_type='vacuum', name='z_min')
+    z_max = openmc.ZPlane(z0=height/2, boundary_type='vacuum', name='z_max')
+    world_half = barrel_or + WORLD_MARGIN
+    world_prism = openmc.model.RectangularPrism(
+        width=2 * world_half, height=2 * world_half,
+        boundary_type='vacuum'
+    )
+    axial = +z_min & -z_max
+
+    core_cell = openmc.Cell(name='core', fill=lattice,
+                            region=-barrel_inner_cyl & axial)
+    barrel_cell = openmc.Cell(name='barrel', fill=steel,
+                              region=+barrel_inner_cyl & -barrel_outer_cyl & axial)
+    air_cell = openmc.Cell(name='air', fill=air,
+                           region=+barrel_outer_cyl & -world_prism & axial)
+
+    root_universe = openmc.Universe(cells=[core_cell, barrel_cell, air_cell])
+    return openmc.Geometry(root_universe)
@@ -0,0 +1,297 @@
+"""Asynchronous manager for concurrent OpenMC runs on one node.
+
+JobManager launches OpenMC subprocesses from asyncio, each with its own
+OMP_NUM_THREADS and pinned to its own set of CPU cores, and never hands
+out more cores than its budget.  Jobs start in submission order as cores
+free up, so a large core case queued behind many small pin-cell cases is
+not starved.  Output is streamed line by line through async iterators,
+and jobs can be cancelled or given a timeout::
+
+    async def main():
+        manager = JobManager(total_cores=32)
+        core = manager.submit('runs/core', cores=24)
+        pins = [manager.submit(d, cores=2) for d in pin_dirs]
+        async for batch in core.batches():
+            print('core batch', batch)
+        return await asyncio.gather(core.wait(), *(job.wait() for job in pins))
+
+The executable is configurable, so a stub script can stand in for openmc.
+"""
+import asyncio
+import itertools
+import os
+import re
+import signal
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from .telemetry import LOG_FILE
+
+JobResult = namedtuple('JobResult', ['state', 'returncode', 'wall_time', 'output'])
+
+# Job states
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+TIMEOUT = 'timeout'
+
+_BATCH_RE = re.compile(r'^\s*(\d+)/\d+\s')
+
+# Seconds between SIGTERM and SIGKILL when stopping a job
+TERMINATE_GRACE = 5.0
+
+
+def _available_cores():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class Job:
+    """One OpenMC run managed by a JobManager.
+
+    Await wait() for its JobResult; iterate lines() or batches() for
+    progress while it runs.
+    """
+
+    def __init__(self, job_id, cwd, cores, args, env, timeout):
+        self.id = job_id
+        self.cwd = Path(cwd)
+        self.cores = cores
+        self.args = args
+        self.env = env
+        self.timeout = timeout
+        self.state = PENDING
+        self.returncode = None
+        self.wall_time = None
+        self.core_ids = ()
+        self._lines = []
+        self._changed = asyncio.Condition()
+        self._process = None
+        self._task = None
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED, CANCELLED, TIMEOUT)
+
+    async def _append(self, line):
+        async with self._changed:
+            self._lines.append(line)
+            self._changed.notify_all()
+
+    async def _set_state(self, state):
+        async with self._changed:
+            self.state = state
+            self._changed.notify_all()
+
+    async def lines(self):
+        """Yields output lines as they are printed, from the first one."""
+        index = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: index < len(self._lines) or self.finished
+                )
+                new = self._lines[index:]
+                done = self.finished
+            for line in new:
+                yield line
+            index += len(new)
+            if done and index == len(self._lines):
+                return
+
+    async def batches(self):
+        """Yields the number of every batch OpenMC reports as finished."""
+        async for line in self.lines():
+            match = _BATCH_RE.match(line)
+            if match:
+                yield int(match.group(1))
+
+    def cancel(self):
+        """Stops the job; a pending job never starts."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def wait(self):
+        """Waits for the job to end and returns its JobResult."""
+        try:
+            await asyncio.shield(self._task)
+        except asyncio.CancelledError:
+            if not self._task.cancelled():
+                raise
+        return self.result()
+
+    def result(self):
+        return JobResult(self.state, self.returncode, self.wall_time,
+                         ''.join(self._lines))
+
+
+class JobManager:
+    """Runs OpenMC jobs concurrently within a budget of CPU cores.
+
+    Parameters
+    ----------
+    total_cores : int or None
+        Cores shared by all jobs; defaults to every core this process may
+        run on.
+    openmc_exec : str
+        OpenMC executable, or a stub with the same command line.
+    pin : bool
+        Pin every job to its cores with sched_setaffinity, where the
+        platform supports it.
+    log_file : str or None
+        Name of the file each job's output is saved to in its directory.
+    """
+
+    def __init__(self, total_cores=None, openmc_exec='openmc', pin=True, log_file=LOG_FILE):
+        cores = _available_cores()
+        if total_cores is not None:
+            if total_cores > len(cores):
+                raise ValueError(f"Only {len(cores)} cores available, {total_cores} requested")
+            cores = cores[:total_cores]
+        self.total_cores = len(cores)
+        self.openmc_exec = openmc_exec
+        self.pin = pin and hasattr(os, 'sched_setaffinity')
+        self.log_file = log_file
+        self.jobs = []
+        self._free = set(cores)
+        self._queue = []
+        self._cores_changed = None
+        self._ids = itertools.count(1)
+
+    @property
+    def free_cores(self):
+        return len(self._free)
+
+    def submit(self, cwd, cores=1, threads=None, timeout=None, mpi_args=None,
+               extra_args=(), env=None):
+        """Queues an OpenMC run in cwd and returns its Job.
+
+        Must be called from a running event loop.
+
+        Parameters
+        ----------
+        cwd : path-like
+            Directory with the exported model.
+        cores : int
+            Cores reserved for the job while it runs.
+        threads : int or None
+            OpenMP threads, passed as OMP_NUM_THREADS and ``-s``; defaults
+            to cores.
+        timeout : float or None
+            Seconds the job may run before it is stopped.
+        mpi_args : sequence of str or None
+            Launcher prefix, e.g. ['mpiexec', '-n', '4'].
+        extra_args : sequence of str
+            Further command line arguments for the executable.
+        env : dict or None
+            Extra environment variables.
+        """
+        if cores < 1 or cores > self.total_cores:
+            raise ValueError(f"A job needs 1 to {self.total_cores} cores, got {cores}")
+        if self._cores_changed is None:
+            self._cores_changed = asyncio.Condition()
+
+        threads = cores if threads is None else threads
+        args = [self.openmc_exec, '-s', str(threads)] + list(extra_args)
+        if mpi_args is not None:
+            args = list(mpi_args) + args
+        job_env = dict(os.environ, OMP_NUM_THREADS=str(threads), **(env or {}))
+
+        job = Job(next(self._ids), cwd, cores, args, job_env, timeout)
+        self.jobs.append(job)
+        self._queue.append(job)
+        job._task = asyncio.ensure_future(self._run(job))
+        return job
+
+    async def _acquire(self, job):
+        async with self._cores_changed:
+            await self._cores_changed.wait_for(
+                lambda: self._queue[0] is job and len(self._free) >= job.cores
+            )
+            self._queue.pop(0)
+            job.core_ids = tuple(sorted(self._free)[:job.cores])
+            self._free.difference_update(job.core_ids)
+            # The next job in line may fit in what is left
+            self._cores_changed.notify_all()
+
+    async def _release(self, job):
+        async with self._cores_changed:
+            if job in self._queue:
+                self._queue.remove(job)
+            self._free.update(job.core_ids)
+            job.core_ids = ()
+            self._cores_changed.notify_all()
+
+    async def _stop(self, process):
+        if process.returncode is not None:
+            return
+        process.send_signal(signal.SIGTERM)
+        try:
+            await asyncio.wait_for(process.wait(), TERMINATE_GRACE)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    async def _run(self, job):
+        state = FAILED
+        start = None
+        try:
+            await self._acquire(job)
+            core_ids = set(job.core_ids)
+            preexec = (lambda: os.sched_setaffinity(0, core_ids)) if self.pin else None
+            start = time.perf_counter()
+            job._process = await asyncio.create_subprocess_exec(
+                *job.args, cwd=str(job.cwd), env=job.env,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                preexec_fn=preexec
+            )
+            await job._set_state(RUNNING)
+            try:
+                await asyncio.wait_for(self._communicate(job), job.timeout)
+                state = DONE if job.returncode == 0 else FAILED
+            except asyncio.TimeoutError:
+                await self._stop(job._process)
+                job.returncode = job._process.returncode
+                state = TIMEOUT
+        except asyncio.CancelledError:
+            if job._process is not None:
+                await self._stop(job._process)
+                job.returncode = job._process.returncode
+            state = CANCELLED
+            raise
+        finally:
+            if start is not None:
+                job.wall_time = time.perf_counter() - start
+            await self._release(job)
+            if self.log_file is not None and job._lines:
+                (job.cwd / self.log_file).write_text(''.join(job._lines))
+            await job._set_state(state)
+
+    async def _communicate(self, job):
+        async for raw in job._process.stdout:
+            await job._append(raw.decode(errors='replace'))
+        job.returncode = await job._process.wait()
+
+    async def wait_all(self):
+        """Waits for every submitted job and returns their JobResults."""
+        return await asyncio.gather(*(job.wait() for job in self.jobs))
+
+    def cancel_all(self):
+        for job in self.jobs:
+            job.cancel()
+
+
+async def run_jobs(directories, cores=1, total_cores=None, openmc_exec='openmc', **kwargs):
+    """Runs OpenMC in every directory with a shared core budget.
+
+    Returns the JobResults in the order of directories; kwargs are passed
+    on to JobManager.submit.
+    """
+    manager = JobManager(total_cores=total_cores, openmc_exec=openmc_exec)
+    for directory in directories:
+        manager.submit(directory, cores=cores, **kwargs)
+    return await manager.wait_all()
@@ -0,0 +1,220 @@
+"""Vectorized point location and volume estimates for pre-run checks.
+
+Locator walks an openmc.Geometry in pure Python/NumPy: regions built from
+planes, axis-aligned cylinders and spheres (including RectangularPrism
+regions), universes, and rectangular lattices.  Whole arrays of points are
+classified per cell at once, so millions of points can be located in about
+a second without cross sections or the OpenMC shared library.  This makes
+it cheap to check a model before a run, e.g. that no fuel lies outside the
+barrel or that material volumes match their intended values.
+"""
+from collections import namedtuple
+
+import numpy as np
+import openmc
+
+# Material id reported for points in void cells and for points in no cell
+VOID = 0
+LOST = -1
+
+VolumeEstimate = namedtuple('VolumeEstimate', ['volume', 'std_dev'])
+
+
+def _evaluate_surface(surface, xyz):
+    """Evaluates the surface equation f(x, y, z) for an (N, 3) array."""
+    x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+    kind = surface.type
+    if kind == 'x-plane':
+        return x - surface.x0
+    if kind == 'y-plane':
+        return y - surface.y0
+    if kind == 'z-plane':
+        return z - surface.z0
+    if kind == 'plane':
+        return surface.a * x + surface.b * y + surface.c * z - surface.d
+    if kind == 'z-cylinder':
+        return (x - surface.x0) ** 2 + (y - surface.y0) ** 2 - surface.r ** 2
+    if kind == 'x-cylinder':
+        return (y - surface.y0) ** 2 + (z - surface.z0) ** 2 - surface.r ** 2
+    if kind == 'y-cylinder':
+        return (x - surface.x0) ** 2 + (z - surface.z0) ** 2 - surface.r ** 2
+    if kind == 'sphere':
+        return ((x - surface.x0) ** 2 + (y - surface.y0) ** 2 +
+                (z - surface.z0) ** 2 - surface.r ** 2)
+    # Anything else falls back to OpenMC's scalar evaluation
+    return np.array([surface.evaluate(point) for point in xyz])
+
+
+def _evaluate_region(region, xyz):
+    """Returns a boolean mask of the points of xyz inside region."""
+    if region is None:
+        return np.ones(len(xyz), dtype=bool)
+    if isinstance(region, openmc.Halfspace):
+        values = _evaluate_surface(region.surface, xyz)
+        return values > 0.0 if region.side == '+' else values < 0.0
+    if isinstance(region, openmc.Intersection):
+        mask = np.ones(len(xyz), dtype=bool)
+        for node in region:
+            mask[mask] = _evaluate_region(node, xyz[mask])
+        return mask
+    if isinstance(region, openmc.Union):
+        mask = np.zeros(len(xyz), dtype=bool)
+        for node in region:
+            mask[~mask] = _evaluate_region(node, xyz[~mask])
+        return mask
+    if isinstance(region, openmc.Complement):
+        return ~_evaluate_region(region.node, xyz)
+    raise TypeError(f"Unsupported region type {type(region).__name__}")
+
+
+class Locator:
+    """Classifies points into the cells and materials of a geometry.
+
+    Parameters
+    ----------
+    geometry : openmc.Geometry
+        Geometry to locate points in, e.g. from create_core_geometry.
+    """
+
+    def __init__(self, geometry):
+        self.geometry = geometry
+        self._lattice_tables = {}
+
+    def _lattice_table(self, lattice):
+        """Returns (universe id array, {id: universe}) of a RectLattice."""
+        try:
+            return self._lattice_tables[lattice.id]
+        except KeyError:
+            universes = np.asarray(lattice.universes, dtype=object)
+            by_id = {univ.id: univ for univ in universes.ravel()}
+            ids = np.array([univ.id for univ in universes.ravel()]).reshape(universes.shape)
+            table = self._lattice_tables[lattice.id] = (ids, by_id)
+            return table
+
+    def _locate_universe(self, universe, xyz, index, cell_ids, material_ids):
+        remaining = np.ones(len(xyz), dtype=bool)
+        for cell in universe.cells.values():
+            if not remaining.any():
+                break
+            inside = remaining.copy()
+            inside[remaining] = _evaluate_region(cell.region, xyz[remaining])
+            if not inside.any():
+                continue
+            remaining &= ~inside
+            self._fill(cell, xyz[inside], index[inside], cell_ids, material_ids)
+
+    def _fill(self, cell, xyz, index, cell_ids, material_ids):
+        if cell.rotation is not None:
+            raise NotImplementedError(f"Cell {cell.id} is rotated")
+        if cell.translation is not None:
+            xyz = xyz - np.asarray(cell.translation, dtype=float)
+
+        fill_type = cell.fill_type
+        if fill_type == 'material':
+            cell_ids[index] = cell.id
+            material_ids[index] = cell.fill.id
+        elif fill_type == 'void':
+            cell_ids[index] = cell.id
+            material_ids[index] = VOID
+        elif fill_type == 'universe':
+            self._locate_universe(cell.fill, xyz, index, cell_ids, material_ids)
+        elif fill_type == 'lattice':
+            self._locate_lattice(cell.fill, xyz, index, cell_ids, material_ids)
+        else:
+            raise NotImplementedError(f"Cell {cell.id} has unsupported fill type {fill_type}")
+
+    def _locate_lattice(self, lattice, xyz, index, cell_ids, material_ids):
+        if not isinstance(lattice, openmc.RectLattice):
+            raise NotImplementedError(f"Lattice {lattice.id} is not a RectLattice")
+        ids, by_id = self._lattice_table(lattice)
+        pitch = np.asarray(lattice.pitch, dtype=float)
+        lower_left = np.asarray(lattice.lower_left, dtype=float)
+        ndim = len(pitch)
+
+        element = np.floor((xyz[:, :ndim] - lower_left) / pitch).astype(int)
+        # Universes are stored with the highest y row first, z from the bottom
+        shape_xyz = ids.shape[::-1]
+        in_bounds = np.all((element >= 0) & (element < shape_xyz), axis=1)
+
+        local = xyz.copy()
+        local[:, :ndim] -= lower_left + (element + 0.5) * pitch
+        element_ids = np.full(len(xyz), -1)
+        inside = element[in_bounds]
+        if ndim == 2:
+            element_ids[in_bounds] = ids[ids.shape[0] - 1 - inside[:, 1], inside[:, 0]]
+        else:
+            element_ids[in_bounds] = ids[inside[:, 2], ids.shape[1] - 1 - inside[:, 1],
+                                         inside[:, 0]]
+
+        for universe_id in np.unique(element_ids[in_bounds]):
+            mask = element_ids == universe_id
+            self._locate_universe(by_id[universe_id], local[mask], index[mask],
+                                  cell_ids, material_ids)
+
+        # Outside the lattice the outer universe sees unshifted coordinates
+        if lattice.outer is not None and not in_bounds.all():
+            outside = ~in_bounds
+            self._locate_universe(lattice.outer, xyz[outside], index[outside],
+                                  cell_ids, material_ids)
+
+    def locate(self, points):
+        """Locates an (N, 3) array of points.
+
+        Returns
+        -------
+        cell_ids, material_ids : numpy.ndarray of int
+            ID of the deepest cell and of its material for each point.
+            Material id is VOID for void cells; both are LOST for points
+            outside every cell.
+        """
+        xyz = np.atleast_2d(np.asarray(points, dtype=float))
+        cell_ids = np.full(len(xyz), LOST)
+        material_ids = np.full(len(xyz), LOST)
+        self._locate_universe(self.geometry.root_universe, xyz,
+                              np.arange(len(xyz)), cell_ids, material_ids)
+        return cell_ids, material_ids
+
+    def estimate_volumes(self, lower_left, upper_right, n_samples=1_000_000,
+                         batch_size=1_000_000, seed=1):
+        """Estimates material volumes by uniform sampling of a box.
+
+        Parameters
+        ----------
+        lower_left, upper_right : sequence of float
+            Corners of the sampled box, which should enclose the region of
+            interest (e.g. the barrel for a core).
+        n_samples : int
+            Total number of sample points.
+        batch_size : int
+            Points located per pass, which bounds memory use.
+        seed : int
+            Seed of the random number generator.
+
+        Returns
+        -------
+        dict
+            Maps material id (or VOID / LOST) to a VolumeEstimate in cm^3
+            with its one-sigma binomial uncertainty.
+        """
+        lower_left = np.asarray(lower_left, dtype=float)
+        upper_right = np.asarray(upper_right, dtype=float)
+        box_volume = float(np.prod(upper_right - lower_left))
+        rng = np.random.default_rng(seed)
+
+        hits = {}
+        done = 0
+        while done < n_samples:
+            n = min(batch_size, n_samples - done)
+            points = lower_left + rng.random((n, 3)) * (upper_right - lower_left)
+            _, material_ids = self.locate(points)
+            ids, counts = np.unique(material_ids, return_counts=True)
+            for material_id, count in zip(ids.tolist(), counts.tolist()):
+                hits[material_id] = hits.get(material_id, 0) + count
+            done += n
+
+        volumes = {}
+        for material_id, count in hits.items():
+            fraction = count / n_samples
+            std_dev = float(np.sqrt(fraction * (1.0 - fraction) / n_samples))
+            volumes[material_id] = VolumeEstimate(fraction * box_volume, std_dev * box_volume)
+        return volumes
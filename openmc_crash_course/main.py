@@ -1,9 +1,21 @@
-"""Command-line interface for OpenMC Crash Course."""
+"""Command-line interface for OpenMC Crash Course.
 
+Each subcommand imports openmc and the model builders only when it runs,
+so ``--help``, ``list`` and the banner start without loading them::
 
-def main():
-    """Display information about the OpenMC Crash Course."""
-    print("""
+    openmc-crash-course list
+    openmc-crash-course build core --param grid_size=9
+    openmc-crash-course export assembly xml/ --param enrichment=0.031
+    openmc-crash-course run finite_pincell runs/pin --threads 4
+    openmc-crash-course sweep infinite_pincell sweeps/pitch --grid pitch=1.2,1.26,1.32
+    openmc-crash-course bench --grid-sizes 5 9
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+BANNER = """
 OpenMC Crash Course
 ==================
 
@@ -20,9 +32,181 @@ To run an example:
   cd examples/01_infinite_medium
   python main.py
 
-For more information, see the README.md file.
-""")
+Run 'openmc-crash-course --help' for the build, export, run, sweep and
+bench commands.  For more information, see the README.md file.
+"""
+
+# Names of models.PIPELINES, kept here so listing them needs no imports
+EXAMPLES = {
+    'infinite_medium': 'Materials and k-infinity',
+    'infinite_pincell': 'Geometry and spatial effects',
+    'finite_pincell': 'Leakage and k-eff',
+    'assembly': 'Lattices and universes',
+    'core': 'Full system simulation',
+}
+
+
+def _parse_value(text):
+    """Parses a parameter value as JSON (numbers, booleans), else a string."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _parse_params(items):
+    params = {}
+    for item in items:
+        name, sep, value = item.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Expected name=value, got {item!r}")
+        params[name] = _parse_value(value)
+    return params
+
+
+def _parse_grid(items):
+    grid = {}
+    for item in items:
+        name, sep, values = item.partition('=')
+        if not sep:
+            raise argparse.ArgumentTypeError(f"Expected name=v1,v2,..., got {item!r}")
+        values = [_parse_value(value) for value in values.split(',')]
+        grid[name] = values if len(values) > 1 else values[0]
+    return grid
+
+
+def _build(args):
+    from .models import PIPELINES
+    return PIPELINES[args.example](**_parse_params(args.param))
+
+
+def _export(args):
+    model = _build(args)
+    args.directory.mkdir(parents=True, exist_ok=True)
+    model.export_to_xml(args.directory)
+    return model
+
+
+def cmd_list(args):
+    for name, description in EXAMPLES.items():
+        print(f"{name:<18}{description}")
+    return 0
+
+
+def cmd_build(args):
+    model = _build(args)
+    cells = model.geometry.get_all_cells()
+    print(f"{args.example}: {len(model.materials)} materials, {len(cells)} cells, "
+          f"{len(model.tallies)} tallies")
+    return 0
+
+
+def cmd_export(args):
+    _export(args)
+    print(f"Exported {args.example} to {args.directory}")
+    return 0
+
+
+def cmd_run(args):
+    _export(args)
+    if args.no_cache:
+        from .telemetry import instrumented_run
+        record = instrumented_run(args.directory, label=args.example, threads=args.threads)
+        k_eff = record['results'].get('combined_k_effective')
+        if k_eff is not None:
+            print(f"k-effective = {k_eff[0]:.5f} +/- {k_eff[1]:.5f}")
+        return 0
+
+    from .cache import cached_run
+    from .postprocess import StatepointReader
+    statepoint = cached_run(args.directory, threads=args.threads)
+    with StatepointReader(statepoint) as reader:
+        mean, std_dev = reader.k_combined
+    print(f"k-effective = {mean:.5f} +/- {std_dev:.5f}")
+    return 0
+
+
+def cmd_sweep(args):
+    from .sweep import run_sweep
+    results = run_sweep(args.example, _parse_grid(args.grid), args.root,
+                        processes=args.processes, threads=args.threads,
+                        resume=not args.no_resume)
+    print(f"{len(results)} case(s) in {args.root / 'results.csv'}")
+    return 0
+
+
+def cmd_bench(args):
+    from . import bench
+    return bench.main(args.bench_args)
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='openmc-crash-course',
+        description='Build, export, run and sweep the crash course examples.'
+    )
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    commands.add_parser('list', help='List the example pipelines').set_defaults(func=cmd_list)
+
+    def example_parser(name, help, func):
+        sub = commands.add_parser(name, help=help)
+        sub.add_argument('example', choices=list(EXAMPLES))
+        sub.set_defaults(func=func)
+        return sub
+
+    def add_params(sub):
+        sub.add_argument('--param', '-p', action='append', default=[], metavar='NAME=VALUE',
+                         help='Builder keyword argument, e.g. enrichment=0.031 (repeatable)')
+
+    add_params(example_parser('build', 'Build a model and summarize it', cmd_build))
+
+    sub = example_parser('export', 'Export a model to XML', cmd_export)
+    sub.add_argument('directory', type=Path)
+    add_params(sub)
+
+    sub = example_parser('run', 'Export and run a model', cmd_run)
+    sub.add_argument('directory', type=Path)
+    add_params(sub)
+    sub.add_argument('--threads', type=int)
+    sub.add_argument('--no-cache', action='store_true',
+                     help='Always run OpenMC and record telemetry instead of using the cache')
+
+    sub = example_parser('sweep', 'Run a parameter sweep', cmd_sweep)
+    sub.add_argument('root', type=Path)
+    sub.add_argument('--grid', '-g', action='append', default=[], metavar='NAME=V1,V2,...',
+                     help='Swept builder parameter (repeatable)')
+    sub.add_argument('--processes', type=int)
+    sub.add_argument('--threads', type=int)
+    sub.add_argument('--no-resume', action='store_true',
+                     help='Rerun cases that already have a result')
+
+    sub = commands.add_parser('bench', help='Benchmark the geometry builders',
+                              add_help=False)
+    sub.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    """Runs a subcommand; without one, displays information about the course."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(BANNER)
+        return 0
+    parser = _parser()
+    args, extra = parser.parse_known_args(argv)
+    # Everything after 'bench' belongs to bench.main, including --help
+    if args.command == 'bench':
+        args.bench_args = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    try:
+        return args.func(args)
+    except argparse.ArgumentTypeError as exc:
+        print(f"openmc-crash-course: error: {exc}", file=sys.stderr)
+        return 2
 
 
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -1,10 +1,23 @@
+import numpy as np
 import openmc
 
-def get_materials():
-    """Returns a collection of materials used in the crash course."""
+# Molar masses (g/mol) used to convert soluble boron from ppm by weight
+_M_BORON = 10.811
+_M_WATER = 18.0153
+
+def get_materials(enrichment=0.05, boron_ppm=0.0):
+    """Returns a collection of materials used in the crash course.
+
+    Parameters
+    ----------
+    enrichment : float
+        U-235 atom fraction of the uranium in the fuel.
+    boron_ppm : float
+        Soluble boron in the water, in ppm by weight.
+    """
     uo2 = openmc.Material(name='fuel')
-    uo2.add_nuclide('U235', 0.05)
-    uo2.add_nuclide('U238', 0.95)
+    uo2.add_nuclide('U235', enrichment)
+    uo2.add_nuclide('U238', 1.0 - enrichment)
     uo2.add_nuclide('O16', 2.0)
     uo2.set_density('g/cm3', 10.0)
 
@@ -15,6 +28,10 @@ def get_materials():
     water = openmc.Material(name='water')
     water.add_nuclide('H1', 2.0)
     water.add_nuclide('O16', 1.0)
+    if boron_ppm > 0.0:
+        # Boron atoms per H2O molecule for the given mass fraction
+        w_boron = boron_ppm * 1.0e-6
+        water.add_element('B', w_boron / (1.0 - w_boron) * _M_WATER / _M_BORON)
     water.set_density('g/cm3', 1.0)
     water.add_s_alpha_beta('c_H_in_H2O')
 
@@ -43,3 +60,108 @@ def get_materials():
     }
 
     return all_materials
+
+
+def make_materials(fractions, density, temperature=None, name='material',
+                   percent_type='ao', s_alpha_beta=()):
+    """Builds materials for arrays of compositions, densities and temperatures.
+
+    fractions maps each nuclide (e.g. 'U235') or element (e.g. 'Zr') of a
+    shared template to its fraction, a float or an array.  These and
+    density and temperature are broadcast against each other, and one
+    material is returned per element.  Elements with identical fractions,
+    density and temperature share a single material, so a depletion or
+    enrichment zone model with thousands of positions only creates the
+    distinct compositions; duplicates are found in one NumPy pass.  Each
+    distinct composition then costs one add_nuclide or add_element call
+    per template entry.
+
+    Parameters
+    ----------
+    fractions : dict
+        Fraction by nuclide or element name; names without a mass number
+        are added as elements.
+    density : float or array_like
+        Density in g/cm3.
+    temperature : float, array_like or None
+        Material temperature in K; None leaves it unset.
+    name : str
+        Name given to every material.
+    percent_type : {'ao', 'wo'}
+        Whether fractions are atom or weight fractions.
+    s_alpha_beta : sequence of str
+        Thermal scattering tables added to every material.
+
+    Returns
+    -------
+    numpy.ndarray of openmc.Material
+        Object array with the broadcast shape of the inputs.
+    """
+    names = list(fractions)
+    no_temperature = temperature is None
+    columns = np.broadcast_arrays(
+        *(np.asarray(fractions[entry], dtype=float) for entry in names),
+        np.asarray(density, dtype=float),
+        np.asarray(-1.0 if no_temperature else temperature, dtype=float)
+    )
+    shape = columns[0].shape
+    variants = np.stack([column.ravel() for column in columns], axis=1)
+    compositions, inverse = np.unique(variants, axis=0, return_inverse=True)
+
+    unique_materials = np.empty(len(compositions), dtype=object)
+    for k, row in enumerate(compositions.tolist()):
+        *percents, dens, temp = row
+        material = openmc.Material(name=name)
+        for entry, percent in zip(names, percents):
+            if any(char.isdigit() for char in entry):
+                material.add_nuclide(entry, percent, percent_type)
+            else:
+                material.add_element(entry, percent, percent_type)
+        material.set_density('g/cm3', dens)
+        for table in s_alpha_beta:
+            material.add_s_alpha_beta(table)
+        if not no_temperature:
+            material.temperature = temp
+        unique_materials[k] = material
+
+    return unique_materials[inverse.reshape(-1)].reshape(shape)
+
+
+def make_fuel_materials(enrichment, density=10.0, temperature=None, name='fuel'):
+    """Builds UO2 fuel materials for arrays of enrichment, density and temperature.
+
+    A make_materials template of U235, U238 and O16; see there for the
+    broadcasting and sharing of identical compositions.
+
+    Parameters
+    ----------
+    enrichment : float or array_like
+        U-235 atom fraction of the uranium, as in get_materials.
+    density : float or array_like
+        Fuel density in g/cm3.
+    temperature : float, array_like or None
+        Material temperature in K; None leaves it unset.
+    name : str
+        Name given to every material.
+
+    Returns
+    -------
+    numpy.ndarray of openmc.Material
+        Object array with the broadcast shape of the inputs.
+    """
+    enrichment = np.asarray(enrichment, dtype=float)
+    fractions = {'U235': enrichment, 'U238': 1.0 - enrichment, 'O16': 2.0}
+    return make_materials(fractions, density, temperature, name)
+
+def collect_materials(*material_arrays):
+    """Returns an openmc.Materials with each distinct material once.
+
+    Accepts materials, sequences or arrays of materials (such as the output
+    of make_materials) and keeps the order of first appearance, so
+    all variants are written by a single export_to_xml call.
+    """
+    unique = {}
+    for materials in material_arrays:
+        for material in np.ravel(np.asarray(materials, dtype=object)):
+            unique.setdefault(id(material), material)
+    return openmc.Materials(unique.values())
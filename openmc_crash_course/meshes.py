@@ -0,0 +1,198 @@
+"""Tally meshes that follow the lattice structure of a model.
+
+A uniform RegularMesh over a core puts most bins in the reflector or
+across pin boundaries.  create_lattice_mesh instead reads the lattice
+built by create_core_lattice (or create_assembly_lattice) and returns a
+RectilinearMesh with one bin per pin along every row and column that
+holds fuel assemblies, and one coarse bin per lattice element elsewhere.
+The accompanying PinMap ties every mesh bin back to its (assembly, pin)
+indices, so pin powers come out of a tally with a single fancy-indexing
+step.
+"""
+from collections import namedtuple
+
+import numpy as np
+import openmc
+
+PinMap = namedtuple('PinMap', [
+    'assembly_row', 'assembly_col', 'pin_row', 'pin_col', 'lattice_shape', 'pin_shape'
+])
+
+
+def _nested_lattice(universe):
+    """Returns the RectLattice filling a cell of universe, or None."""
+    cells = getattr(universe, 'cells', None)
+    if cells is None:
+        return None
+    for cell in cells.values():
+        if cell.fill_type == 'lattice' and isinstance(cell.fill, openmc.RectLattice):
+            return cell.fill
+    return None
+
+
+def _axis_layout(nested, axis):
+    """Returns the nested lattice of each element line along one axis.
+
+    For axis 0 the lines are the lattice columns (x), for axis 1 the rows
+    ordered by increasing y.  Lines without any nested lattice get None.
+    """
+    if axis == 1:
+        nested = nested[::-1, :]
+    else:
+        nested = nested.T
+    layout = []
+    for line in nested:
+        inner = [lattice for lattice in line if lattice is not None]
+        if not inner:
+            layout.append(None)
+            continue
+        first = inner[0]
+        for other in inner[1:]:
+            if (tuple(other.pitch) != tuple(first.pitch) or
+                    tuple(other.lower_left) != tuple(first.lower_left) or
+                    other.shape != first.shape):
+                raise ValueError("Assemblies in one lattice row or column "
+                                 "have different pin layouts")
+        layout.append(first)
+    return layout
+
+
+def _axis_edges(layout, lower, pitch, axis):
+    """Returns the bin edges along one axis for a lattice layout."""
+    edges = [lower + np.arange(len(layout) + 1) * pitch]
+    for k, inner in enumerate(layout):
+        if inner is not None:
+            inner_lower = lower + (k + 0.5) * pitch + inner.lower_left[axis]
+            n_pins = inner.shape[axis]
+            edges.append(inner_lower + np.arange(n_pins + 1) * inner.pitch[axis])
+    # Merge edges that coincide up to rounding
+    edges = np.sort(np.concatenate(edges))
+    keep = np.concatenate([[True], np.diff(edges) > 1e-9 * max(pitch, 1.0)])
+    return edges[keep]
+
+
+def _axis_indices(centers, layout, lower, pitch, axis):
+    """Maps bin centers to (element index, pin index) along one axis."""
+    element = np.floor((centers - lower) / pitch).astype(int)
+    pin = np.full(len(centers), -1)
+    for k, inner in enumerate(layout):
+        if inner is None:
+            continue
+        in_element = element == k
+        local = centers[in_element] - (lower + (k + 0.5) * pitch + inner.lower_left[axis])
+        index = np.floor(local / inner.pitch[axis]).astype(int)
+        index[(index < 0) | (index >= inner.shape[axis])] = -1
+        pin[in_element] = index
+    return element, pin
+
+
+def create_lattice_mesh(lattice, z_bounds=(-200.0, 200.0)):
+    """Creates a tally mesh aligned with a 2D RectLattice and its pins.
+
+    Parameters
+    ----------
+    lattice : openmc.RectLattice
+        A core lattice from create_core_lattice, whose elements may be
+        assembly universes containing a pin lattice, or a pin lattice from
+        create_assembly_lattice.
+    z_bounds : tuple of float
+        Axial extent of the single z bin.
+
+    Returns
+    -------
+    mesh : openmc.RectilinearMesh
+        Pin-sized bins along every lattice column and row holding an
+        assembly; one bin per element elsewhere (reflector, assembly walls
+        and gaps get their own bins).
+    pin_map : PinMap
+        Arrays of shape (ny, nx), matching a mesh tally mean reshaped to
+        (ny, nx) with y increasing along rows.  assembly_row/col index the
+        lattice universes (row 0 at the top, as in core maps); pin_row/col
+        index the pin lattice the same way, and are -1 for bins outside a
+        fuel pin position (reflector, walls, gaps).
+    """
+    universes = np.asarray(lattice.universes, dtype=object)
+    if universes.ndim != 2:
+        raise ValueError("create_lattice_mesh needs a 2D lattice")
+    ny, nx = universes.shape
+    nested = np.empty(universes.shape, dtype=object)
+    for (i, j), universe in np.ndenumerate(universes):
+        nested[i, j] = _nested_lattice(universe)
+    is_assembly = np.not_equal(nested, None)
+
+    x0, y0 = lattice.lower_left[:2]
+    px, py = lattice.pitch[:2]
+    if not is_assembly.any():
+        # A pin lattice: its own elements are the pins
+        x_layout = y_layout = None
+        x_grid = x0 + np.arange(nx + 1) * px
+        y_grid = y0 + np.arange(ny + 1) * py
+    else:
+        x_layout = _axis_layout(nested, 0)
+        y_layout = _axis_layout(nested, 1)
+        x_grid = _axis_edges(x_layout, x0, px, 0)
+        y_grid = _axis_edges(y_layout, y0, py, 1)
+
+    mesh = openmc.RectilinearMesh()
+    mesh.x_grid = x_grid
+    mesh.y_grid = y_grid
+    mesh.z_grid = np.asarray(z_bounds, dtype=float)
+
+    x_centers = 0.5 * (x_grid[1:] + x_grid[:-1])
+    y_centers = 0.5 * (y_grid[1:] + y_grid[:-1])
+    if x_layout is None:
+        col = np.arange(nx)
+        row_from_bottom = np.arange(ny)
+        assembly_col = np.zeros((ny, nx), dtype=int)
+        assembly_row = np.zeros((ny, nx), dtype=int)
+        pin_col = np.broadcast_to(col, (ny, nx)).copy()
+        pin_row = np.broadcast_to((ny - 1 - row_from_bottom)[:, np.newaxis], (ny, nx)).copy()
+        return mesh, PinMap(assembly_row, assembly_col, pin_row, pin_col,
+                            (1, 1), (ny, nx))
+
+    col, pin_x = _axis_indices(x_centers, x_layout, x0, px, 0)
+    row_from_bottom, pin_y = _axis_indices(y_centers, y_layout, y0, py, 1)
+
+    assembly_col = np.broadcast_to(col, (len(y_centers), len(x_centers))).copy()
+    assembly_row = np.broadcast_to((ny - 1 - row_from_bottom)[:, np.newaxis],
+                                   assembly_col.shape).copy()
+
+    inner = next(lattice for lattice in nested.ravel() if lattice is not None)
+    n_pin_rows = inner.shape[1]
+    pin_col = np.broadcast_to(pin_x, assembly_col.shape).copy()
+    pin_row = np.broadcast_to(
+        np.where(pin_y >= 0, n_pin_rows - 1 - pin_y, -1)[:, np.newaxis],
+        assembly_col.shape
+    ).copy()
+
+    # Only bins inside an actual assembly element map to pins
+    fuel = is_assembly[assembly_row, assembly_col] & (pin_col >= 0) & (pin_row >= 0)
+    pin_col[~fuel] = -1
+    pin_row[~fuel] = -1
+    return mesh, PinMap(assembly_row, assembly_col, pin_row, pin_col,
+                        (ny, nx), (n_pin_rows, inner.shape[0]))
+
+
+def extract_pin_values(values, pin_map):
+    """Scatters mesh tally values into a per-assembly, per-pin array.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        Mesh results of shape (ny, nx), e.g. a mesh tally mean reshaped
+        to (ny, nx).
+    pin_map : PinMap
+        Mapping returned by create_lattice_mesh.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape lattice_shape + pin_shape; positions without a fuel
+        pin bin are NaN.
+    """
+    values = np.asarray(values, dtype=float).reshape(pin_map.pin_col.shape)
+    out = np.full(tuple(pin_map.lattice_shape) + tuple(pin_map.pin_shape), np.nan)
+    fuel = pin_map.pin_col >= 0
+    out[pin_map.assembly_row[fuel], pin_map.assembly_col[fuel],
+        pin_map.pin_row[fuel], pin_map.pin_col[fuel]] = values[fuel]
+    return out
@@ -0,0 +1,319 @@
+"""Multigroup cross sections and a multigroup fast path for the core.
+
+Continuous-energy transport of the full core is slow for scoping studies.
+generate_mgxs_library runs a small continuous-energy model once, a pin
+lattice or an assembly from examples 02/04 surrounded by rings of water,
+steel and air so every core material sees a flux, and condenses one
+macroscopic cross section set per material.  The resulting MGXS HDF5
+library is stored in the result cache (see cache.py), keyed on the
+generation inputs, so it is only ever built once per configuration.
+
+build_mg_core_model then swaps the materials of the example 05 core for
+their macroscopic counterparts and switches to multigroup mode, and
+compare_results reports k-effective and pin power differences between a
+continuous-energy and a multigroup run.  synthetic_mgxs_library writes a
+small made-up two-group library, which runs the multigroup core without
+any continuous-energy data.
+"""
+import hashlib
+import json
+import shutil
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import openmc
+import openmc.mgxs
+
+from .materials import get_materials
+from .geometry import (
+    create_pin_cell_universe,
+    create_assembly_universe,
+    _pin_lattice
+)
+from .models import _eigenvalue_settings, build_core_model
+from .registry import universe_registry
+from .cache import ResultCache, input_key
+from .postprocess import StatepointReader, latest_statepoint
+
+MGXS_FILE = 'mgxs.h5'
+MGXS_TYPES = (
+    'total', 'absorption', 'nu-fission', 'fission', 'chi',
+    'nu-scatter matrix', 'multiplicity matrix'
+)
+MATERIAL_NAMES = ('fuel', 'zirc', 'water', 'steel', 'air')
+
+MGComparison = namedtuple('MGComparison', [
+    'k_ce', 'k_mg', 'delta_k_pcm', 'pin_rms', 'pin_max', 'n_pins'
+])
+
+
+def _energy_groups(groups):
+    """Returns EnergyGroups from a group structure name or edges in eV."""
+    if isinstance(groups, str):
+        groups = openmc.mgxs.GROUP_STRUCTURES[groups]
+    return openmc.mgxs.EnergyGroups(np.asarray(groups, dtype=float))
+
+
+def build_mgxs_generation_model(
+        kind='assembly', enrichment=0.05, pitch=1.26, fuel_radius=0.39,
+        boron_ppm=0.0, assy_size=17, wall_thickness=0.2, gap_thickness=0.1,
+        pin_lattice_size=5, reflector_thickness=10.0, barrel_thickness=5.0,
+        air_thickness=5.0, groups='CASMO-2', legendre_order=1,
+        particles=10000, batches=100, inactive=20
+):
+    """Builds the continuous-energy model that MGXS are generated from.
+
+    Parameters
+    ----------
+    kind : {'assembly', 'pincell'}
+        Fuel region: one assembly as in example 04, or a small square
+        lattice of the example 02 pin cell.
+    pin_lattice_size : int
+        Pins per side of the lattice for kind='pincell'.
+    reflector_thickness, barrel_thickness, air_thickness : float
+        Thicknesses of the water, steel and air rings around the fuel.
+        The outer air boundary is reflective, standing in for the rest of
+        the core.
+    groups : str or sequence of float
+        Name of an openmc.mgxs.GROUP_STRUCTURES entry, or group edges in eV.
+    legendre_order : int
+        Legendre order of the scattering matrices.
+
+    Returns
+    -------
+    model : openmc.Model
+        Model with the MGXS tallies already added.
+    library : openmc.mgxs.Library
+        Library to load from the model's statepoint.
+    """
+    if kind not in ('assembly', 'pincell'):
+        raise ValueError(f"Unknown MGXS generation model {kind!r}")
+    mats = get_materials(enrichment=enrichment, boron_ppm=boron_ppm)
+    uo2, zirc, water = mats['uo2'], mats['zirc'], mats['water']
+    steel, air = mats['steel'], mats['air']
+
+    with universe_registry():
+        if kind == 'assembly':
+            fuel_univ = create_assembly_universe(
+                uo2, zirc, water, pitch, assy_size, wall_thickness, gap_thickness,
+                fuel_radius=fuel_radius
+            )
+            width = pitch * assy_size + 2 * (wall_thickness + gap_thickness)
+        else:
+            pin = create_pin_cell_universe(uo2, zirc, water, fuel_radius=fuel_radius)
+            lattice = _pin_lattice(
+                np.full((pin_lattice_size, pin_lattice_size), pin), pitch
+            )
+            fuel_univ = openmc.Universe(cells=[openmc.Cell(fill=lattice)])
+            width = pitch * pin_lattice_size
+
+    fuel_prism = openmc.model.RectangularPrism(width=width, height=width)
+    reflector_or = width / np.sqrt(2) + reflector_thickness
+    reflector_cyl = openmc.ZCylinder(r=reflector_or)
+    barrel_cyl = openmc.ZCylinder(r=reflector_or + barrel_thickness)
+    air_cyl = openmc.ZCylinder(r=reflector_or + barrel_thickness + air_thickness,
+                               boundary_type='reflective')
+    cells = [
+        openmc.Cell(name='fuel_region', fill=fuel_univ, region=-fuel_prism),
+        openmc.Cell(name='reflector', fill=water, region=+fuel_prism & -reflector_cyl),
+        openmc.Cell(name='barrel', fill=steel, region=+reflector_cyl & -barrel_cyl),
+        openmc.Cell(name='air', fill=air, region=+barrel_cyl & -air_cyl),
+    ]
+    geometry = openmc.Geometry(openmc.Universe(cells=cells))
+    materials = openmc.Materials([uo2, zirc, water, steel, air])
+
+    half = width / 2
+    source = openmc.IndependentSource(
+        space=openmc.stats.Box((-half, -half, -1), (half, half, 1)),
+        constraints={'fissionable': True}
+    )
+    settings = _eigenvalue_settings(source, particles, batches, inactive)
+
+    library = openmc.mgxs.Library(geometry)
+    library.energy_groups = _energy_groups(groups)
+    library.mgxs_types = list(MGXS_TYPES)
+    library.domain_type = 'material'
+    library.domains = list(materials)
+    library.by_nuclide = False
+    library.correction = None
+    library.scatter_format = 'legendre'
+    library.legendre_order = legendre_order
+    library.build_library()
+
+    tallies = openmc.Tallies()
+    library.add_to_tallies_file(tallies, merge=True)
+    return openmc.Model(geometry, materials, settings, tallies), library
+
+
+def _library_key(xml_dir, library, openmc_exec='openmc'):
+    """Cache key of an MGXS library: generation inputs and library options."""
+    options = {
+        'groups': np.asarray(library.energy_groups.group_edges).tolist(),
+        'mgxs_types': list(library.mgxs_types),
+        'legendre_order': library.legendre_order,
+    }
+    hasher = hashlib.sha256(input_key(xml_dir, openmc_exec).encode())
+    hasher.update(json.dumps(options, sort_keys=True).encode())
+    return 'mgxs_' + hasher.hexdigest()
+
+
+def generate_mgxs_library(directory, cache=None, **kwargs):
+    """Generates a macroscopic MGXS library, or reuses a cached one.
+
+    Parameters
+    ----------
+    directory : path-like
+        Working directory of the generation run; the library is written to
+        directory / MGXS_FILE.
+    cache : ResultCache or None
+        Cache for finished libraries; defaults to ResultCache().
+    **kwargs
+        Parameters of build_mgxs_generation_model, plus threads,
+        openmc_exec, mpi_args and the like for openmc.Model.run.
+
+    Returns
+    -------
+    pathlib.Path
+        Path of the MGXS HDF5 library, with one macroscopic data set per
+        material name in MATERIAL_NAMES.
+    """
+    run_names = ('threads', 'mpi_args', 'openmc_exec', 'output')
+    run_kwargs = {name: kwargs.pop(name) for name in run_names if name in kwargs}
+    run_kwargs.setdefault('output', False)
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    cache = ResultCache() if cache is None else cache
+    model, library = build_mgxs_generation_model(**kwargs)
+    model.export_to_xml(directory)
+    key = _library_key(directory, library, run_kwargs.get('openmc_exec', 'openmc'))
+    path = directory / MGXS_FILE
+
+    entry = cache.lookup(key)
+    if entry is not None:
+        shutil.copy2(entry / MGXS_FILE, path)
+        return path
+
+    model.run(cwd=directory, **run_kwargs)
+    with openmc.StatePoint(latest_statepoint(directory)) as sp:
+        library.load_from_statepoint(sp)
+    mg_library = library.create_mg_library(
+        xs_type='macro', xsdata_names=[material.name for material in library.domains]
+    )
+    mg_library.export_to_hdf5(str(path))
+    cache.store(key, [path])
+    return path
+
+
+def _macroscopic_materials():
+    """Returns {name: macroscopic Material} for the core material names."""
+    materials = {}
+    for name in MATERIAL_NAMES:
+        material = openmc.Material(name=name)
+        material.set_density('macro', 1.0)
+        material.add_macroscopic(name)
+        materials[name] = material
+    return materials
+
+
+def build_mg_core_model(mgxs_path, **kwargs):
+    """Builds the example 05 core in multigroup mode.
+
+    Parameters
+    ----------
+    mgxs_path : path-like
+        MGXS library from generate_mgxs_library or synthetic_mgxs_library.
+    **kwargs
+        Parameters of models.build_core_model.  A 'pin_power' tally is
+        always included, for compare_results.
+
+    Returns
+    -------
+    openmc.Model
+    """
+    kwargs['pin_powers'] = True
+    model = build_core_model(**kwargs)
+    macroscopic = _macroscopic_materials()
+    for cell in model.geometry.get_all_material_cells().values():
+        try:
+            cell.fill = macroscopic[cell.fill.name]
+        except KeyError:
+            raise ValueError(f"No multigroup data for material {cell.fill.name!r}") from None
+
+    model.materials = openmc.Materials(macroscopic.values())
+    model.materials.cross_sections = str(Path(mgxs_path).resolve())
+    model.settings.energy_mode = 'multi-group'
+    return model
+
+
+def compare_results(ce_statepoint, mg_statepoint, tally='pin_power'):
+    """Compares a continuous-energy and a multigroup run of the same core.
+
+    Pin powers are each normalized to a mean of one over the bins with
+    fission in the continuous-energy run.
+
+    Returns
+    -------
+    MGComparison
+        Both k-effective values as (mean, std_dev), their difference in
+        pcm, and the RMS and maximum relative pin power differences.
+    """
+    with StatepointReader(ce_statepoint) as ce, StatepointReader(mg_statepoint) as mg:
+        k_ce, k_mg = ce.k_combined, mg.k_combined
+        ce_powers = np.ravel(ce.read(tally, score='fission').mean)
+        mg_powers = np.ravel(mg.read(tally, score='fission').mean)
+
+    if ce_powers.shape != mg_powers.shape:
+        raise ValueError("Pin power tallies of the two runs have different shapes")
+    fuel = ce_powers > 0.0
+    ce_powers = ce_powers[fuel] / ce_powers[fuel].mean()
+    mg_powers = mg_powers[fuel] / mg_powers[fuel].mean()
+    relative = mg_powers / ce_powers - 1.0
+    return MGComparison(
+        k_ce, k_mg, (k_mg[0] - k_ce[0]) * 1e5,
+        float(np.sqrt(np.mean(relative ** 2))), float(np.max(np.abs(relative))),
+        int(fuel.sum())
+    )
+
+
+# Two-group macroscopic data (1/cm): absorption, nu-fission, fission and
+# the scattering matrix [g_in, g_out]; totals follow from these
+_SYNTHETIC_DATA = {
+    'fuel': ([0.010, 0.100], [0.008, 0.180], [0.0033, 0.0735],
+             [[0.520, 0.015], [0.0, 1.250]]),
+    'zirc': ([0.001, 0.003], None, None, [[0.280, 0.001], [0.0, 0.300]]),
+    'water': ([0.0005, 0.020], None, None, [[0.600, 0.040], [0.0, 2.200]]),
+    'steel': ([0.003, 0.080], None, None, [[0.750, 0.006], [0.0, 0.850]]),
+    'air': ([1.0e-6, 1.0e-5], None, None, [[4.0e-5, 0.0], [0.0, 4.0e-5]]),
+}
+
+
+def synthetic_mgxs_library(path):
+    """Writes a made-up two-group macroscopic library for tests.
+
+    The library has one data set per name in MATERIAL_NAMES, with a fast
+    and a thermal group split at 0.625 eV, so build_mg_core_model runs
+    without continuous-energy data.  The numbers are plausible, not
+    evaluated data.
+
+    Returns
+    -------
+    pathlib.Path
+    """
+    groups = openmc.mgxs.EnergyGroups([0.0, 0.625, 20.0e6])
+    library = openmc.MGXSLibrary(groups)
+    for name, (absorption, nu_fission, fission, scatter) in _SYNTHETIC_DATA.items():
+        data = openmc.XSdata(name, groups)
+        data.order = 0
+        scatter = np.asarray(scatter)
+        data.set_total(np.asarray(absorption) + scatter.sum(axis=1))
+        data.set_absorption(absorption)
+        data.set_scatter_matrix(scatter[:, :, np.newaxis])
+        if nu_fission is not None:
+            data.set_nu_fission(nu_fission)
+            data.set_fission(fission)
+            data.set_chi([1.0, 0.0])
+        library.add_xsdata(data)
+    library.export_to_hdf5(str(path))
+    return Path(path)
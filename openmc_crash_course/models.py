@@ -0,0 +1,246 @@
+"""Complete, parameterized models for the crash course example pipelines.
+
+Each builder mirrors one of the scripts in examples/ and returns an
+openmc.Model with materials, geometry, settings and tallies, so the same
+pipelines can be exported, swept over parameters or run from the CLI.
+"""
+import numpy as np
+import openmc
+
+from .materials import get_materials
+from .geometry import (
+    create_infinite_pincell_geometry,
+    create_finite_pincell_geometry,
+    create_assembly_universe,
+    generate_circular_core_map,
+    core_bounds,
+    create_core_geometry
+)
+from .meshes import create_lattice_mesh
+from .registry import universe_registry
+
+
+def _eigenvalue_settings(source, particles, batches, inactive):
+    settings = openmc.Settings()
+    settings.batches = batches
+    settings.inactive = inactive
+    settings.particles = particles
+    settings.source = source
+    settings.run_mode = 'eigenvalue'
+    return settings
+
+
+def build_infinite_medium_model(
+        enrichment=0.05,
+        particles=1000, batches=100, inactive=10
+):
+    """Example 01: homogeneous UO2 with reflective boundaries."""
+    all_materials = get_materials(enrichment=enrichment)
+    uo2 = all_materials['uo2']
+    water = all_materials['water']
+
+    prism = openmc.model.RectangularPrism(width=10, height=10, boundary_type='reflective')
+    z_min = openmc.ZPlane(z0=-5, boundary_type='reflective')
+    z_max = openmc.ZPlane(z0=5, boundary_type='reflective')
+    fuel_cell = openmc.Cell(fill=uo2, region=-prism & +z_min & -z_max)
+    geometry = openmc.Geometry(openmc.Universe(cells=[fuel_cell]))
+
+    source = openmc.IndependentSource(space=openmc.stats.Point((0, 0, 0)))
+    settings = _eigenvalue_settings(source, particles, batches, inactive)
+
+    tally = openmc.Tally(name='flux_tally')
+    tally.filters = [openmc.EnergyFilter(np.logspace(-3, 7, 101))]
+    tally.scores = ['flux']
+
+    return openmc.Model(
+        geometry, openmc.Materials([uo2, water]), settings, openmc.Tallies([tally])
+    )
+
+
+def build_infinite_pincell_model(
+        enrichment=0.05, pitch=1.26, fuel_radius=0.39, boron_ppm=0.0,
+        particles=1000, batches=100, inactive=10
+):
+    """Example 02: pin cell with periodic boundaries."""
+    all_materials = get_materials(enrichment=enrichment, boron_ppm=boron_ppm)
+    uo2 = all_materials['uo2']
+    zirc = all_materials['zirc']
+    water = all_materials['water']
+
+    with universe_registry():
+        geometry = create_infinite_pincell_geometry(
+            uo2, zirc, water, fuel_radius=fuel_radius, pitch=pitch
+        )
+    cells = {cell.name: cell for cell in geometry.get_all_cells().values()}
+
+    source = openmc.IndependentSource(
+        space=openmc.stats.Box((-pitch/2, -pitch/2, -1e6), (pitch/2, pitch/2, 1e6)),
+        constraints={'fissionable': True}
+    )
+    settings = _eigenvalue_settings(source, particles, batches, inactive)
+
+    energy_filter = openmc.EnergyFilter(np.logspace(-3, 7, 101))
+    fuel_tally = openmc.Tally(name='fuel_flux')
+    fuel_tally.filters = [openmc.CellFilter([cells['fuel']]), energy_filter]
+    fuel_tally.scores = ['flux']
+    mod_tally = openmc.Tally(name='mod_flux')
+    mod_tally.filters = [openmc.CellFilter([cells['moderator']]), energy_filter]
+    mod_tally.scores = ['flux']
+
+    return openmc.Model(
+        geometry, openmc.Materials([uo2, zirc, water]), settings,
+        openmc.Tallies([fuel_tally, mod_tally])
+    )
+
+
+def build_finite_pincell_model(
+        enrichment=0.05, pitch=1.26, fuel_radius=0.39, boron_ppm=0.0,
+        height=100.0,
+        particles=1000, batches=100, inactive=10
+):
+    """Example 03: pin cell of finite height with vacuum boundaries."""
+    all_materials = get_materials(enrichment=enrichment, boron_ppm=boron_ppm)
+    uo2 = all_materials['uo2']
+    zirc = all_materials['zirc']
+    water = all_materials['water']
+
+    with universe_registry():
+        geometry = create_finite_pincell_geometry(
+            uo2, zirc, water, fuel_radius=fuel_radius, pitch=pitch, height=height
+        )
+    surfaces = {s.name: s for s in geometry.get_all_surfaces().values()}
+
+    source = openmc.IndependentSource(
+        space=openmc.stats.Box((-pitch/2, -pitch/2, -height/2), (pitch/2, pitch/2, height/2)),
+        constraints={'fissionable': True}
+    )
+    settings = _eigenvalue_settings(source, particles, batches, inactive)
+
+    leakage_tally = openmc.Tally(name='leakage')
+    leakage_tally.filters = [openmc.SurfaceFilter([
+        surfaces[name] for name in ('min_x', 'max_x', 'min_y', 'max_y', 'z_min', 'z_max')
+    ])]
+    leakage_tally.scores = ['current']
+    abs_tally = openmc.Tally(name='absorption')
+    abs_tally.scores = ['absorption', 'fission']
+
+    return openmc.Model(
+        geometry, openmc.Materials([uo2, zirc, water]), settings,
+        openmc.Tallies([leakage_tally, abs_tally])
+    )
+
+
+def build_assembly_model(
+        enrichment=0.05, pitch=1.26, fuel_radius=0.39, boron_ppm=0.0,
+        size=17, wall_thickness=0.2, gap_thickness=0.1,
+        particles=1000, batches=100, inactive=10
+):
+    """Example 04: single fuel assembly with reflective boundaries."""
+    all_materials = get_materials(enrichment=enrichment, boron_ppm=boron_ppm)
+    uo2 = all_materials['uo2']
+    zirc = all_materials['zirc']
+    water = all_materials['water']
+
+    assy_width = pitch * size + 2 * (wall_thickness + gap_thickness)
+    with universe_registry():
+        assy_univ = create_assembly_universe(
+            uo2, zirc, water, pitch, size, wall_thickness, gap_thickness,
+            fuel_radius=fuel_radius
+        )
+    main_prism = openmc.model.RectangularPrism(
+        width=assy_width, height=assy_width, boundary_type='reflective'
+    )
+    main_cell = openmc.Cell(fill=assy_univ, region=-main_prism)
+    geometry = openmc.Geometry(openmc.Universe(cells=[main_cell]))
+
+    half = pitch * size / 2
+    source = openmc.IndependentSource(
+        space=openmc.stats.Box([-half, -half, -1], [half, half, 1]),
+        constraints={'fissionable': True}
+    )
+    settings = _eigenvalue_settings(source, particles, batches, inactive)
+
+    mesh = openmc.RegularMesh()
+    mesh.dimension = [size, size]
+    mesh.lower_left = [-half, -half]
+    mesh.upper_right = [half, half]
+    tally = openmc.Tally(name='pin_power')
+    tally.filters = [openmc.MeshFilter(mesh)]
+    tally.scores = ['fission']
+
+    return openmc.Model(
+        geometry, openmc.Materials([uo2, zirc, water]), settings,
+        openmc.Tallies([tally])
+    )
+
+
+def build_core_model(
+        enrichment=0.05, pitch=1.26, fuel_radius=0.39, boron_ppm=0.0,
+        assy_size=17, wall_thickness=0.2, gap_thickness=0.1,
+        grid_size=17, target_assemblies=177, barrel_thickness=5.0,
+        particles=1000, batches=100, inactive=10, pin_powers=False
+):
+    """Example 05: circular core in a steel barrel surrounded by air.
+
+    With pin_powers, a 'pin_power' fission tally on a lattice-aligned mesh
+    (see create_lattice_mesh) is added next to the 'core_flux' tally.
+    """
+    all_materials = get_materials(enrichment=enrichment, boron_ppm=boron_ppm)
+    uo2 = all_materials['uo2']
+    zirc = all_materials['zirc']
+    water = all_materials['water']
+    steel = all_materials['steel']
+    air = all_materials['air']
+
+    assy_pitch = (pitch * assy_size) + 2 * (wall_thickness + gap_thickness)
+    core_map, barrel_ir = generate_circular_core_map(
+        grid_size, assy_pitch, target_assemblies
+    )
+    with universe_registry():
+        geometry = create_core_geometry(
+            uo2, zirc, water, steel, air,
+            core_map, pitch, assy_size,
+            wall_thickness, gap_thickness,
+            barrel_ir=barrel_ir, barrel_thickness=barrel_thickness,
+            fuel_radius=fuel_radius
+        )
+
+    source = openmc.IndependentSource(space=openmc.stats.Point((0, 0, 0)))
+    settings = _eigenvalue_settings(source, particles, batches, inactive)
+
+    lower_left, upper_right = core_bounds(
+        core_map, assy_pitch, 'barrel',
+        barrel_ir=barrel_ir, barrel_thickness=barrel_thickness
+    )
+    mesh = openmc.RegularMesh()
+    mesh.dimension = [100, 100]
+    mesh.lower_left = lower_left
+    mesh.upper_right = upper_right
+    tally = openmc.Tally(name='core_flux')
+    tally.filters = [openmc.MeshFilter(mesh)]
+    tally.scores = ['flux']
+    tallies = openmc.Tallies([tally])
+
+    if pin_powers:
+        core_cell = next(cell for cell in geometry.root_universe.cells.values()
+                         if cell.name == 'core')
+        pin_mesh, _ = create_lattice_mesh(core_cell.fill)
+        pin_tally = openmc.Tally(name='pin_power')
+        pin_tally.filters = [openmc.MeshFilter(pin_mesh)]
+        pin_tally.scores = ['fission']
+        tallies.append(pin_tally)
+
+    return openmc.Model(
+        geometry, openmc.Materials([uo2, zirc, water, steel, air]), settings,
+        tallies
+    )
+
+
+# Example pipelines by name, in the order of the examples/ directory
+PIPELINES = {
+    'infinite_medium': build_infinite_medium_model,
+    'infinite_pincell': build_infinite_pincell_model,
+    'finite_pincell': build_finite_pincell_model,
+    'assembly': build_assembly_model,
+    'core': build_core_model,
+}
@@ -0,0 +1,243 @@
+"""In-memory perturbation runs for reactivity coefficients.
+
+PerturbationSession exports a model and initializes it once through the
+OpenMC shared library (openmc.lib), so cross sections are read and the
+geometry is built only once.  Material densities and temperatures are
+then changed in memory, each state is run, and k-effective differences to
+the unperturbed state come back with their uncertainties::
+
+    with PerturbationSession(model, 'perturb') as session:
+        void = session.evaluate('water', density_factor=0.9)
+        print(void.reactivity_pcm, '+/-', void.reactivity_pcm_std)
+
+k-effective of every state is the mean of its per-generation estimates
+over the active batches, so a perturbed state, the baseline and their
+difference all use the same estimator.  Successive generations are
+correlated through the fission source, so uncertainties are taken from
+means of blocks of consecutive generations (batch means) rather than
+from single generations, which would understate them.
+
+With correlated sampling every state runs with the same random number
+seed, so the states share most of their random walks and the
+generation-wise differences of k-effective are far less noisy than two
+independent runs; the uncertainty then comes from block means of those
+paired differences.
+
+Temperature perturbations need cross sections at the new temperature,
+which OpenMC only loads at initialization: give the model a temperature
+range, e.g. ``settings.temperature = {'method': 'interpolation',
+'range': (500, 1200)}``.
+"""
+import contextlib
+import math
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import openmc
+import openmc.lib
+
+from .postprocess import StatepointReader
+
+StateResult = namedtuple('StateResult', ['k_eff', 'k_eff_std', 'k_generation'])
+PerturbationResult = namedtuple('PerturbationResult', [
+    'k_eff', 'k_eff_std', 'delta_k', 'delta_k_std', 'reactivity_pcm', 'reactivity_pcm_std'
+])
+
+
+def block_mean(values, block_size=None):
+    """Returns the mean of a series and its std. dev. from block means.
+
+    The series is cut into blocks of block_size consecutive values, by
+    default about the square root of their number; the earliest values
+    that do not fill a block are dropped.  Block means are close to
+    independent even when neighbouring values are not.
+
+    Returns
+    -------
+    tuple of float
+        Mean and std. dev. of the mean.
+    """
+    values = np.asarray(values, dtype=float)
+    if block_size is None:
+        block_size = max(1, int(math.sqrt(len(values))))
+    n_blocks = len(values) // block_size
+    if n_blocks < 2:
+        raise ValueError(f"{len(values)} values are too few for two blocks of {block_size}")
+    blocks = values[len(values) - n_blocks * block_size:].reshape(n_blocks, block_size)
+    means = blocks.mean(axis=1)
+    return float(means.mean()), float(means.std(ddof=1) / math.sqrt(n_blocks))
+
+
+class PerturbationSession:
+    """Runs perturbed states of one model in a single OpenMC initialization.
+
+    Use as a context manager; only one session can be open per process,
+    since openmc.lib holds global state.
+
+    Parameters
+    ----------
+    model : openmc.Model
+        Eigenvalue model to perturb.
+    directory : path-like
+        Directory the model is exported to and statepoints are written to.
+    seed : int
+        Random number seed; with correlated, shared by every state.
+    correlated : bool
+        Run every state with the same seed and take uncertainties from
+        paired generation-wise differences.  Otherwise each state gets its
+        own seed and uncertainties add in quadrature.
+    block_size : int or None
+        Active generations per block for the uncertainties, see
+        block_mean; raise it if k-effective is strongly autocorrelated.
+    threads : int or None
+        OpenMP threads.
+    output : bool
+        Show OpenMC's output.
+    """
+
+    _open = False
+
+    def __init__(self, model, directory, seed=1, correlated=True, block_size=None,
+                 threads=None, output=False):
+        self.model = model
+        self.directory = Path(directory)
+        self.seed = seed
+        self.correlated = correlated
+        self.block_size = block_size
+        self.threads = threads
+        self.output = output
+        self.n_runs = 0
+        self._baseline = None
+        self._initialized = False
+
+    def __enter__(self):
+        if PerturbationSession._open:
+            raise RuntimeError("Another PerturbationSession is already open")
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.model.export_to_xml(self.directory)
+        args = [str(self.directory)]
+        if self.threads is not None:
+            args = ['-s', str(self.threads)] + args
+        openmc.lib.init(args=args, output=self.output)
+        PerturbationSession._open = self._initialized = True
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._initialized:
+            openmc.lib.finalize()
+            PerturbationSession._open = self._initialized = False
+
+    def _material_id(self, material):
+        """Returns the ID of a material given by name, ID or object."""
+        if isinstance(material, openmc.Material):
+            return material.id
+        if isinstance(material, str):
+            for candidate in self.model.materials:
+                if candidate.name == material:
+                    return candidate.id
+            raise KeyError(f"No material named {material!r}")
+        return int(material)
+
+    def _cells_of(self, material_id):
+        """Yields the cells of the initialized model filled with a material."""
+        for cell in openmc.lib.cells.values():
+            fill = cell.fill
+            fills = fill if isinstance(fill, (list, tuple)) else [fill]
+            if any(getattr(item, 'id', None) == material_id for item in fills):
+                yield cell
+
+    @contextlib.contextmanager
+    def perturbed(self, material, density_factor=None, density=None, units='g/cm3',
+                  temperature=None):
+        """Applies a perturbation to one material while the block runs.
+
+        Parameters
+        ----------
+        material : str, int or openmc.Material
+            Material by name, ID or object.
+        density_factor : float or None
+            Factor applied to the material density.
+        density : float or None
+            New density in units, instead of a factor.
+        units : {'g/cm3', 'atom/b-cm'}
+            Units of density.
+        temperature : float or None
+            New temperature in K of every instance of every cell filled
+            with the material.
+        """
+        if density_factor is not None and density is not None:
+            raise ValueError("Give density_factor or density, not both")
+        lib_material = openmc.lib.materials[self._material_id(material)]
+        original_density = lib_material.get_density('atom/b-cm')
+        cells = list(self._cells_of(lib_material.id)) if temperature is not None else []
+        # Distributed cells can hold a different temperature per instance
+        original_temperatures = [
+            [cell.get_temperature(instance) for instance in range(cell.num_instances)]
+            for cell in cells
+        ]
+        try:
+            if density_factor is not None:
+                lib_material.set_density(original_density * density_factor, 'atom/b-cm')
+            elif density is not None:
+                lib_material.set_density(density, units)
+            for cell in cells:
+                cell.set_temperature(temperature)
+            yield
+        finally:
+            lib_material.set_density(original_density, 'atom/b-cm')
+            for cell, originals in zip(cells, original_temperatures):
+                for instance, original in enumerate(originals):
+                    cell.set_temperature(original, instance)
+
+    def run(self):
+        """Runs the current state from scratch and returns its StateResult."""
+        openmc.lib.hard_reset()
+        openmc.lib.settings.seed = self.seed if self.correlated else self.seed + self.n_runs
+        openmc.lib.run(output=self.output)
+
+        statepoint = self.directory / f'state_{self.n_runs}.h5'
+        openmc.lib.statepoint_write(str(statepoint), write_source=False)
+        settings = self.model.settings
+        inactive = settings.inactive * (settings.generations_per_batch or 1)
+        with StatepointReader(statepoint) as reader:
+            k_generation = reader.k_generation[inactive:]
+        self.n_runs += 1
+        k_eff, k_eff_std = block_mean(k_generation, self.block_size)
+        return StateResult(k_eff, k_eff_std, k_generation)
+
+    @property
+    def baseline(self):
+        """StateResult of the unperturbed model, run on first use."""
+        if self._baseline is None:
+            self._baseline = self.run()
+        return self._baseline
+
+    def compare(self, state):
+        """Returns the PerturbationResult of a state against the baseline."""
+        base = self.baseline
+        if self.correlated:
+            # Blocked like k_eff, so delta_k equals state.k_eff - base.k_eff
+            delta_k, delta_k_std = block_mean(state.k_generation - base.k_generation,
+                                              self.block_size)
+        else:
+            delta_k = state.k_eff - base.k_eff
+            delta_k_std = float(np.hypot(state.k_eff_std, base.k_eff_std))
+        # rho = (k - 1) / k, so delta_rho = 1/k0 - 1/k1 = delta_k / (k0 k1)
+        scale = 1e5 / (base.k_eff * state.k_eff)
+        return PerturbationResult(state.k_eff, state.k_eff_std, delta_k, delta_k_std,
+                                  delta_k * scale, delta_k_std * scale)
+
+    def evaluate(self, material, **perturbation):
+        """Runs one perturbed state and compares it with the baseline.
+
+        perturbation is passed on to perturbed(): density_factor, density,
+        units or temperature.  Divide reactivity_pcm by the size of the
+        change for a coefficient, e.g. pcm/K.
+        """
+        with self.perturbed(material, **perturbation):
+            state = self.run()
+        return self.compare(state)
@@ -0,0 +1,274 @@
+"""Streaming post-processing of OpenMC statepoint files.
+
+Tallies are read directly from the statepoint HDF5 layout, one tally (or
+one score, or one range of filter bins) at a time, instead of loading the
+whole file through openmc.StatePoint.  Results come back as NumPy arrays
+shaped by the tally's filters, e.g. (ny, nx) for a 2D mesh tally or
+(n_groups,) for an energy tally.  Many statepoints can be combined with
+bounded memory: only running sums of the size of one tally are kept.
+"""
+from collections import namedtuple
+from pathlib import Path
+
+import h5py
+import numpy as np
+
+TallyStats = namedtuple('TallyStats', ['mean', 'std_dev', 'n'])
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def latest_statepoint(directory):
+    """Returns the most recently written statepoint file in directory.
+
+    Raises
+    ------
+    FileNotFoundError
+        If directory holds no statepoint.*.h5 file.
+    """
+    statepoints = sorted(Path(directory).glob('statepoint.*.h5'),
+                         key=lambda path: path.stat().st_mtime)
+    if not statepoints:
+        raise FileNotFoundError(f"No statepoint file found in {directory}")
+    return statepoints[-1]
+
+
+def _mean_std(sum_, sum_sq, n):
+    mean = sum_ / n
+    if n > 1:
+        variance = np.maximum(sum_sq / n - mean ** 2, 0.0) / (n - 1)
+        std_dev = np.sqrt(variance)
+    else:
+        std_dev = np.full_like(mean, np.inf)
+    return mean, std_dev
+
+
+class StatepointReader:
+    """Lazy reader for the tallies of one statepoint file.
+
+    Use as a context manager; nothing but tally metadata is read until
+    read() is called.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = h5py.File(path, 'r')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._file.close()
+
+    @property
+    def tally_ids(self):
+        """IDs of all tallies in the file."""
+        group = self._file['tallies']
+        if 'ids' not in group.attrs:
+            return []
+        return [int(tally_id) for tally_id in group.attrs['ids']]
+
+    @property
+    def k_combined(self):
+        """Combined k-effective estimate as (mean, std_dev)."""
+        mean, std_dev = self._file['k_combined'][()]
+        return float(mean), float(std_dev)
+
+    @property
+    def k_generation(self):
+        """Per-batch k-effective estimates over all batches run."""
+        return self._file['k_generation'][()]
+
+    @property
+    def entropy(self):
+        """Per-batch Shannon entropy of the fission source, or None."""
+        if 'entropy' not in self._file:
+            return None
+        return self._file['entropy'][()]
+
+    @property
+    def runtime(self):
+        """Timing statistics in seconds, keyed as in the file, e.g. 'simulation'."""
+        if 'runtime' not in self._file:
+            return {}
+        return {name: float(value[()]) for name, value in self._file['runtime'].items()}
+
+    def _group(self, tally):
+        """Returns the HDF5 group of a tally given by ID or name."""
+        if isinstance(tally, str):
+            for tally_id in self.tally_ids:
+                group = self._file[f'tallies/tally {tally_id}']
+                if 'name' in group and _decode(group['name'][()]) == tally:
+                    return group
+            raise KeyError(f"No tally named {tally!r} in {self.path}")
+        return self._file[f'tallies/tally {tally}']
+
+    def _filter_shape(self, filter_id):
+        group = self._file[f'tallies/filters/filter {filter_id}']
+        if _decode(group['type'][()]) == 'mesh':
+            mesh_id = int(np.ravel(group['bins'][()])[0])
+            dimension = self._file[f'tallies/meshes/mesh {mesh_id}/dimension'][()]
+            # Mesh bins are ordered with x varying fastest
+            return tuple(int(n) for n in dimension[::-1])
+        return (int(group['n_bins'][()]),)
+
+    def describe(self, tally):
+        """Returns (filter_shape, nuclides, scores, n_realizations)."""
+        group = self._group(tally)
+        filter_shape = ()
+        if int(group['n_filters'][()]) > 0:
+            for filter_id in group['filters'][()]:
+                filter_shape += self._filter_shape(int(filter_id))
+        nuclides = [_decode(name) for name in group['nuclides'][()]]
+        scores = [_decode(name) for name in group['score_bins'][()]]
+        return filter_shape, nuclides, scores, int(group['n_realizations'][()])
+
+    def read_sums(self, tally, score=None, nuclide=None, filter_slice=None):
+        """Returns the raw (sum, sum_sq, n_realizations) of a tally.
+
+        See read() for the arguments.
+        """
+        filter_shape, nuclides, scores, n = self.describe(tally)
+        results = self._group(tally)['results']
+
+        columns = slice(None)
+        shape = filter_shape + (len(nuclides), len(scores))
+        if score is not None or nuclide is not None:
+            i_nuc = 0 if nuclide is None else nuclides.index(nuclide)
+            i_score = 0 if score is None else scores.index(score)
+            if (nuclide is None and len(nuclides) > 1) or (score is None and len(scores) > 1):
+                raise ValueError("Select both score and nuclide when the tally has several")
+            columns = i_nuc * len(scores) + i_score
+            shape = filter_shape
+
+        rows = slice(None) if filter_slice is None else filter_slice
+        data = results[rows, columns, :]
+        if filter_slice is not None:
+            shape = (data.shape[0],) + shape[len(filter_shape):]
+        return data[..., 0].reshape(shape), data[..., 1].reshape(shape), n
+
+    def read(self, tally, score=None, nuclide=None, filter_slice=None):
+        """Reads one tally as mean and std. dev. arrays.
+
+        Parameters
+        ----------
+        tally : int or str
+            Tally ID or name.
+        score, nuclide : str or None
+            Read only this score / nuclide.  The score and nuclide axes are
+            then dropped from the result.
+        filter_slice : slice or None
+            Read only this range of flattened filter bins; the result is
+            then left flat along the filter axis.
+
+        Returns
+        -------
+        TallyStats
+            Mean and std. dev. of shape filter_shape [+ (n_nuclides,
+            n_scores)], and the number of realizations.
+        """
+        sum_, sum_sq, n = self.read_sums(tally, score, nuclide, filter_slice)
+        mean, std_dev = _mean_std(sum_, sum_sq, n)
+        return TallyStats(mean, std_dev, n)
+
+
+def read_tally(path, tally, score=None, nuclide=None, filter_slice=None):
+    """Reads one tally from the statepoint at path; see StatepointReader.read."""
+    with StatepointReader(path) as reader:
+        return reader.read(tally, score, nuclide, filter_slice)
+
+
+def iter_tallies(path):
+    """Yields (tally_id, TallyStats) for each tally, reading one at a time."""
+    with StatepointReader(path) as reader:
+        for tally_id in reader.tally_ids:
+            yield tally_id, reader.read(tally_id)
+
+
+class RunningStats:
+    """Running mean and variance of arrays (Welford's algorithm)."""
+
+    def __init__(self):
+        self.n = 0
+        self._mean = None
+        self._m2 = None
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        self.n += 1
+        if self._mean is None:
+            self._mean = values.copy()
+            self._m2 = np.zeros_like(values)
+            return
+        delta = values - self._mean
+        self._mean += delta / self.n
+        self._m2 += delta * (values - self._mean)
+
+    @property
+    def mean(self):
+        return self._mean
+
+    @property
+    def variance(self):
+        """Sample variance of the values seen so far."""
+        if self.n < 2:
+            return np.full_like(self._mean, np.inf)
+        return self._m2 / (self.n - 1)
+
+    @property
+    def std_dev(self):
+        """Standard deviation of the mean of the values seen so far."""
+        return np.sqrt(self.variance / self.n)
+
+
+def aggregate_tally(paths, tally, score=None, nuclide=None, method='pooled'):
+    """Combines one tally over many statepoints, one file at a time.
+
+    Parameters
+    ----------
+    paths : iterable of path-like
+        Statepoints of independent runs of the same model.
+    tally, score, nuclide
+        As for StatepointReader.read.
+    method : {'pooled', 'ensemble'}
+        'pooled' adds up the batch sums of all runs, as if they were one
+        long run.  'ensemble' treats each run's mean as one sample and
+        returns the mean over runs with the run-to-run standard error.
+
+    Returns
+    -------
+    TallyStats
+        n is the total number of realizations ('pooled') or of runs
+        ('ensemble').
+    """
+    if method not in ('pooled', 'ensemble'):
+        raise ValueError(f"method must be 'pooled' or 'ensemble', got {method!r}")
+
+    if method == 'ensemble':
+        stats = RunningStats()
+        for path in paths:
+            stats.update(read_tally(path, tally, score, nuclide).mean)
+        if stats.n == 0:
+            raise ValueError("No statepoints given")
+        return TallyStats(stats.mean, stats.std_dev, stats.n)
+
+    total_sum = total_sum_sq = None
+    total_n = 0
+    for path in paths:
+        with StatepointReader(path) as reader:
+            sum_, sum_sq, n = reader.read_sums(tally, score, nuclide)
+        if total_sum is None:
+            total_sum, total_sum_sq = sum_, sum_sq
+        else:
+            total_sum += sum_
+            total_sum_sq += sum_sq
+        total_n += n
+    if total_n == 0:
+        raise ValueError("No statepoints given")
+    mean, std_dev = _mean_std(total_sum, total_sum_sq, total_n)
+    return TallyStats(mean, std_dev, total_n)
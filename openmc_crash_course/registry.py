@@ -0,0 +1,104 @@
+"""Interning of geometry objects shared by the geometry builders.
+
+geometry.py and hex_geometry.py build surfaces, universes and lattices
+through intern(), keyed on their inputs.  Inside a universe_registry()
+scope, builds with the same key return one shared object; outside any
+scope every call builds a fresh one.  Top-level builders decorated with
+scoped() open a scope of their own for the duration of the call.
+"""
+import contextlib
+import functools
+
+
+class UniverseRegistry:
+    """Interns geometry objects built from identical parameters.
+
+    Inside a universe_registry() scope the create_* builders look up
+    surfaces and universes here by a key made of their inputs (materials
+    and universes by ID, dimensions by value), so models with many
+    assembly variants share one pin, water and assembly universe per
+    distinct set of inputs instead of writing duplicates to the XML.
+    Interned objects are shared within the scope; outside any scope the
+    builders return fresh objects on every call.
+    """
+
+    def __init__(self):
+        self._objects = {}
+
+    def intern(self, key, factory):
+        """Returns the object stored under key, building it on first use."""
+        try:
+            return self._objects[key]
+        except KeyError:
+            obj = self._objects[key] = factory()
+            return obj
+
+    def clear(self):
+        """Forgets all interned objects."""
+        self._objects.clear()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __contains__(self, key):
+        return key in self._objects
+
+
+# Registries of the active universe_registry() scopes, innermost last
+_stack = []
+
+
+def get_universe_registry():
+    """Returns the registry of the innermost active scope, or None."""
+    return _stack[-1] if _stack else None
+
+
+def clear_universe_registry():
+    """Empties the registry of the innermost active scope, if any."""
+    if _stack:
+        _stack[-1].clear()
+
+
+@contextlib.contextmanager
+def universe_registry(registry=None):
+    """Turns on interning for the geometry builders in a with-block.
+
+    Objects built inside the block are interned in registry (a fresh one
+    by default) and are not shared with builds outside it.  The registry,
+    and everything it keeps alive, is released on exit unless the caller
+    holds on to it.
+    """
+    registry = UniverseRegistry() if registry is None else registry
+    _stack.append(registry)
+    try:
+        yield registry
+    finally:
+        _stack.pop()
+
+
+def intern(key, factory):
+    """Interns factory() in the active registry, or just builds it.
+
+    Builders wrap every surface, universe or lattice they create in this.
+    key must hold everything the object depends on: materials and
+    universes by ID, dimensions by value.
+    """
+    if not _stack:
+        return factory()
+    return _stack[-1].intern(key, factory)
+
+
+def scoped(builder):
+    """Runs builder in a registry of its own unless a scope is active.
+
+    Parts repeated within one call, such as assembly types shared by
+    several axial layers, are then built once without being shared with
+    later calls.
+    """
+    @functools.wraps(builder)
+    def wrapper(*args, **kwargs):
+        if _stack:
+            return builder(*args, **kwargs)
+        with universe_registry():
+            return builder(*args, **kwargs)
+    return wrapper
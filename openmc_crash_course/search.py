@@ -0,0 +1,197 @@
+"""Criticality search over one parameter of a model builder.
+
+criticality_search finds the boron concentration, enrichment, fuel radius
+or any other builder parameter that gives a target k-effective.  It keeps
+the root bracketed and steps with the Illinois variant of the secant
+method, taking the statistical noise of each k-effective into account:
+
+* particles per batch grow as the search closes in, so that the standard
+  deviation stays a fraction of the distance to the target, down to half
+  the tolerance;
+* a point whose k-effective cannot be told apart from the target within
+  two standard deviations is rerun with more particles instead of being
+  trusted to lie on one side of the root;
+* each run after the first starts from the fission source of the one
+  before, with fewer inactive batches.
+
+The transport function is injectable, so the search logic can be checked
+against a synthetic k(x) without running OpenMC.
+"""
+import functools
+import math
+from collections import namedtuple
+from pathlib import Path
+
+import openmc
+
+from .postprocess import StatepointReader, latest_statepoint
+
+SearchPoint = namedtuple('SearchPoint', ['value', 'k_eff', 'k_eff_std', 'particles', 'statepoint'])
+SearchResult = namedtuple('SearchResult', [
+    'value', 'value_std', 'k_eff', 'k_eff_std', 'converged', 'history'
+])
+
+
+def run_transport(model, directory, **run_kwargs):
+    """Runs OpenMC and returns (k_eff, k_eff_std, statepoint)."""
+    model.run(cwd=directory, **run_kwargs)
+    statepoint = latest_statepoint(directory)
+    with StatepointReader(statepoint) as reader:
+        k_eff, k_eff_std = reader.k_combined
+    return k_eff, k_eff_std, statepoint
+
+
+def _particles_for(sigma_goal, last, min_particles, max_particles):
+    """Particles expected to bring the k-effective std. dev. to sigma_goal."""
+    if last is None or sigma_goal is None:
+        return min_particles
+    particles, sigma = last
+    needed = particles * (sigma / sigma_goal) ** 2
+    return min(max(math.ceil(needed), min_particles), max_particles)
+
+
+def criticality_search(builder, parameter, bracket, params=None, target=1.0,
+                       k_tol=2e-4, x_tol=0.0, max_iterations=20,
+                       min_particles=None, max_particles=None,
+                       warm_start=True, warm_inactive=5,
+                       directory='search', transport=None, **run_kwargs):
+    """Finds the value of a builder parameter that gives a target k-effective.
+
+    Parameters
+    ----------
+    builder : str or callable
+        Name of an entry in models.PIPELINES, or a function returning an
+        openmc.Model.
+    parameter : str
+        Keyword argument of builder to search over, e.g. 'boron_ppm'.
+    bracket : tuple of float
+        Two parameter values whose k-effective lie on either side of
+        target.
+    params : dict or None
+        Further keyword arguments for builder.
+    target : float
+        k-effective to search for.
+    k_tol : float
+        Converged once k-effective is within k_tol of target with a
+        standard deviation of at most k_tol / 2.
+    x_tol : float
+        Also converged once the bracket is narrower than this.
+    max_iterations : int
+        Transport runs after the two at the bracket ends.
+    min_particles, max_particles : int or None
+        Range of particles per batch; by default the model's particles
+        and 100 times that.
+    warm_start : bool
+        Start each run from the fission source of the previous one.
+    warm_inactive : int
+        Inactive batches of warm-started runs; active batches are kept.
+    directory : path-like
+        Each run works in an iteration_<n> subdirectory.
+    transport : callable or None
+        Function (model, directory) -> (k_eff, k_eff_std, statepoint),
+        with statepoint None when there is no source to reuse; defaults to
+        run_transport with run_kwargs.
+
+    Returns
+    -------
+    SearchResult
+        Parameter value and k-effective of the last run, the std. dev. of
+        the value propagated from that of k-effective, whether the search
+        converged, and the SearchPoint of every run.
+
+    Raises
+    ------
+    ValueError
+        If the bracket does not contain the target.
+    """
+    if isinstance(builder, str):
+        from .models import PIPELINES
+        builder = PIPELINES[builder]
+    params = dict(params or {})
+    directory = Path(directory)
+    if transport is None:
+        run_kwargs.setdefault('output', False)
+        transport = functools.partial(run_transport, **run_kwargs)
+
+    history = []
+    state = {'source': None, 'last': None, 'at_max': False}
+
+    def evaluate(value, sigma_goal):
+        # sigma_goal None runs with the fewest particles
+        model = builder(**params, **{parameter: value})
+        settings = model.settings
+        lower = settings.particles if min_particles is None else min_particles
+        upper = 100 * lower if max_particles is None else max_particles
+        settings.particles = _particles_for(sigma_goal, state['last'], lower, upper)
+        if state['source'] is not None:
+            active = settings.batches - settings.inactive
+            settings.source = state['source']
+            settings.inactive = min(warm_inactive, settings.inactive)
+            settings.batches = settings.inactive + active
+
+        run_dir = directory / f'iteration_{len(history):02d}'
+        run_dir.mkdir(parents=True, exist_ok=True)
+        k_eff, k_eff_std, statepoint = transport(model, run_dir)
+        history.append(SearchPoint(value, k_eff, k_eff_std, settings.particles, statepoint))
+        state['last'] = (settings.particles, k_eff_std)
+        state['at_max'] = settings.particles >= upper
+        if warm_start and statepoint is not None:
+            state['source'] = openmc.FileSource(str(Path(statepoint).resolve()))
+        return k_eff - target, k_eff_std
+
+    def result(point, slope, converged):
+        # Value and k-effective always come from the same run
+        value_std = point.k_eff_std / abs(slope) if slope else float('inf')
+        return SearchResult(point.value, value_std, point.k_eff, point.k_eff_std,
+                            converged, history)
+
+    def on_target(point):
+        return abs(point.k_eff - target) <= k_tol and point.k_eff_std <= k_tol / 2
+
+    a, b = bracket
+    fa, _ = evaluate(a, None)
+    fb, _ = evaluate(b, None)
+    slope = (fb - fa) / (b - a)
+    for point, f in zip(history, (fa, fb)):
+        if f == 0:
+            # An end of the bracket hits the target; no secant step needed
+            return result(point, slope, on_target(point))
+    if fa * fb > 0:
+        raise ValueError(f"k-effective at {parameter}={a} and {b} is on the same side "
+                         f"of {target}: {fa + target:.5f}, {fb + target:.5f}")
+    # Unweighted values for the slope; Illinois halves fa and fb
+    raw = {a: fa, b: fb}
+    side = None
+    x = b - fb * (b - a) / (fb - fa)
+    sigma_goal = max(k_tol / 2, min(abs(fa), abs(fb)) / 4)
+
+    for _ in range(max_iterations):
+        fx, sigma = evaluate(x, sigma_goal)
+        slope = (raw[b] - raw[a]) / (b - a)
+        if on_target(history[-1]):
+            return result(history[-1], slope, True)
+        if abs(fx) < 2 * sigma:
+            # Too close to the target to tell which side x is on
+            if state['at_max']:
+                return result(history[-1], slope, False)
+            sigma_goal = max(k_tol / 2, abs(fx) / 4)
+            continue
+
+        raw[x] = fx
+        if fx * fb > 0:
+            b, fb = x, fx
+            if side == 'b':
+                fa /= 2
+            side = 'b'
+        else:
+            a, fa = x, fx
+            if side == 'a':
+                fb /= 2
+            side = 'a'
+        slope = (raw[b] - raw[a]) / (b - a)
+        if abs(b - a) <= x_tol:
+            return result(history[-1], slope, True)
+        x = b - fb * (b - a) / (fb - fa)
+        sigma_goal = max(k_tol / 2, abs(fx) / 4)
+
+    return result(history[-1], slope, False)
@@ -0,0 +1,262 @@
+"""Initial fission sources seeded from cheaper prior results.
+
+A core started from a point source spends many inactive batches spreading
+the fission source over the fuel.  The helpers here write a source file
+that is already close to converged instead:
+
+* assembly_power_source samples fission sites from an assembly (or pin)
+  power shape, e.g. from a coarse earlier run, into the fuel pins.
+* unfold_source mirrors the source of a quarter or octant model (see the
+  symmetry option of create_core_geometry) to the full core.
+* neighbour_source reuses the final source of the closest finished case
+  of a parameter sweep.
+
+Each returns an openmc.FileSource for settings.source.  Whether seeding
+paid off is measured by inactive_batches_saved, which applies
+choose_inactive_batches to a seeded and an unseeded run.
+"""
+import json
+from collections import namedtuple
+from pathlib import Path
+
+import h5py
+import numpy as np
+import openmc
+
+from .geometry import _check_symmetry, guide_tube_mask
+from .convergence import choose_inactive_batches
+from .postprocess import StatepointReader
+from .sweep import RESULT_FILE
+
+InactiveSavings = namedtuple('InactiveSavings', ['baseline', 'seeded', 'saved'])
+
+# Watt fission spectrum parameters for U235 (MeV, 1/MeV)
+WATT_A = 0.988
+WATT_B = 2.249
+
+# Layout of a source bank as written by openmc.write_source_file
+_POSITION_DTYPE = np.dtype([('x', '<f8'), ('y', '<f8'), ('z', '<f8')])
+_SOURCE_DTYPE = np.dtype([
+    ('r', _POSITION_DTYPE),
+    ('u', _POSITION_DTYPE),
+    ('E', '<f8'),
+    ('time', '<f8'),
+    ('wgt', '<f8'),
+    ('delayed_group', '<i4'),
+    ('surf_id', '<i4'),
+    ('particle', '<i4'),
+])
+
+
+def sample_watt(n, rng, a=WATT_A, b=WATT_B):
+    """Samples n energies in eV from a Watt fission spectrum."""
+    xi = rng.random((4, n))
+    maxwell = -a * (np.log(xi[0]) + np.log(xi[1]) * np.cos(np.pi * xi[2] / 2) ** 2)
+    energy = maxwell + a * a * b / 4 + (2 * xi[3] - 1) * np.sqrt(a * a * b * maxwell)
+    return energy * 1e6
+
+
+def _isotropic(n, rng):
+    mu = 2 * rng.random(n) - 1
+    phi = 2 * np.pi * rng.random(n)
+    s = np.sqrt(1 - mu ** 2)
+    return np.column_stack([s * np.cos(phi), s * np.sin(phi), mu])
+
+
+def _write_source_bank(path, bank):
+    """Writes a source bank array to a source file and returns its FileSource."""
+    with h5py.File(path, 'w') as fh:
+        fh.attrs['filetype'] = np.bytes_('source')
+        fh.create_dataset('source_bank', data=bank)
+    return openmc.FileSource(str(Path(path).resolve()))
+
+
+def assembly_power_source(path, core_map, powers, pitch=1.26, assy_size=17,
+                          wall_thickness=0.2, gap_thickness=0.1, fuel_radius=0.39,
+                          height=400.0, n_particles=100000, axial_shape='cosine',
+                          seed=1):
+    """Writes a fission source sampled from an assembly or pin power shape.
+
+    Parameters
+    ----------
+    path : path-like
+        Source file to write.
+    core_map : array-like of int
+        Core map of the target model; powers at reflector positions are
+        ignored.
+    powers : numpy.ndarray
+        Relative powers of shape (n, n) per assembly, or (n, n, assy_size,
+        assy_size) per pin as returned by extract_pin_values.  NaN entries
+        count as zero.
+    pitch, assy_size, wall_thickness, gap_thickness, fuel_radius, height
+        Dimensions of the target model, as for create_core_geometry.
+    n_particles : int
+        Number of source sites.
+    axial_shape : {'cosine', 'uniform'}
+        Axial distribution of the sites over the core height.
+    seed : int
+        Seed of the random number generator.
+
+    Returns
+    -------
+    openmc.FileSource
+    """
+    if axial_shape not in ('cosine', 'uniform'):
+        raise ValueError(f"Unknown axial shape {axial_shape!r}")
+    loading = np.asarray(core_map) > 0
+    n = loading.shape[0]
+    fuel_pins = ~guide_tube_mask(assy_size)
+
+    powers = np.nan_to_num(np.asarray(powers, dtype=float))
+    if powers.shape == loading.shape:
+        powers = powers[:, :, np.newaxis, np.newaxis] * fuel_pins
+    elif powers.shape != loading.shape + fuel_pins.shape:
+        raise ValueError(f"Power shape {powers.shape} does not match the core map "
+                         f"{loading.shape} and assembly size {assy_size}")
+    weights = np.clip(powers, 0.0, None) * loading[:, :, np.newaxis, np.newaxis] * fuel_pins
+    total = weights.sum()
+    if total <= 0.0:
+        raise ValueError("No power in any fuel pin of the core map")
+
+    rng = np.random.default_rng(seed)
+    flat = rng.choice(weights.size, size=n_particles, p=weights.ravel() / total)
+    row, col, pin_row, pin_col = np.unravel_index(flat, weights.shape)
+
+    # Rows count from the top of the map, as in the lattices
+    assy_pitch = pitch * assy_size + 2 * (wall_thickness + gap_thickness)
+    x = (col - (n - 1) / 2) * assy_pitch + (pin_col - (assy_size - 1) / 2) * pitch
+    y = ((n - 1) / 2 - row) * assy_pitch + ((assy_size - 1) / 2 - pin_row) * pitch
+    radius = fuel_radius * np.sqrt(rng.random(n_particles))
+    angle = 2 * np.pi * rng.random(n_particles)
+    x += radius * np.cos(angle)
+    y += radius * np.sin(angle)
+    if axial_shape == 'cosine':
+        z = height / np.pi * np.arcsin(2 * rng.random(n_particles) - 1)
+    else:
+        z = height * (rng.random(n_particles) - 0.5)
+
+    # Neutrons of unit weight at time zero, born in no surface or group
+    bank = np.zeros(n_particles, dtype=_SOURCE_DTYPE)
+    bank['r']['x'], bank['r']['y'], bank['r']['z'] = x, y, z
+    directions = _isotropic(n_particles, rng)
+    for axis, name in enumerate('xyz'):
+        bank['u'][name] = directions[:, axis]
+    bank['E'] = sample_watt(n_particles, rng)
+    bank['wgt'] = 1.0
+    return _write_source_bank(path, bank)
+
+
+def unfold_source(source_path, symmetry, path):
+    """Mirrors the source of a symmetric model onto the full core.
+
+    Parameters
+    ----------
+    source_path : path-like
+        Source or statepoint file of a quarter or octant model built with
+        create_core_geometry(symmetry=...).
+    symmetry : {'quarter', 'octant'}
+        Symmetry of the model that wrote source_path.
+    path : path-like
+        Source file to write; it holds 4 (quarter) or 8 (octant) times as
+        many sites, with unchanged weights.
+
+    Returns
+    -------
+    openmc.FileSource
+    """
+    _check_symmetry(symmetry)
+    if symmetry == 'full':
+        raise ValueError("A full-core source needs no unfolding")
+    with h5py.File(source_path, 'r') as fh:
+        bank = fh['source_bank'][()]
+
+    if symmetry == 'octant':
+        # The octant sits below the diagonal; reflect it to fill the quarter
+        swapped = bank.copy()
+        for field in ('r', 'u'):
+            swapped[field]['x'], swapped[field]['y'] = bank[field]['y'], bank[field]['x']
+        bank = np.concatenate([bank, swapped])
+
+    copies = [bank]
+    for sx, sy in ((-1, 1), (1, -1), (-1, -1)):
+        mirrored = bank.copy()
+        for field in ('r', 'u'):
+            mirrored[field]['x'] *= sx
+            mirrored[field]['y'] *= sy
+        copies.append(mirrored)
+    return _write_source_bank(path, np.concatenate(copies))
+
+
+def _param_distance(a, b):
+    """Relative distance between two numeric parameter values."""
+    scale = max(abs(a), abs(b))
+    return 0.0 if scale == 0 else (a - b) / scale
+
+
+def neighbour_source(sweep_root, params, match=()):
+    """Returns the final source of the closest finished sweep case.
+
+    Parameters
+    ----------
+    sweep_root : path-like
+        Root directory of a run_sweep sweep.
+    params : dict
+        Parameters of the case to seed.
+    match : sequence of str
+        Parameters that must be equal, e.g. those changing the geometry
+        ('grid_size', 'assy_size').  Non-numeric parameters always must.
+
+    Returns
+    -------
+    openmc.FileSource or None
+        Source read from the neighbour's statepoint, or None if no
+        finished case qualifies.
+    """
+    best = None
+    for result_path in Path(sweep_root).glob(f'*/{RESULT_FILE}'):
+        result = json.loads(result_path.read_text())
+        other = result['params']
+        if other == params or set(other) != set(params):
+            continue
+        distance = 0.0
+        for name, value in params.items():
+            numeric = (isinstance(value, (int, float)) and
+                       isinstance(other[name], (int, float)))
+            if name in match or not numeric:
+                if other[name] != value:
+                    break
+            else:
+                distance += _param_distance(value, other[name]) ** 2
+        else:
+            # The statepoint lies in the case directory; records may hold a
+            # path relative to wherever the sweep was started
+            statepoint = result_path.parent / Path(result['statepoint']).name
+            if statepoint.exists() and (best is None or distance < best[0]):
+                best = (distance, statepoint)
+    if best is None:
+        return None
+    return openmc.FileSource(str(best[1].resolve()))
+
+
+def inactive_batches_saved(baseline_statepoint, seeded_statepoint, window=10):
+    """Compares the inactive batches needed without and with a seed source.
+
+    Both statepoints should come from runs of the same model, with an
+    entropy mesh and enough batches for choose_inactive_batches.
+
+    Returns
+    -------
+    InactiveSavings
+        Batches needed by each run and their difference; an entry is None
+        if that run did not converge.
+    """
+    needed = []
+    for path in (baseline_statepoint, seeded_statepoint):
+        with StatepointReader(path) as reader:
+            entropy = reader.entropy
+            if entropy is None:
+                raise ValueError(f"No entropy in {path}, set settings.entropy_mesh")
+            needed.append(choose_inactive_batches(entropy, reader.k_generation, window))
+    baseline, seeded = needed
+    saved = None if baseline is None or seeded is None else baseline - seeded
+    return InactiveSavings(baseline, seeded, saved)
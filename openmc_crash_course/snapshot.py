@@ -0,0 +1,293 @@
+"""Binary snapshots of fully built OpenMC models.
+
+Building a full core through get_materials and create_core_geometry takes
+far longer than reading it back, so a built openmc.Model (materials,
+surfaces, cells, universes, lattices, settings and tallies) can be saved
+once and loaded in one read by every worker and rerun.
+
+A snapshot file is a fixed preamble (magic and format version), a JSON
+header and a zlib-compressed pickle of the model.  The header records the
+OpenMC version, a caller-chosen key (e.g. a hash of the builder
+parameters), the SHA-256 of the payload and of the exported XML, so
+snapshots written by another OpenMC, for other parameters or cut short
+are rejected instead of silently used.  Loading re-registers the IDs of
+all objects with OpenMC, so objects created afterwards do not collide
+with them, and the loaded model exports XML identical to the original.
+
+Snapshots are pickles, and unpickling runs whatever code the file asks
+for: only load snapshots written by yourself or someone you trust.  The
+checksums in the header catch stale and truncated files, not tampering,
+since whoever can rewrite the payload can rewrite the header too.  As a
+guard, load_snapshot refuses files that another user could have replaced:
+files owned by someone else or writable by group or others, and files in
+a directory writable by group or others (unless it is sticky, like
+/tmp).  Where snapshots are shared, pass a secret to save_snapshot and
+load_snapshot; the header then carries an HMAC of the payload under that
+secret, and a snapshot without a matching HMAC is rejected before it is
+unpickled.
+"""
+import hashlib
+import hmac
+import json
+import os
+import pickle
+import stat
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+
+import openmc
+
+from .cache import XML_FILES
+
+MAGIC = b'OCCSNAP\0'
+FORMAT_VERSION = 1
+
+# Magic, format version and JSON header length
+_PREAMBLE = struct.Struct('<8sII')
+
+
+def model_key(builder, params):
+    """Returns a snapshot key for the model builder(**params) returns."""
+    name = builder if isinstance(builder, str) else f'{builder.__module__}.{builder.__qualname__}'
+    text = json.dumps({'builder': name, 'params': params}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def xml_digest(model):
+    """Returns the SHA-256 of the XML files model exports."""
+    hasher = hashlib.sha256()
+    with tempfile.TemporaryDirectory() as tmp:
+        model.export_to_xml(tmp)
+        for name in XML_FILES:
+            path = Path(tmp) / name
+            hasher.update(name.encode() + b'\0')
+            if path.exists():
+                hasher.update(path.read_bytes())
+            hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+def _all_objects(model):
+    """Yields every ID-carrying object of model."""
+    yield from model.materials
+    geometry = model.geometry
+    yield from geometry.get_all_materials().values()
+    yield from geometry.get_all_surfaces().values()
+    yield from geometry.get_all_cells().values()
+    yield from geometry.get_all_universes().values()
+    yield from geometry.get_all_lattices().values()
+    for tally in model.tallies:
+        yield tally
+        yield from tally.filters
+        for tally_filter in tally.filters:
+            mesh = getattr(tally_filter, 'mesh', None)
+            if mesh is not None:
+                yield mesh
+
+    # Meshes only the settings refer to, and the weight windows on them
+    settings = model.settings
+    for name in ('entropy_mesh', 'ufs_mesh'):
+        mesh = getattr(settings, name, None)
+        if mesh is not None:
+            yield mesh
+    for weight_windows in getattr(settings, 'weight_windows', None) or []:
+        yield weight_windows
+        yield weight_windows.mesh
+    for generator in getattr(settings, 'weight_window_generators', None) or []:
+        yield generator.mesh
+
+
+def _register_ids(model):
+    """Marks the IDs of a loaded model as used in this process."""
+    for obj in _all_objects(model):
+        # used_ids and next_id live on the class that declares them, e.g.
+        # UniverseBase for universes and Lattice for lattices; Lattice
+        # shares the used_ids set of UniverseBase but has its own next_id
+        owner = next(cls for cls in type(obj).__mro__ if 'used_ids' in vars(cls))
+        owner.used_ids.add(obj.id)
+        owner.next_id = max(owner.next_id, obj.id + 1)
+
+
+def _payload_hmac(secret, payload):
+    if isinstance(secret, str):
+        secret = secret.encode()
+    return hmac.new(secret, payload, hashlib.sha256).hexdigest()
+
+
+def _check_trusted(path):
+    """Raises PermissionError if another user could have replaced path.
+
+    See the module docstring; this is a no-op where file ownership is not
+    available, e.g. on Windows.
+    """
+    if not hasattr(os, 'getuid'):
+        return
+    path = Path(path).resolve()
+    info = path.stat()
+    if info.st_uid not in (os.getuid(), 0):
+        raise PermissionError(f"Refusing to load snapshot {path} owned by another user")
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"Refusing to load snapshot {path}, it is writable by "
+                              f"group or others")
+    mode = path.parent.stat().st_mode
+    if mode & (stat.S_IWGRP | stat.S_IWOTH) and not mode & stat.S_ISVTX:
+        raise PermissionError(f"Refusing to load snapshot {path}, its directory is "
+                              f"writable by group or others")
+
+
+def save_snapshot(model, path, key=None, level=1, secret=None):
+    """Writes a snapshot of a built model.
+
+    Parameters
+    ----------
+    model : openmc.Model
+        Model to save.
+    path : path-like
+        Snapshot file; written atomically.
+    key : str or None
+        Identifies what was built, e.g. model_key(builder, params);
+        load_snapshot can require a match.
+    level : int
+        zlib compression level of the payload.
+    secret : bytes, str or None
+        Key for an HMAC of the payload, which load_snapshot checks when
+        given the same secret.
+
+    Returns
+    -------
+    dict
+        The header written.
+    """
+    payload = zlib.compress(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL), level)
+    header = {
+        'openmc_version': openmc.__version__,
+        'key': key,
+        'payload_sha256': hashlib.sha256(payload).hexdigest(),
+        'payload_bytes': len(payload),
+        'xml_sha256': xml_digest(model),
+    }
+    if secret is not None:
+        header['payload_hmac'] = _payload_hmac(secret, payload)
+    header_bytes = json.dumps(header, sort_keys=True).encode()
+
+    path = Path(path)
+    tmp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    # Not writable by group or others, or load_snapshot would refuse it
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    with os.fdopen(fd, 'wb') as fh:
+        fh.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        fh.write(header_bytes)
+        fh.write(payload)
+    os.replace(tmp_path, path)
+    return header
+
+
+def read_header(path):
+    """Returns the header of a snapshot file without loading the model."""
+    with open(path, 'rb') as fh:
+        return _read_header(fh, path)
+
+
+def _read_header(fh, path):
+    preamble = fh.read(_PREAMBLE.size)
+    if len(preamble) != _PREAMBLE.size:
+        raise ValueError(f"{path} is not a model snapshot")
+    magic, version, header_size = _PREAMBLE.unpack(preamble)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a model snapshot")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Snapshot {path} has format version {version}, "
+                         f"expected {FORMAT_VERSION}")
+    return json.loads(fh.read(header_size))
+
+
+def load_snapshot(path, key=None, verify=False, secret=None):
+    """Loads a model saved with save_snapshot.
+
+    Snapshots are unpickled, so only load files from a trusted source; see
+    the module docstring for the checks made before unpickling.
+
+    Parameters
+    ----------
+    path : path-like
+        Snapshot file.
+    key : str or None
+        If given, the key the snapshot must have been saved with.
+    verify : bool
+        Also check that the loaded model exports the same XML as the
+        original; this costs an export.
+    secret : bytes, str or None
+        If given, the secret the snapshot must have been saved with; the
+        payload is only unpickled if its HMAC matches.
+
+    Returns
+    -------
+    openmc.Model
+
+    Raises
+    ------
+    ValueError
+        If the file is not a snapshot, or is stale: another format or
+        OpenMC version, another key, or a corrupt payload; also if the
+        HMAC is missing or does not match secret.
+    PermissionError
+        If the file or its directory could have been replaced by another
+        user.
+    """
+    _check_trusted(path)
+    with open(path, 'rb') as fh:
+        header = _read_header(fh, path)
+        payload = fh.read()
+
+    if header['openmc_version'] != openmc.__version__:
+        raise ValueError(f"Snapshot {path} was written by OpenMC "
+                         f"{header['openmc_version']}, running {openmc.__version__}")
+    if key is not None and header['key'] != key:
+        raise ValueError(f"Snapshot {path} has key {header['key']}, expected {key}")
+    if hashlib.sha256(payload).hexdigest() != header['payload_sha256']:
+        raise ValueError(f"Snapshot {path} is corrupt")
+    if secret is not None and not hmac.compare_digest(
+            header.get('payload_hmac', ''), _payload_hmac(secret, payload)):
+        raise ValueError(f"Snapshot {path} was not saved with this secret")
+
+    model = pickle.loads(zlib.decompress(payload))
+    _register_ids(model)
+    if verify and xml_digest(model) != header['xml_sha256']:
+        raise ValueError(f"Snapshot {path} does not reproduce its XML")
+    return model
+
+
+def cached_model(path, builder, secret=None, **params):
+    """Loads the model from a snapshot, building and saving it if needed.
+
+    Parameters
+    ----------
+    path : path-like
+        Snapshot file.
+    builder : str or callable
+        Name of an entry in models.PIPELINES, or a function returning an
+        openmc.Model.
+    secret : bytes, str or None
+        Secret for the payload HMAC, see save_snapshot.
+    **params
+        Keyword arguments for the builder; they are part of the key, so a
+        snapshot built with other parameters is rebuilt.  A snapshot that
+        is refused (see load_snapshot) is rebuilt and replaced as well.
+
+    Returns
+    -------
+    openmc.Model
+    """
+    key = model_key(builder, params)
+    try:
+        return load_snapshot(path, key=key, secret=secret)
+    except (OSError, ValueError):
+        pass
+    if isinstance(builder, str):
+        from .models import PIPELINES
+        builder = PIPELINES[builder]
+    model = builder(**params)
+    save_snapshot(model, path, key=key, secret=secret)
+    return model
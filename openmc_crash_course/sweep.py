@@ -0,0 +1,247 @@
+"""Parallel parameter sweeps over the example pipelines.
+
+A sweep expands a grid of builder parameters (enrichment, pitch,
+fuel_radius, boron_ppm, particles, ...) into cases.  Each case is exported
+to its own working directory under the sweep root, so concurrent OpenMC
+runs never share XML or statepoint files, and its results are written to
+``result.json`` next to the inputs.  Cases that already have a result are
+skipped, which makes an interrupted sweep resumable by running it again.
+"""
+import csv
+import hashlib
+import itertools
+import json
+import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import openmc
+
+from .models import PIPELINES
+from .postprocess import latest_statepoint
+from .telemetry import PhaseTimer, parse_output, run_openmc
+
+RESULT_FILE = 'result.json'
+
+
+def _plain(value):
+    """Converts a NumPy scalar to the Python value json can write."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _is_axis(value):
+    """Whether a grid value is a sequence of values to sweep over."""
+    if isinstance(value, (str, bytes, dict)):
+        return False
+    if isinstance(value, np.ndarray):
+        return value.ndim > 0
+    return isinstance(value, Iterable)
+
+
+def expand_grid(grid):
+    """Returns the list of parameter dicts spanned by grid.
+
+    grid maps parameter names to a value or to any non-string iterable of
+    values, e.g. a list or np.linspace(...); the cases are the Cartesian
+    product of all iterables.  NumPy scalars become plain Python values.
+
+    Raises
+    ------
+    ValueError
+        If an axis repeats a value; its cases would share one directory
+        and result, so a resumed sweep would skip all but the first.
+    """
+    names = list(grid)
+    values = []
+    for name in names:
+        if _is_axis(grid[name]):
+            axis = [_plain(value) for value in grid[name]]
+        else:
+            axis = [_plain(grid[name])]
+        for i, value in enumerate(axis):
+            if value in axis[:i]:
+                raise ValueError(f"Sweep axis {name!r} repeats the value {value!r}")
+        values.append(axis)
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def case_name(params):
+    """Returns a stable directory name for a set of case parameters."""
+    params = {name: _plain(value) for name, value in params.items()}
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return f'case_{digest[:12]}'
+
+
+def _read_results(statepoint_path):
+    with openmc.StatePoint(statepoint_path) as sp:
+        keff = sp.keff
+        tallies = {}
+        for tally in sp.tallies.values():
+            tallies[tally.name or str(tally.id)] = {
+                'scores': list(tally.scores),
+                'shape': list(tally.mean.shape),
+                'mean': tally.mean.ravel().tolist(),
+                'std_dev': tally.std_dev.ravel().tolist(),
+            }
+    return keff.nominal_value, keff.std_dev, tallies
+
+
+def run_case(pipeline, params, case_dir,
+             mpi_procs=None, threads=None, openmc_exec='openmc'):
+    """Builds, exports and runs one sweep case in case_dir.
+
+    Parameters
+    ----------
+    pipeline : str or callable
+        Name of an entry in models.PIPELINES, or a picklable function that
+        takes the case parameters as keyword arguments and returns an
+        openmc.Model.
+    params : dict
+        Keyword arguments for the pipeline builder.
+    case_dir : path-like
+        Working directory for this case only.
+    mpi_procs : int or None
+        Number of MPI ranks to launch OpenMC with, through mpiexec.
+    threads : int or None
+        Number of OpenMP threads per rank.
+
+    Returns
+    -------
+    dict
+        The case record, also written to case_dir / RESULT_FILE.  Its
+        'telemetry' entry holds the build/export phase times and the
+        parsed OpenMC output (see telemetry.parse_output).
+    """
+    builder = PIPELINES[pipeline] if isinstance(pipeline, str) else pipeline
+    case_dir = Path(case_dir)
+    case_dir.mkdir(parents=True, exist_ok=True)
+
+    timer = PhaseTimer()
+    with timer.phase('build'):
+        model = builder(**params)
+    with timer.phase('export'):
+        model.export_to_xml(case_dir)
+
+    mpi_args = ['mpiexec', '-n', str(mpi_procs)] if mpi_procs else None
+    output, wall_time = run_openmc(case_dir, threads=threads, mpi_args=mpi_args,
+                                   openmc_exec=openmc_exec)
+
+    statepoint = latest_statepoint(case_dir)
+    k_eff, k_eff_std, tallies = _read_results(statepoint)
+    result = {
+        'case': case_dir.name,
+        'params': params,
+        'k_eff': k_eff,
+        'k_eff_std': k_eff_std,
+        'statepoint': str(statepoint.resolve()),
+        'tallies': tallies,
+        'telemetry': dict(parse_output(output), phases=timer.phases, wall_time=wall_time),
+    }
+
+    # Write atomically so an interrupted case is never mistaken for a result
+    tmp_path = case_dir / (RESULT_FILE + '.tmp')
+    tmp_path.write_text(json.dumps(result))
+    os.replace(tmp_path, case_dir / RESULT_FILE)
+    return result
+
+
+def write_results_table(results, path):
+    """Writes one CSV row per case: parameters, k_eff and tally totals.
+
+    Tally columns hold the sum of the mean over all filter bins and
+    nuclides for each score, named ``<tally>.<score>``; full arrays stay
+    in each case's result file.
+    """
+    param_names = sorted({name for result in results for name in result['params']})
+    tally_columns = sorted({
+        f'{tally_name}.{score}'
+        for result in results
+        for tally_name, tally in result['tallies'].items()
+        for score in tally['scores']
+    })
+
+    with open(path, 'w', newline='') as fh:
+        writer = csv.writer(fh)
+        writer.writerow(['case'] + param_names + ['k_eff', 'k_eff_std'] + tally_columns)
+        for result in results:
+            totals = {}
+            for tally_name, tally in result['tallies'].items():
+                # Means are stored flat; shape is (filter bins, nuclides, scores)
+                mean = np.reshape(tally['mean'], tally['shape'])
+                for i, score in enumerate(tally['scores']):
+                    totals[f'{tally_name}.{score}'] = float(mean[..., i].sum())
+            writer.writerow(
+                [result['case']] +
+                [result['params'].get(name, '') for name in param_names] +
+                [result['k_eff'], result['k_eff_std']] +
+                [totals.get(column, '') for column in tally_columns]
+            )
+
+
+def run_sweep(pipeline, grid, root,
+              processes=None, mpi_procs=None, threads=None,
+              openmc_exec='openmc', resume=True):
+    """Runs every case of a parameter grid with a process pool.
+
+    Parameters
+    ----------
+    pipeline : str or callable
+        Pipeline name or builder, see run_case.
+    grid : dict
+        Parameter grid, see expand_grid.
+    root : path-like
+        Sweep directory; each case runs in root / case_name(params).
+    processes : int or None
+        Number of cases run concurrently.  Choose it together with
+        mpi_procs and threads so that the node is not oversubscribed.
+    mpi_procs, threads : int or None
+        MPI ranks and OpenMP threads given to each case.
+    resume : bool
+        Skip cases whose result file already exists.
+
+    Returns
+    -------
+    list of dict
+        Case records in grid order.  They are also collected into
+        root / 'results.csv' and root / 'results.json'.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+
+    cases = expand_grid(grid)
+    results = {}
+    pending = []
+    for params in cases:
+        name = case_name(params)
+        result_path = root / name / RESULT_FILE
+        if resume and result_path.exists():
+            results[name] = json.loads(result_path.read_text())
+        else:
+            pending.append(params)
+
+    failures = {}
+    if pending:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            futures = {
+                pool.submit(run_case, pipeline, params, root / case_name(params),
+                            mpi_procs, threads, openmc_exec): case_name(params)
+                for params in pending
+            }
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as exc:
+                    failures[name] = exc
+
+    ordered = [results[case_name(params)] for params in cases
+               if case_name(params) in results]
+    write_results_table(ordered, root / 'results.csv')
+    (root / 'results.json').write_text(json.dumps(ordered, indent=2))
+
+    if failures:
+        details = '; '.join(f'{name}: {exc}' for name, exc in sorted(failures.items()))
+        raise RuntimeError(f"{len(failures)} sweep case(s) failed: {details}")
+    return ordered
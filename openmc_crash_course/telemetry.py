@@ -0,0 +1,202 @@
+"""Structured run telemetry for OpenMC runs.
+
+run_openmc runs the OpenMC executable with its output captured instead
+of discarded, parse_output extracts the header, timing statistics,
+calculation rates and k-effective results from that output, and
+PhaseTimer records Python-side phases such as building and exporting the
+model.  instrumented_run ties these together and appends one JSON object
+per run to a JSON-lines log, so throughput can be compared across OpenMC
+releases, machines and core sizes.  parse_output works on any saved
+output text, so it can be checked without a live run.
+"""
+import contextlib
+import json
+import os
+import re
+import subprocess
+import time
+from pathlib import Path
+
+LOG_FILE = 'openmc.log'
+
+# Labels of the timing statistics block, by their key in the parsed output
+_TIMING_LABELS = {
+    'Total time for initialization': 'initialization',
+    'Reading cross sections': 'reading_cross_sections',
+    'Total time in simulation': 'simulation',
+    'Time in transport only': 'transport',
+    'Time in inactive batches': 'inactive_batches',
+    'Time in active batches': 'active_batches',
+    'Time synchronizing fission bank': 'synchronizing_fission_bank',
+    'Sampling source sites': 'sampling_source_sites',
+    'SEND/RECV source sites': 'send_recv_source_sites',
+    'Time accumulating tallies': 'accumulating_tallies',
+    'Time writing statepoints': 'writing_statepoints',
+    'Total time for finalization': 'finalization',
+    'Total time elapsed': 'elapsed',
+}
+_HEADER_LABELS = {
+    'Version': 'version',
+    'Git SHA1': 'git_sha1',
+    'OpenMP Threads': 'threads',
+    'MPI Processes': 'mpi_processes',
+}
+
+_NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+_TIMING_RE = re.compile(rf'^\s*(.+?)\s*=\s*({_NUMBER})\s*seconds\s*$', re.MULTILINE)
+_RATE_RE = re.compile(
+    rf'^\s*Calculation Rate(?: \((\w+)\))?\s*=\s*({_NUMBER})\s*particles/second',
+    re.MULTILINE
+)
+_RESULT_RE = re.compile(
+    rf'^\s*(.+?)\s*=\s*({_NUMBER})\s*\+/-\s*({_NUMBER})\s*$', re.MULTILINE
+)
+_HEADER_RE = re.compile(r'^\s*([A-Za-z0-9 /]+?)\s*\|\s*(\S.*?)\s*$', re.MULTILINE)
+_BATCH_RE = re.compile(r'^\s*(\d+)/(\d+)\s+' + _NUMBER, re.MULTILINE)
+
+
+def _slug(label):
+    return re.sub(r'[^a-z0-9]+', '_', label.lower()).strip('_')
+
+
+def parse_output(text):
+    """Parses the standard output of an OpenMC run.
+
+    Parameters
+    ----------
+    text : str
+        Captured output, e.g. the contents of an openmc.log file.
+
+    Returns
+    -------
+    dict
+        'header': version, git_sha1, threads and mpi_processes as found;
+        'timing': seconds per phase of the timing statistics, keyed
+        initialization, inactive_batches, active_batches, elapsed, ...;
+        'rates': particles/second keyed 'inactive', 'active' (or 'all' for
+        fixed source runs); 'results': (mean, std_dev) of every
+        ``label = mean +/- std`` line, e.g. 'combined_k_effective';
+        'batches': the last batch number printed.  Sections missing from
+        the output are left empty.
+    """
+    header = {}
+    for label, value in _HEADER_RE.findall(text):
+        if label in _HEADER_LABELS:
+            key = _HEADER_LABELS[label]
+            header[key] = int(value) if value.isdigit() else value
+
+    timing = {}
+    for label, value in _TIMING_RE.findall(text):
+        timing[_TIMING_LABELS.get(label, _slug(label))] = float(value)
+
+    rates = {(kind or 'all').lower(): float(value) for kind, value in _RATE_RE.findall(text)}
+    results = {
+        _slug(label): (float(mean), float(std_dev))
+        for label, mean, std_dev in _RESULT_RE.findall(text)
+    }
+    batches = [int(batch) for batch, _ in _BATCH_RE.findall(text)]
+    return {
+        'header': header,
+        'timing': timing,
+        'rates': rates,
+        'results': results,
+        'batches': batches[-1] if batches else None,
+    }
+
+
+class PhaseTimer:
+    """Accumulates wall-clock time of named Python-side phases.
+
+    Use as ``with timer.phase('build'): ...``; repeated phases add up.
+    """
+
+    def __init__(self):
+        self.phases = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+
+def run_openmc(cwd, threads=None, mpi_args=None, openmc_exec='openmc', log_file=LOG_FILE):
+    """Runs OpenMC in cwd with its output captured.
+
+    The combined stdout and stderr are written to cwd / log_file.
+
+    Returns
+    -------
+    output : str
+        Captured output.
+    wall_time : float
+        Wall-clock time of the subprocess in seconds.
+
+    Raises
+    ------
+    RuntimeError
+        If OpenMC exits with an error; the message holds the end of the
+        output.
+    """
+    args = [openmc_exec]
+    if threads is not None:
+        args += ['-s', str(threads)]
+    if mpi_args is not None:
+        args = list(mpi_args) + args
+
+    start = time.perf_counter()
+    proc = subprocess.run(args, cwd=cwd, stdout=subprocess.PIPE,
+                          stderr=subprocess.STDOUT, text=True)
+    wall_time = time.perf_counter() - start
+    if log_file is not None:
+        (Path(cwd) / log_file).write_text(proc.stdout)
+    if proc.returncode != 0:
+        tail = '\n'.join(proc.stdout.splitlines()[-20:])
+        raise RuntimeError(f"OpenMC exited with status {proc.returncode} in {cwd}:\n{tail}")
+    return proc.stdout, wall_time
+
+
+def append_record(path, record):
+    """Appends one JSON object as a line to a JSON-lines file."""
+    with open(path, 'a') as fh:
+        fh.write(json.dumps(record, sort_keys=True) + '\n')
+
+
+def instrumented_run(xml_dir, log_path=None, label=None, timer=None, **kwargs):
+    """Runs OpenMC in xml_dir and records its telemetry.
+
+    Parameters
+    ----------
+    xml_dir : path-like
+        Directory holding the exported model.
+    log_path : path-like or None
+        JSON-lines file the record is appended to; defaults to
+        xml_dir / 'telemetry.jsonl'.
+    label : str or None
+        Free-form run label stored in the record, e.g. the example name.
+    timer : PhaseTimer or None
+        Python-side phases (build, export, ...) to store with the record.
+    **kwargs
+        Passed on to run_openmc.
+
+    Returns
+    -------
+    dict
+        The record: label, timestamp, directory, wall_time, phases and the
+        parsed output (see parse_output).
+    """
+    xml_dir = Path(xml_dir)
+    output, wall_time = run_openmc(xml_dir, **kwargs)
+    record = {
+        'label': label,
+        'timestamp': time.time(),
+        'directory': str(xml_dir.resolve()),
+        'host': os.uname().nodename if hasattr(os, 'uname') else None,
+        'wall_time': wall_time,
+        'phases': dict(timer.phases) if timer is not None else {},
+    }
+    record.update(parse_output(output))
+    append_record(xml_dir / 'telemetry.jsonl' if log_path is None else log_path, record)
+    return record
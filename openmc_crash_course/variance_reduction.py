@@ -0,0 +1,228 @@
+"""Weight-window variance reduction for deep-penetration tallies.
+
+In analog runs the flux in the barrel and the air outside it (example 05),
+or the leakage through the pin cell surfaces (example 03), is scored by
+few particles and converges slowly.  run_with_weight_windows generates
+weight windows with the MAGIC method: a short pilot run tallies the flux
+on a mesh, the lower weight bounds are set to half the flux relative to
+its maximum, and further pilots run with those windows refine them, since
+each reaches deeper bins than the last.  The production run then uses the
+final windows, and its figure of merit, FOM = 1 / (R^2 T), is compared per
+tally with an analog run of the same length.  T of the weighted run
+includes the pilots, since the windows are not free.
+"""
+import copy
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import openmc
+
+from .postprocess import StatepointReader, latest_statepoint
+
+WeightWindowResult = namedtuple('WeightWindowResult', [
+    'statepoint', 'analog_statepoint', 'weight_windows', 'pilot_time', 'fom'
+])
+FomComparison = namedtuple('FomComparison', ['analog', 'weighted', 'improvement'])
+
+# Name of the flux tally added to the pilot runs
+WW_TALLY = 'weight_window_flux'
+
+
+def _weight_window_mesh(model, tally, mesh):
+    """Returns the mesh for the weight windows, see run_with_weight_windows."""
+    if mesh is not None:
+        return mesh
+    for candidate in model.tallies:
+        if tally is not None and candidate.name != tally:
+            continue
+        for tally_filter in candidate.filters:
+            if isinstance(tally_filter, openmc.MeshFilter):
+                return tally_filter.mesh
+    if tally is not None:
+        raise ValueError(f"Tally {tally!r} not found or has no mesh filter")
+
+    lower_left, upper_right = model.geometry.bounding_box
+    if not (np.all(np.isfinite(lower_left)) and np.all(np.isfinite(upper_right))):
+        raise ValueError("Geometry is unbounded, pass a weight window mesh")
+    mesh = openmc.RegularMesh()
+    mesh.lower_left = lower_left
+    mesh.upper_right = upper_right
+    mesh.dimension = (10, 10, 10)
+    return mesh
+
+
+def _openmc_order(flux, mesh_ndim):
+    """Reorders a mesh tally from (..., y, x[, energy]) to (x, y, ..., energy).
+
+    Tally arrays from StatepointReader have x varying fastest in C order;
+    WeightWindows bounds are indexed by (ix, iy, iz, energy group).
+    """
+    axes = tuple(reversed(range(mesh_ndim))) + tuple(range(mesh_ndim, flux.ndim))
+    flux = flux.transpose(axes)
+    if flux.ndim == mesh_ndim:
+        flux = flux[..., np.newaxis]
+    return flux
+
+
+def weight_window_bounds(flux, previous=None, lower_fraction=0.5):
+    """Returns MAGIC lower weight bounds from a mesh flux.
+
+    Parameters
+    ----------
+    flux : numpy.ndarray
+        Flux per mesh bin with the energy groups on the last axis.
+    previous : numpy.ndarray or None
+        Bounds of the previous iteration; they are kept in bins the new
+        flux does not reach.
+    lower_fraction : float
+        Lower bound in the bin of highest flux, per energy group.
+
+    Returns
+    -------
+    numpy.ndarray
+        Lower bounds of the same shape as flux; -1 where there is no
+        window, which OpenMC ignores.
+    """
+    flux = np.nan_to_num(np.asarray(flux, dtype=float))
+    peak = flux.max(axis=tuple(range(flux.ndim - 1)), keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lower = np.where(flux > 0, lower_fraction * flux / peak, -1.0)
+    if previous is not None:
+        lower = np.where(lower > 0, lower, previous)
+    return lower
+
+
+def figure_of_merit(statepoint, tally, time='simulation', extra_time=0.0):
+    """Returns the FOM 1 / (R^2 T) of a tally.
+
+    R is the root mean square relative error over all bins, counting bins
+    without score as 100 %, and T the run time of the given statepoint
+    timing entry in seconds plus extra_time, e.g. of runs that prepared
+    this one.
+    """
+    with StatepointReader(statepoint) as reader:
+        stats = reader.read(tally)
+        seconds = reader.runtime[time] + extra_time
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rel_err = np.where(stats.mean != 0, stats.std_dev / np.abs(stats.mean), 1.0)
+    return 1.0 / (np.mean(rel_err ** 2) * seconds)
+
+
+def compare_fom(analog_statepoint, weighted_statepoint, tallies, time='simulation',
+                pilot_time=0.0):
+    """Compares the FOM of tallies between an analog and a weighted run.
+
+    pilot_time is the run time, in seconds, of the pilots that generated
+    the weight windows.  It is counted as part of the weighted run.
+
+    Returns
+    -------
+    dict
+        FomComparison(analog, weighted, improvement) by tally.
+    """
+    comparison = {}
+    for tally in tallies:
+        analog = figure_of_merit(analog_statepoint, tally, time)
+        weighted = figure_of_merit(weighted_statepoint, tally, time, pilot_time)
+        comparison[tally] = FomComparison(analog, weighted, weighted / analog)
+    return comparison
+
+
+def run_with_weight_windows(model, directory, tally=None, mesh=None, energy_bounds=None,
+                            iterations=2, pilot_particles=None, pilot_batches=10,
+                            upper_bound_ratio=5.0, analog=True, **run_kwargs):
+    """Runs a model with MAGIC weight windows generated from pilot runs.
+
+    Parameters
+    ----------
+    model : openmc.Model
+        Model to run; it is not modified.
+    directory : path-like
+        Working directory of the production run; pilots run in pilot_<n>
+        and the analog comparison in analog subdirectories.
+    tally : str or None
+        Name of a mesh tally whose mesh carries the weight windows, e.g.
+        'core_flux'.  By default the first mesh tally is used, or a 10 x
+        10 x 10 mesh over the geometry if there is none.
+    mesh : openmc.MeshBase or None
+        Mesh for the weight windows, overriding tally.
+    energy_bounds : sequence of float or None
+        Energy group boundaries of the windows in eV; one group if None.
+    iterations : int
+        Number of pilot runs; each after the first uses the windows of
+        the one before.
+    pilot_particles : int or None
+        Particles per batch of the pilots; defaults to the model's.
+    pilot_batches : int
+        Active batches of each pilot.
+    upper_bound_ratio : float
+        Ratio of the upper to the lower weight bound.
+    analog : bool
+        Also run the model without weight windows and compare the FOM of
+        every tally, counting the pilots as part of the weighted run.
+    **run_kwargs
+        Passed on to openmc.Model.run.
+
+    Returns
+    -------
+    WeightWindowResult
+        Production and analog statepoints (the latter None without
+        analog), the openmc.WeightWindows used, the simulation time of
+        all pilots in seconds, and FomComparisons by tally name (empty
+        without analog).
+    """
+    if iterations < 1:
+        raise ValueError(f"At least one pilot iteration is needed, got {iterations}")
+    directory = Path(directory)
+    # Work on a copy, the caller's model keeps its settings and tallies
+    model = copy.deepcopy(model)
+    settings = model.settings
+    run_kwargs.setdefault('output', False)
+    mesh = _weight_window_mesh(model, tally, mesh)
+    tallies = model.tallies
+    particles, batches = settings.particles, settings.batches
+
+    analog_statepoint = None
+    if analog:
+        analog_dir = directory / 'analog'
+        analog_dir.mkdir(parents=True, exist_ok=True)
+        model.run(cwd=analog_dir, **run_kwargs)
+        analog_statepoint = latest_statepoint(analog_dir)
+
+    flux_tally = openmc.Tally(name=WW_TALLY)
+    flux_tally.filters = [openmc.MeshFilter(mesh)]
+    if energy_bounds is not None:
+        flux_tally.filters.append(openmc.EnergyFilter(energy_bounds))
+    flux_tally.scores = ['flux']
+    model.tallies = openmc.Tallies([flux_tally])
+    settings.particles = particles if pilot_particles is None else pilot_particles
+    settings.batches = (settings.inactive or 0) + pilot_batches
+
+    lower = weight_windows = None
+    pilot_time = 0.0
+    for iteration in range(iterations):
+        pilot_dir = directory / f'pilot_{iteration}'
+        pilot_dir.mkdir(parents=True, exist_ok=True)
+        model.run(cwd=pilot_dir, **run_kwargs)
+        with StatepointReader(latest_statepoint(pilot_dir)) as reader:
+            flux = reader.read(WW_TALLY, score='flux').mean
+            pilot_time += reader.runtime['simulation']
+        lower = weight_window_bounds(_openmc_order(flux, len(mesh.dimension)), lower)
+        weight_windows = openmc.WeightWindows(
+            mesh, lower, upper_bound_ratio=upper_bound_ratio,
+            energy_bounds=energy_bounds, particle_type='neutron'
+        )
+        settings.weight_windows = [weight_windows]
+        settings.weight_windows_on = True
+
+    model.tallies = tallies
+    settings.particles, settings.batches = particles, batches
+    model.run(cwd=directory, **run_kwargs)
+    statepoint = latest_statepoint(directory)
+
+    fom = {}
+    if analog:
+        names = [production.name or production.id for production in tallies]
+        fom = compare_fom(analog_statepoint, statepoint, names, pilot_time=pilot_time)
+    return WeightWindowResult(statepoint, analog_statepoint, weight_windows, pilot_time, fom)
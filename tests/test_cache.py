@@ -0,0 +1,61 @@
+from pathlib import Path
+
+import pytest
+
+openmc = pytest.importorskip('openmc')
+
+from openmc_crash_course import cache as cache_module
+from openmc_crash_course.cache import ResultCache, cached_run, input_key, referenced_files
+
+
+@pytest.fixture
+def xml_dir(tmp_path):
+    directory = tmp_path / 'model'
+    directory.mkdir()
+    (directory / 'settings.xml').write_text(
+        '<settings><batches>100</batches><source strength="1.0" file="source.h5"/></settings>')
+    (directory / 'materials.xml').write_text(
+        '<materials><cross_sections>mgxs.h5</cross_sections></materials>')
+    (directory / 'source.h5').write_bytes(b'source')
+    (directory / 'mgxs.h5').write_bytes(b'mgxs')
+    return directory
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """Replaces openmc.run with one writing statepoints at batches 50 and 100."""
+    calls = []
+
+    def run(cwd, **kwargs):
+        calls.append(Path(cwd))
+        for name in ('statepoint.50.h5', 'statepoint.100.h5', 'summary.h5', 'tallies.out'):
+            (Path(cwd) / name).write_text(name)
+
+    monkeypatch.setattr(cache_module.openmc, 'run', run)
+    monkeypatch.setattr(cache_module, 'openmc_version', lambda openmc_exec='openmc': '0.14.0')
+    return calls
+
+
+def test_referenced_files_change_key(xml_dir, runs):
+    assert referenced_files(xml_dir) == [xml_dir / 'mgxs.h5', xml_dir / 'source.h5']
+    key = input_key(xml_dir)
+    (xml_dir / 'mgxs.h5').write_bytes(b'other mgxs')
+    assert input_key(xml_dir) != key
+
+
+def test_cached_run(xml_dir, runs, tmp_path):
+    # Output of an earlier run in the same directory stays out of the cache
+    (xml_dir / 'statepoint.10.h5').write_text('old')
+    cache = ResultCache(tmp_path / 'cache')
+
+    assert cached_run(xml_dir, cache=cache) == xml_dir / 'statepoint.100.h5'
+    entry = cache.lookup(input_key(xml_dir))
+    assert sorted(path.name for path in entry.iterdir()) == [
+        'last_used', 'statepoint.100.h5', 'statepoint.50.h5', 'summary.h5', 'tallies.out'
+    ]
+
+    for name in ('statepoint.50.h5', 'statepoint.100.h5'):
+        (xml_dir / name).unlink()
+    assert cached_run(xml_dir, cache=cache) == xml_dir / 'statepoint.100.h5'
+    assert (xml_dir / 'statepoint.100.h5').read_text() == 'statepoint.100.h5'
+    assert len(runs) == 1
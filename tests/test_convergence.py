@@ -0,0 +1,66 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import h5py
+import numpy as np
+import pytest
+
+openmc = pytest.importorskip('openmc')
+
+from openmc_crash_course.convergence import run_converged
+
+
+class FakeModel:
+    """Writes a statepoint whose entropy and k follow one source chain.
+
+    The source relaxes over the batches run so far in all pilots, so it
+    only converges if each pilot continues from the one before.
+    """
+
+    def __init__(self, relax=lambda batch: 2.0 * np.exp(-batch / 5.0)):
+        self.settings = SimpleNamespace(entropy_mesh=object(), source=None,
+                                        inactive=None, batches=None)
+        self.tallies = openmc.Tallies()
+        self.relax = relax
+
+    def run(self, cwd, **kwargs):
+        # Deep copies share the log of the model they were copied from
+        FakeModel.runs.append((Path(cwd), self.settings.source, self.settings.inactive,
+                               self.settings.batches))
+        batches = self.settings.batches
+        start = FakeModel.batches_run
+        FakeModel.batches_run += batches
+        x = start + np.arange(batches)
+        rng = np.random.default_rng(start)
+        with h5py.File(Path(cwd) / f'statepoint.{batches}.h5', 'w') as fh:
+            fh['entropy'] = 5.0 - self.relax(x) + rng.normal(0.0, 0.01, batches)
+            fh['k_generation'] = 1.0 + 0.1 * self.relax(x) + rng.normal(0.0, 1e-3, batches)
+
+
+@pytest.fixture(autouse=True)
+def run_log():
+    FakeModel.runs, FakeModel.batches_run = [], 0
+
+
+def test_pilots_stop_once_converged(tmp_path):
+    result = run_converged(FakeModel(), tmp_path, pilot_batches=25, max_pilots=6,
+                           min_inactive=5, min_active=20)
+    # 25 batches leave part of the transient in the reference half; 50 do not
+    assert result.converged and result.pilot_batches == 50
+    assert 5 <= result.converged_batch <= 25
+    assert (result.inactive_batches, result.active_batches) == (5, 20)
+
+    (pilot_0, source_0, *_), (pilot_1, source_1, *_), production = FakeModel.runs
+    assert [pilot_0.name, pilot_1.name] == ['pilot_0', 'pilot_1']
+    assert source_0 is None
+    assert Path(source_1.path).parent == pilot_0.resolve()
+    assert production[0] == tmp_path
+    assert Path(production[1].path).parent == pilot_1.resolve()
+    assert production[2:] == (5, 25)
+
+
+def test_pilots_give_up(tmp_path):
+    result = run_converged(FakeModel(relax=lambda batch: -0.01 * batch), tmp_path,
+                           pilot_batches=25, max_pilots=3, min_inactive=5, min_active=20)
+    assert not result.converged and result.converged_batch is None
+    assert result.pilot_batches == 75 and len(FakeModel.runs) == 4
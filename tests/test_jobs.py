@@ -0,0 +1,120 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from openmc_crash_course import jobs
+from openmc_crash_course.jobs import (
+    CANCELLED, DONE, FAILED, RUNNING, TIMEOUT, JobManager
+)
+
+STUB = str(Path(__file__).parent / 'data' / 'stub_openmc')
+
+
+@pytest.fixture(autouse=True)
+def four_cores(monkeypatch):
+    # Independent of the cores of the machine running the tests
+    monkeypatch.setattr(jobs, '_available_cores', lambda: [0, 1, 2, 3])
+    monkeypatch.setattr(jobs, 'TERMINATE_GRACE', 0.5)
+
+
+def manager(total_cores=None):
+    return JobManager(total_cores=total_cores, openmc_exec=STUB, pin=False)
+
+
+async def _monitor(manager, usage, started):
+    """Records the cores in use and the order jobs start in until all end."""
+    while not all(job.finished for job in manager.jobs):
+        running = [job for job in manager.jobs if job.state == RUNNING]
+        usage.append(sum(job.cores for job in running))
+        for job in running:
+            if job.id not in started:
+                started.append(job.id)
+        await asyncio.sleep(0.005)
+
+
+def test_run_streams_output(tmp_path):
+    async def main():
+        job = manager().submit(tmp_path, cores=2)
+        batches = [batch async for batch in job.batches()]
+        return batches, await job.wait()
+
+    batches, result = asyncio.run(main())
+    assert batches == [1, 2, 3]
+    assert result.state == DONE and result.returncode == 0
+    assert result.wall_time > 0.0
+    assert result.output.startswith('threads=2 args=-s 2')
+    assert (tmp_path / jobs.LOG_FILE).read_text() == result.output
+
+
+def test_core_budget(tmp_path):
+    async def main():
+        jm = manager(total_cores=3)
+        for cores in (2, 1, 3, 1):
+            jm.submit(tmp_path, cores=cores)
+        usage, started = [], []
+        await asyncio.gather(jm.wait_all(), _monitor(jm, usage, started))
+        return jm, usage, started
+
+    jm, usage, started = asyncio.run(main())
+    assert [job.state for job in jm.jobs] == [DONE] * 4
+    assert max(usage) <= 3
+    # The 3-core job is not overtaken by the 1-core job queued behind it
+    assert started == [1, 2, 3, 4]
+    assert jm.free_cores == 3
+
+
+def test_budget_checks():
+    with pytest.raises(ValueError):
+        JobManager(total_cores=5, openmc_exec=STUB)
+
+    async def main():
+        manager(total_cores=2).submit('.', cores=3)
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+
+
+def test_failed_run(tmp_path):
+    async def main():
+        return await manager().submit(tmp_path, env={'STUB_RC': '3'}).wait()
+
+    result = asyncio.run(main())
+    assert result.state == FAILED and result.returncode == 3
+
+
+def test_cancel_running_and_pending(tmp_path):
+    async def main():
+        jm = manager(total_cores=1)
+        slow = {'STUB_BATCHES': '100', 'STUB_SLEEP': '0.1'}
+        running = jm.submit(tmp_path, env=slow)
+        pending = jm.submit(tmp_path, env=slow)
+        async for _ in running.batches():
+            break
+        jm.cancel_all()
+        return jm, await running.wait(), await pending.wait()
+
+    jm, running, pending = asyncio.run(main())
+    assert running.state == CANCELLED and running.returncode is not None
+    assert running.returncode < 0
+    assert pending.state == CANCELLED and pending.wall_time is None
+    assert pending.output == ''
+    assert jm.free_cores == 1
+
+
+@pytest.mark.parametrize('ignore_term', [False, True])
+def test_timeout(tmp_path, ignore_term):
+    env = {'STUB_BATCHES': '100', 'STUB_SLEEP': '0.1'}
+    if ignore_term:
+        # Only SIGKILL after TERMINATE_GRACE stops it
+        env['STUB_IGNORE_TERM'] = '1'
+
+    async def main():
+        jm = manager()
+        return jm, await jm.submit(tmp_path, timeout=0.3, env=env).wait()
+
+    jm, result = asyncio.run(main())
+    assert result.state == TIMEOUT
+    assert result.returncode == (-9 if ignore_term else -15)
+    assert result.wall_time < 5.0
+    assert jm.free_cores == 4
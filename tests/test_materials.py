@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+openmc = pytest.importorskip('openmc')
+
+from openmc_crash_course.materials import collect_materials, make_fuel_materials, make_materials
+
+
+def test_fuel_variants_are_shared():
+    enrichment = np.array([[0.03, 0.04], [0.03, 0.05]])
+    fuel = make_fuel_materials(enrichment, density=[10.0, 10.4], temperature=900.0)
+    assert fuel.shape == (2, 2)
+    assert fuel[0, 0] is fuel[1, 0]
+    assert fuel[0, 1] is not fuel[1, 1]
+    assert len(collect_materials(fuel)) == 3
+
+    material = fuel[1, 1]
+    assert [(nuc.name, nuc.percent) for nuc in material.nuclides] == [
+        ('U235', 0.05), ('U238', 0.95), ('O16', 2.0)
+    ]
+    assert material.get_mass_density() == pytest.approx(10.4)
+    assert material.temperature == 900.0
+
+
+def test_generic_template():
+    # Zircaloy-like cladding with a varying tin content
+    cladding = make_materials({'Zr': [0.985, 0.98], 'Sn': [0.015, 0.02]}, density=6.5,
+                              name='clad', percent_type='wo')
+    assert cladding.shape == (2,)
+    assert cladding[0] is not cladding[1]
+    for material in cladding:
+        assert material.name == 'clad' and material.temperature is None
+        nuclides = material.get_nuclides()
+        assert any(nuc.startswith('Zr') for nuc in nuclides)
+        assert any(nuc.startswith('Sn') for nuc in nuclides)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+openmc = pytest.importorskip('openmc')
+
+from openmc_crash_course.geometry import create_core_lattice
+from openmc_crash_course.meshes import create_lattice_mesh, extract_pin_values
+
+PIN_PITCH, PINS, ASSY_PITCH = 1.26, 5, 8.0
+
+
+def assembly_universe():
+    pins = openmc.RectLattice()
+    pins.lower_left = (-PIN_PITCH * PINS / 2, -PIN_PITCH * PINS / 2)
+    pins.pitch = (PIN_PITCH, PIN_PITCH)
+    pins.universes = np.full((PINS, PINS), openmc.Universe(cells=[openmc.Cell()]))
+    return openmc.Universe(cells=[openmc.Cell(fill=pins)])
+
+
+@pytest.mark.parametrize('transpose', [False, True])
+def test_asymmetric_map(transpose):
+    # Fuel in one column only; transposed, in one row only
+    core_map = np.array([[1, 0, 0], [1, 0, 0], [1, 0, 0]])
+    if transpose:
+        core_map = core_map.T
+    reflector = openmc.Universe(cells=[openmc.Cell()])
+    lattice = create_core_lattice(assembly_universe(), reflector, core_map, ASSY_PITCH)
+    mesh, pin_map = create_lattice_mesh(lattice)
+
+    # An element holding an assembly has PINS pin bins plus two wall bins
+    fine, coarse = PINS + 2, 1
+    shape = (3 * fine, fine + 2 * coarse)
+    assert (len(mesh.y_grid) - 1, len(mesh.x_grid) - 1) == (shape[::-1] if transpose else shape)
+
+    values = np.arange(pin_map.pin_col.size, dtype=float)
+    pins = extract_pin_values(values, pin_map)
+    assert pins.shape == (3, 3, PINS, PINS)
+    has_pins = ~np.isnan(pins).any(axis=(2, 3))
+    assert np.array_equal(has_pins, core_map == 1)
+    assert np.isnan(pins[core_map == 0]).all()
+    # Each pin bin is used exactly once
+    assert len(np.unique(pins[has_pins])) == 3 * PINS * PINS
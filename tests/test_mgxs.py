@@ -0,0 +1,60 @@
+import shutil
+
+import numpy as np
+import pytest
+
+openmc = pytest.importorskip('openmc')
+
+from openmc_crash_course.mgxs import (
+    MATERIAL_NAMES, build_mg_core_model, synthetic_mgxs_library
+)
+from openmc_crash_course.postprocess import StatepointReader, latest_statepoint
+
+# A 3 x 3 core map of 5 x 5 assemblies keeps the model small
+SMALL_CORE = dict(assy_size=5, grid_size=3, target_assemblies=5,
+                  particles=200, batches=6, inactive=2)
+
+
+@pytest.fixture
+def library(tmp_path):
+    return synthetic_mgxs_library(tmp_path / 'mgxs.h5')
+
+
+def test_synthetic_library(library):
+    data = openmc.MGXSLibrary.from_hdf5(str(library))
+    assert np.allclose(data.energy_groups.group_edges, [0.0, 0.625, 20.0e6])
+    for name in MATERIAL_NAMES:
+        xsdata = data.get_by_name(name)
+        assert xsdata is not None, name
+        total = np.asarray(xsdata.total[0])
+        absorption = np.asarray(xsdata.absorption[0])
+        scatter = np.asarray(xsdata.scatter_matrix[0])[..., 0]
+        assert np.allclose(total, absorption + scatter.sum(axis=1))
+    assert data.get_by_name('fuel').fissionable
+    assert not data.get_by_name('water').fissionable
+
+
+def test_build_mg_core_model(library, tmp_path):
+    model = build_mg_core_model(library, **SMALL_CORE)
+
+    assert model.settings.energy_mode == 'multi-group'
+    assert model.materials.cross_sections == str(library.resolve())
+    assert sorted(material.name for material in model.materials) == sorted(MATERIAL_NAMES)
+    for cell in model.geometry.get_all_material_cells().values():
+        assert cell.fill in model.materials
+    assert 'pin_power' in [tally.name for tally in model.tallies]
+
+    model.export_to_xml(tmp_path / 'mg')
+    for name in ('materials.xml', 'geometry.xml', 'settings.xml', 'tallies.xml'):
+        assert (tmp_path / 'mg' / name).exists()
+
+
+@pytest.mark.skipif(shutil.which('openmc') is None, reason='openmc executable not found')
+def test_run_mg_core_model(library, tmp_path):
+    model = build_mg_core_model(library, **SMALL_CORE)
+    model.run(cwd=tmp_path, output=False)
+    with StatepointReader(latest_statepoint(tmp_path)) as reader:
+        k_eff, k_eff_std = reader.k_combined
+        pin_power = reader.read('pin_power', score='fission').mean
+    assert 0.0 < k_eff < 2.0 and k_eff_std > 0.0
+    assert pin_power.sum() > 0.0
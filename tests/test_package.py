@@ -0,0 +1,19 @@
+import importlib
+
+import pytest
+
+import openmc_crash_course as occ
+
+
+def test_lazy_names_and_submodules():
+    telemetry = importlib.import_module('openmc_crash_course.telemetry')
+    assert occ.telemetry is telemetry
+    assert occ.parse_output is telemetry.parse_output
+    assert 'parse_output' in dir(occ)
+    with pytest.raises(AttributeError):
+        occ.no_such_name
+
+
+def test_hex_geometry_module():
+    pytest.importorskip('openmc')
+    assert occ.hex_geometry.hex_assembly_pitch(pitch=1.275, n_rings=11) > 0.0
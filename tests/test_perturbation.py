@@ -0,0 +1,154 @@
+from types import SimpleNamespace
+
+import h5py
+import numpy as np
+import pytest
+
+openmc = pytest.importorskip('openmc')
+pytest.importorskip('openmc.lib')
+
+from openmc_crash_course.perturbation import PerturbationSession, block_mean
+
+INACTIVE, BATCHES = 5, 69
+
+
+class FakeMaterial:
+    def __init__(self, material_id, density):
+        self.id = material_id
+        self.density = density
+
+    def get_density(self, units='atom/b-cm'):
+        return self.density
+
+    def set_density(self, density, units='atom/b-cm'):
+        self.density = density
+
+
+class FakeCell:
+    def __init__(self, fill, temperatures):
+        self.fill = fill
+        self.temperatures = list(temperatures)
+
+    @property
+    def num_instances(self):
+        return len(self.temperatures)
+
+    def get_temperature(self, instance=None):
+        return self.temperatures[instance or 0]
+
+    def set_temperature(self, T, instance=None):
+        if instance is None:
+            self.temperatures = [T] * self.num_instances
+        else:
+            self.temperatures[instance] = T
+
+
+class FakeLib:
+    """Stands in for openmc.lib with a synthetic k-effective per generation.
+
+    k rises with the fuel density and falls with the mean fuel temperature.
+    Its noise is mostly set by the seed, so runs with one seed are
+    strongly correlated, plus a small part that differs every run.
+    """
+
+    def __init__(self, fuel_id):
+        self.fuel = FakeMaterial(fuel_id, 0.07)
+        self.cells = {1: FakeCell(self.fuel, [600.0, 650.0, 700.0]),
+                      2: FakeCell(None, [300.0])}
+        self.materials = {fuel_id: self.fuel}
+        self.settings = SimpleNamespace(seed=None)
+        self.temperatures_run = []
+        self._own_noise = np.random.default_rng(12345)
+        self._k = None
+        self.open = False
+
+    def init(self, args=None, output=False):
+        self.open = True
+
+    def finalize(self):
+        self.open = False
+
+    def hard_reset(self):
+        self._k = None
+
+    def run(self, output=False):
+        temperatures = self.cells[1].temperatures
+        self.temperatures_run.append(list(temperatures))
+        shared = np.random.default_rng(self.settings.seed).normal(0.0, 2e-3, BATCHES)
+        own = self._own_noise.normal(0.0, 2e-4, BATCHES)
+        self._k = (1.0 + 0.3 * (self.fuel.density / 0.07 - 1.0)
+                   - 2e-5 * (np.mean(temperatures) - 650.0) + shared + own)
+
+    def statepoint_write(self, filename, write_source=True):
+        with h5py.File(filename, 'w') as fh:
+            fh['k_generation'] = self._k
+
+
+@pytest.fixture
+def model():
+    fuel = openmc.Material(name='fuel')
+    settings = SimpleNamespace(inactive=INACTIVE, batches=BATCHES, generations_per_batch=None)
+    return SimpleNamespace(materials=[fuel], settings=settings,
+                           export_to_xml=lambda directory: None)
+
+
+@pytest.fixture
+def lib(model, monkeypatch):
+    fake = FakeLib(model.materials[0].id)
+    monkeypatch.setattr(openmc, 'lib', fake)
+    return fake
+
+
+def test_block_mean():
+    assert block_mean(np.arange(10.0), 5) == pytest.approx((4.5, 2.5))
+    # The earliest value that does not fill a block is dropped
+    assert block_mean(np.arange(11.0), 5) == pytest.approx((5.5, 2.5))
+    assert block_mean(np.ones(16))[1] == 0.0
+    with pytest.raises(ValueError):
+        block_mean(np.arange(9.0), 5)
+
+
+def test_density_one_estimator(model, lib, tmp_path):
+    with PerturbationSession(model, tmp_path) as session:
+        assert lib.open
+        result = session.evaluate('fuel', density_factor=0.9)
+        base = session.baseline
+    assert not lib.open
+
+    # k_eff, the baseline and delta_k all come from the active generations;
+    # the baseline ran last, on first use in compare()
+    assert base.k_eff == pytest.approx(block_mean(lib._k[INACTIVE:])[0])
+    assert len(base.k_generation) == BATCHES - INACTIVE
+    assert result.delta_k == pytest.approx(result.k_eff - base.k_eff)
+    assert result.delta_k == pytest.approx(-0.03, abs=1e-3)
+    assert result.reactivity_pcm == pytest.approx(
+        1e5 * (1 / base.k_eff - 1 / result.k_eff))
+    assert lib.fuel.density == 0.07
+
+
+def test_correlated_sampling_is_more_precise(model, lib, tmp_path):
+    with PerturbationSession(model, tmp_path / 'correlated') as session:
+        correlated = session.evaluate('fuel', density_factor=0.99)
+    with PerturbationSession(model, tmp_path / 'independent', correlated=False) as session:
+        independent = session.evaluate('fuel', density_factor=0.99)
+    assert correlated.delta_k_std < independent.delta_k_std / 3
+    assert independent.delta_k_std == pytest.approx(
+        np.hypot(independent.k_eff_std, session.baseline.k_eff_std))
+
+
+def test_temperatures_restored_per_instance(model, lib, tmp_path):
+    with PerturbationSession(model, tmp_path) as session:
+        session.baseline
+        result = session.evaluate(model.materials[0], temperature=900.0)
+    assert lib.temperatures_run == [[600.0, 650.0, 700.0], [900.0, 900.0, 900.0]]
+    assert lib.cells[1].temperatures == [600.0, 650.0, 700.0]
+    assert lib.cells[2].temperatures == [300.0]
+    assert result.delta_k == pytest.approx(-5e-3, abs=5e-4)
+
+
+def test_one_session_per_process(model, lib, tmp_path):
+    with PerturbationSession(model, tmp_path):
+        with pytest.raises(RuntimeError):
+            PerturbationSession(model, tmp_path).__enter__()
+    with PerturbationSession(model, tmp_path):
+        pass
@@ -0,0 +1,101 @@
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip('openmc')
+
+from openmc_crash_course.search import criticality_search
+
+# Synthetic boron worth: k = 1.1 - 1e-4 * ppm, critical at 1000 ppm
+K0, WORTH, ROOT = 1.1, 1e-4, 1000.0
+
+
+def builder(boron_ppm, particles=1000):
+    settings = SimpleNamespace(particles=particles, batches=50, inactive=20, source=None)
+    return SimpleNamespace(boron_ppm=boron_ppm, settings=settings)
+
+
+class Transport:
+    """k(x) with a std. dev. of 5e-4 at 1000 particles per batch."""
+
+    def __init__(self, seed=1, noise=True, k_of=None):
+        self.rng = np.random.default_rng(seed)
+        self.noise = noise
+        self.k_of = k_of or (lambda ppm: K0 - WORTH * ppm)
+        self.models = []
+
+    def __call__(self, model, directory):
+        self.models.append(model)
+        std = 5e-4 * math.sqrt(1000 / model.settings.particles)
+        k = self.k_of(model.boron_ppm)
+        if self.noise:
+            k += std * self.rng.standard_normal()
+        return k, std, None
+
+
+def test_converges(tmp_path):
+    transport = Transport()
+    result = criticality_search(builder, 'boron_ppm', (0.0, 2000.0), directory=tmp_path,
+                                transport=transport)
+    assert result.converged
+    assert abs(result.k_eff - 1.0) <= 2e-4 and result.k_eff_std <= 1e-4
+    assert abs(result.value - ROOT) < 5 * result.value_std + 5.0
+    assert result.value_std == pytest.approx(result.k_eff_std / WORTH, rel=0.5)
+    # Bracket ends at the fewest particles, more as the search closes in
+    particles = [point.particles for point in result.history]
+    assert particles[:2] == [1000, 1000] and particles[-1] > 1000
+    assert len(result.history) <= 22
+    assert sorted(path.name for path in tmp_path.iterdir())[0] == 'iteration_00'
+
+
+def test_no_iterations(tmp_path):
+    result = criticality_search(builder, 'boron_ppm', (0.0, 2000.0), directory=tmp_path,
+                                transport=Transport(noise=False), max_iterations=0)
+    assert not result.converged
+    assert len(result.history) == 2
+    assert (result.value, result.k_eff) == (2000.0, pytest.approx(0.9))
+
+
+def test_x_tol_returns_evaluated_point(tmp_path):
+    # A step the secant method closes in on slowly, never within k_tol
+    k_of = lambda ppm: 1.0 + 0.05 * math.tanh((ROOT - ppm) / 5.0)
+    result = criticality_search(builder, 'boron_ppm', (0.0, 1500.0), directory=tmp_path,
+                                transport=Transport(noise=False, k_of=k_of),
+                                k_tol=1e-4, x_tol=50.0)
+    assert result.converged
+    last = result.history[-1]
+    assert abs(result.k_eff - 1.0) > 1e-4
+    assert (result.value, result.k_eff) == (last.value, last.k_eff)
+    assert result.k_eff == k_of(result.value)
+
+
+def test_bracket_end_on_target(tmp_path):
+    k_of = lambda ppm: 1.0 if ppm == ROOT else K0 - WORTH * ppm
+    result = criticality_search(builder, 'boron_ppm', (ROOT, 2000.0), directory=tmp_path,
+                                transport=Transport(noise=False, k_of=k_of))
+    assert len(result.history) == 2
+    assert result.value == ROOT and result.k_eff == 1.0
+
+
+def test_bracket_without_root(tmp_path):
+    with pytest.raises(ValueError, match='same side'):
+        criticality_search(builder, 'boron_ppm', (0.0, 500.0), directory=tmp_path,
+                           transport=Transport(noise=False))
+
+
+def test_warm_start(tmp_path):
+    transport = Transport()
+
+    def with_statepoint(model, directory):
+        k, std, _ = transport(model, directory)
+        return k, std, directory / 'statepoint.50.h5'
+
+    criticality_search(builder, 'boron_ppm', (0.0, 2000.0), directory=tmp_path,
+                       transport=with_statepoint, warm_inactive=5)
+    first, *warm = transport.models
+    assert first.settings.source is None and first.settings.inactive == 20
+    for model in warm:
+        assert model.settings.source is not None
+        assert (model.settings.inactive, model.settings.batches) == (5, 35)
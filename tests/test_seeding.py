@@ -0,0 +1,36 @@
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('openmc')
+
+from openmc_crash_course.seeding import neighbour_source
+from openmc_crash_course.sweep import RESULT_FILE
+
+
+def write_case(root, name, params, statepoint):
+    case_dir = root / name
+    case_dir.mkdir(parents=True)
+    (case_dir / 'statepoint.10.h5').touch()
+    record = {'case': name, 'params': params, 'statepoint': statepoint}
+    (case_dir / RESULT_FILE).write_text(json.dumps(record))
+    return case_dir
+
+
+def test_neighbour_source_from_other_cwd(tmp_path, monkeypatch):
+    root = tmp_path / 'sweeps' / 'pincell'
+    # Recorded relative to the directory the sweep was started from
+    near = write_case(root, 'near', {'enrichment': 3.0, 'boron_ppm': 500},
+                      'sweeps/pincell/near/statepoint.10.h5')
+    write_case(root, 'far', {'enrichment': 4.5, 'boron_ppm': 500},
+               'sweeps/pincell/far/statepoint.10.h5')
+    write_case(root, 'other_boron', {'enrichment': 3.1, 'boron_ppm': 800},
+               str(root / 'other_boron' / 'statepoint.10.h5'))
+
+    monkeypatch.chdir(tmp_path / 'sweeps')
+    source = neighbour_source(root, {'enrichment': 3.1, 'boron_ppm': 500},
+                              match=('boron_ppm',))
+    assert Path(source.path) == (near / 'statepoint.10.h5').resolve()
+    assert neighbour_source(root, {'enrichment': 3.1, 'boron_ppm': 100},
+                            match=('boron_ppm',)) is None
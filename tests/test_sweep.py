@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('openmc')
+
+from openmc_crash_course.sweep import case_name, expand_grid, write_results_table
+
+
+def test_expand_grid():
+    cases = expand_grid({'enrichment': np.linspace(0.03, 0.05, 3), 'pitch': 1.26,
+                         'boron_ppm': range(2), 'label': 'ab'})
+    assert len(cases) == 6
+    assert cases[0] == {'enrichment': 0.03, 'pitch': 1.26, 'boron_ppm': 0, 'label': 'ab'}
+    assert type(cases[0]['enrichment']) is float
+    assert len({case_name(case) for case in cases}) == 6
+
+
+def test_expand_grid_rejects_duplicates():
+    with pytest.raises(ValueError, match='boron_ppm'):
+        expand_grid({'boron_ppm': [0, 500, 0]})
+    with pytest.raises(ValueError):
+        expand_grid({'enrichment': np.array([0.03, 0.03])})
+
+
+def test_case_name_numpy_scalars():
+    assert case_name({'grid_size': np.int64(9)}) == case_name({'grid_size': 9})
+
+
+def test_results_table_sums_per_score(tmp_path):
+    # 2 filter bins, 2 nuclides, 2 scores, flattened in C order
+    tally = {'scores': ['fission', 'flux'], 'shape': [2, 2, 2], 'mean': list(range(8))}
+    result = {'case': 'case_0', 'params': {'pitch': 1.26}, 'k_eff': 1.0,
+              'k_eff_std': 1e-3, 'tallies': {'t': tally}}
+    write_results_table([result], tmp_path / 'results.csv')
+    header, row = (tmp_path / 'results.csv').read_text().splitlines()
+    assert header == 'case,pitch,k_eff,k_eff_std,t.fission,t.flux'
+    assert row == 'case_0,1.26,1.0,0.001,12.0,16.0'
@@ -0,0 +1,81 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from openmc_crash_course.telemetry import PhaseTimer, append_record, parse_output
+
+SAMPLE_LOG = Path(__file__).parent / 'data' / 'openmc_sample.log'
+
+
+@pytest.fixture(scope='module')
+def parsed():
+    return parse_output(SAMPLE_LOG.read_text())
+
+
+def test_timing(parsed):
+    assert parsed['timing'] == pytest.approx({
+        'initialization': 6.1243e-01,
+        'reading_cross_sections': 5.8716e-01,
+        'simulation': 2.3407e+00,
+        'transport': 2.3121e+00,
+        'inactive_batches': 9.2014e-01,
+        'active_batches': 1.4206e+00,
+        'synchronizing_fission_bank': 3.0510e-03,
+        'sampling_source_sites': 2.4770e-03,
+        'send_recv_source_sites': 5.1200e-04,
+        'accumulating_tallies': 2.1300e-04,
+        'writing_statepoints': 5.8140e-03,
+        'finalization': 1.4300e-04,
+        'elapsed': 2.9612e+00,
+    })
+
+
+def test_header_rates_and_batches(parsed):
+    assert parsed['header'] == {
+        'version': '0.14.0',
+        'git_sha1': 'fa2330103de61a864c958d1a7250f11e5dd91468',
+        'threads': 4,
+    }
+    assert parsed['rates'] == {'inactive': 4347.12, 'active': 4223.57}
+    assert parsed['batches'] == 10
+
+
+def test_results(parsed):
+    results = parsed['results']
+    assert results['combined_k_effective'] == (1.34733, 0.00207)
+    assert results['k_effective_track_length'] == (1.34637, 0.00245)
+    assert results['leakage_fraction'] == (0.0, 0.0)
+    # Running averages in the batch table are not results
+    assert len(results) == 5
+
+
+def test_missing_sections():
+    parsed = parse_output(' Reading settings XML file...\n')
+    assert parsed == {'header': {}, 'timing': {}, 'rates': {}, 'results': {},
+                      'batches': None}
+
+
+def test_fixed_source_rate():
+    parsed = parse_output(' Calculation Rate                  = 1.5e+05 particles/second\n')
+    assert parsed['rates'] == {'all': 1.5e5}
+
+
+def test_phase_timer_accumulates():
+    timer = PhaseTimer()
+    for _ in range(2):
+        with timer.phase('build'):
+            pass
+    with pytest.raises(RuntimeError):
+        with timer.phase('export'):
+            raise RuntimeError
+    assert set(timer.phases) == {'build', 'export'}
+    assert all(seconds >= 0.0 for seconds in timer.phases.values())
+
+
+def test_append_record(tmp_path):
+    path = tmp_path / 'telemetry.jsonl'
+    append_record(path, {'label': 'a', 'wall_time': 1.0})
+    append_record(path, {'label': 'b', 'wall_time': 2.0})
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record['label'] for record in records] == ['a', 'b']
@@ -0,0 +1,36 @@
+import h5py
+import numpy as np
+import pytest
+
+pytest.importorskip('openmc')
+
+from openmc_crash_course.variance_reduction import compare_fom, figure_of_merit
+
+
+def write_statepoint(path, rel_err, seconds, n=100):
+    """Writes a statepoint with one unfiltered tally 'leakage' of mean 1."""
+    # sum_sq chosen so that the std. dev. of the mean is rel_err
+    sum_sq = n * (1.0 + (n - 1) * rel_err ** 2)
+    with h5py.File(path, 'w') as fh:
+        tallies = fh.create_group('tallies')
+        tallies.attrs['ids'] = [1]
+        tally = tallies.create_group('tally 1')
+        tally['name'] = 'leakage'
+        tally['n_filters'] = 0
+        tally['nuclides'] = [b'total']
+        tally['score_bins'] = [b'current']
+        tally['n_realizations'] = n
+        tally['results'] = np.array([[[float(n), sum_sq]]])
+        fh['runtime/simulation'] = seconds
+    return path
+
+
+def test_compare_fom_counts_pilots(tmp_path):
+    analog = write_statepoint(tmp_path / 'analog.h5', rel_err=0.1, seconds=10.0)
+    weighted = write_statepoint(tmp_path / 'weighted.h5', rel_err=0.02, seconds=10.0)
+    assert figure_of_merit(analog, 'leakage') == pytest.approx(10.0)
+    assert figure_of_merit(weighted, 'leakage') == pytest.approx(250.0)
+
+    result = compare_fom(analog, weighted, ['leakage'], pilot_time=15.0)['leakage']
+    assert result.weighted == pytest.approx(100.0)
+    assert result.improvement == pytest.approx(10.0)